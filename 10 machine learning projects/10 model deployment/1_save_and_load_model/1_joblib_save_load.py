@@ -18,6 +18,11 @@ print("✅ Model saved as model_joblib.pkl")
 loaded_model = joblib.load("model_joblib.pkl")
 print("✅ Model loaded and ready for prediction.")
 
+# Load it memory-mapped: arrays stay in the file (page cache) instead of being copied,
+# so many server processes can share them. Only works for uncompressed dumps (the default).
+mmap_model = joblib.load("model_joblib.pkl", mmap_mode="r")
+print("✅ Model memory-mapped:", type(mmap_model.coef_).__name__)
+
 # Make a prediction
 prediction = loaded_model.predict([[5]])
 print("📊 Prediction for input 5:", prediction[0])
\ No newline at end of file
@@ -7,7 +7,9 @@ import joblib
 import numpy as np
 
 # Step 1: Load saved model
-model = joblib.load("model_joblib.pkl")
+# mmap_mode="r" maps the model's arrays from the file instead of copying them,
+# so several uvicorn workers share one copy in memory
+model = joblib.load("model_joblib.pkl", mmap_mode="r")
 
 # Step 2: Create app
 app = FastAPI()
@@ -5,8 +5,12 @@ import streamlit as st
 import joblib
 import numpy as np
 
-# Load model
-model = joblib.load("model_joblib.pkl")
+# Load model once per server (not on every rerun), memory-mapped from the file
+@st.cache_resource
+def load_model():
+    return joblib.load("model_joblib.pkl", mmap_mode="r")
+
+model = load_model()
 
 # UI
 st.title("💼 Salary Predictor")
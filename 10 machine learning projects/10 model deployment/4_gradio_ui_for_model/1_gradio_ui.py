@@ -5,8 +5,8 @@ import gradio as gr
 import joblib
 import numpy as np
 
-# Load trained model
-model = joblib.load("model_joblib.pkl")
+# Load trained model (arrays memory-mapped from the file, shared between processes)
+model = joblib.load("model_joblib.pkl", mmap_mode="r")
 
 # Define prediction function
 def predict_salary(experience):
@@ -1,20 +1,22 @@
 # ✅ 1_versioning_simulation.py
 # Simulate loading different versions of ML models manually
 
+from functools import lru_cache
 import joblib
 import numpy as np
 
-# Load two versions of saved models
-model_v1 = joblib.load("model_v1.pkl")  # Trained on small dataset
-model_v2 = joblib.load("model_v2.pkl")  # Trained on larger/improved dataset
+# Saved model versions: v1 trained on small dataset, v2 on larger/improved dataset
+MODEL_FILES = {"v1": "model_v1.pkl", "v2": "model_v2.pkl"}
+
+# Load a version only when it is first requested, keeping at most 2 in memory
+@lru_cache(maxsize=2)
+def load_model(version):
+    return joblib.load(MODEL_FILES[version], mmap_mode="r")
 
 # Simulate API route for version selection
 def predict_salary(experience, version="v1"):
     exp = np.array([[experience]])
-    if version == "v1":
-        model = model_v1
-    else:
-        model = model_v2
+    model = load_model(version if version in MODEL_FILES else "v2")
     pred = model.predict(exp)
     return f"Predicted salary ({version}): ${pred[0]:,.2f}"
 
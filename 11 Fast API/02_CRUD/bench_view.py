@@ -0,0 +1,122 @@
+# bench_view.py — peak RSS and p99 latency of the old whole-dataset /view vs paginated and NDJSON /view
+#
+# Run:  python bench_view.py --patients 1000000
+# Generates a patients.json of the requested size in a temp dir, then runs every mode in a fresh
+# subprocess (so peak RSS is per mode) using FastAPI's TestClient. Needs fastapi + httpx.
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).parent
+CITIES = ["Toronto", "Vancouver", "Montreal", "Calgary", "Ottawa", "Edmonton", "Winnipeg", "Halifax"]
+
+
+def make_data(n: int, path: Path) -> None:
+    rng = random.Random(0)
+    data = {}
+    for i in range(n):
+        h, w = round(rng.uniform(1.5, 1.95), 2), round(rng.uniform(45, 120), 1)
+        bmi = round(w / h ** 2, 2)
+        verdict = "Underweight" if bmi < 18.5 else "Healthy" if bmi < 25 else "Overweight" if bmi < 30 else "Obese"
+        data[f"P{i:07d}"] = {
+            "name": f"Patient {i}", "city": rng.choice(CITIES), "age": rng.randint(1, 99),
+            "gender": rng.choice(["Male", "Female", "Others"]), "height_m": h, "weight_kg": w,
+            "bmi": bmi, "verdict": verdict,
+        }
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def p99(ms):
+    lat = sorted(ms)
+    return lat[min(len(lat) - 1, int(0.99 * len(lat)))]
+
+
+def child(mode: str, requests: int, query: str) -> None:
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    if mode == "legacy":
+        # the endpoint as it was: parse the whole file, return the whole dict
+        data_file = Path(os.environ["PATIENT_DATA_DIR"]) / "patients.json"
+        app = FastAPI()
+
+        @app.get("/view")
+        def view():
+            with open(data_file, "r") as f:
+                return {"data": json.load(f)}
+    else:
+        sys.path.insert(0, str(HERE))
+        from main import app
+
+    client = TestClient(app)
+    ms, rows = [], 0
+    cursor = None
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        if mode == "ndjson":
+            with client.stream("GET", f"/view?format=ndjson{query}") as resp:
+                rows = sum(1 for line in resp.iter_lines() if line)
+        elif mode == "page":
+            url = f"/view?limit=100{query}" + (f"&cursor={cursor}" if cursor else "")
+            body = client.get(url).json()
+            rows, cursor = len(body["data"]), body["next_cursor"]
+        else:
+            rows = len(client.get("/view").json()["data"])
+        ms.append((time.perf_counter() - t0) * 1000)
+
+    print(json.dumps({
+        "p50_ms": statistics.median(ms),
+        "p99_ms": p99(ms),
+        "rows_per_request": rows,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--patients", type=int, default=200_000)
+    ap.add_argument("--requests", type=int, default=20, help="requests per mode (pages follow the cursor)")
+    ap.add_argument("--city", default=None, help="filter paginated/ndjson modes by city")
+    ap.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    query = f"&city={args.city}" if args.city else ""
+
+    if args.child:
+        return child(args.child, args.requests, query)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        make_data(args.patients, Path(tmp) / "patients.json")
+        size_mb = (Path(tmp) / "patients.json").stat().st_size / 1e6
+        print(f"patients: {args.patients:,}   patients.json: {size_mb:.0f} MB   "
+              f"(generated in {time.perf_counter() - t0:.1f}s)\n")
+
+        env = {**os.environ, "PATIENT_DATA_DIR": tmp}
+        modes = [("legacy", "legacy /view (full dict)", 5), ("page", "paginated (limit=100)", args.requests),
+                 ("ndjson", "ndjson stream (all)", 3)]
+        for mode, label, n in modes:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--requests", str(n)]
+                + (["--city", args.city] if args.city else []),
+                env=env, capture_output=True, text=True,
+            )
+            if out.returncode != 0:
+                print(f"{label:<28} failed:\n{out.stderr[-2000:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{label:<28} p50 {r['p50_ms']:9.1f} ms   p99 {r['p99_ms']:9.1f} ms   "
+                  f"rows/request {r['rows_per_request']:>9,}   peak RSS {r['peak_rss_mb']:7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
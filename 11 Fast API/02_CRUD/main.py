@@ -1,12 +1,46 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, computed_field
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, computed_field, field_validator
 from typing import Annotated, Literal, Optional
 from pathlib import Path
 import json
+import os
+from storage import PatientFilter, open_repository
 
 app = FastAPI()
-DATA_FILE = Path(__file__).with_name("patients.json")
+DATA_DIR = Path(os.environ.get("PATIENT_DATA_DIR", Path(__file__).parent))
+
+# snapshot + write-ahead log by default (PATIENT_STORE=sqlite for SQLite in WAL mode)
+repo = open_repository(DATA_DIR)
+
+@app.on_event("shutdown")
+def close_repository():
+    repo.close()
+
+def compute_bmi(height_m: float, weight_kg: float) -> float:
+    return round(weight_kg / (height_m ** 2), 2)
+
+def bmi_verdict(bmi: float) -> str:
+    if bmi < 18.5:
+        return "Underweight"
+    elif bmi < 25:
+        return "Healthy"
+    elif bmi < 30:
+        return "Overweight"
+    else:
+        return "Obese"
+
+def apply_changes(record: dict, changes: dict) -> dict:
+    """
+    Merges validated PatientUpdate fields into a stored record. bmi/verdict are stored columns,
+    recomputed here only when height or weight changed, so updates never rebuild a Patient.
+    """
+    record.update(changes)
+    if "bmi" not in record or "height_m" in changes or "weight_kg" in changes:
+        record["bmi"] = compute_bmi(record["height_m"], record["weight_kg"])
+        record["verdict"] = bmi_verdict(record["bmi"])
+    return record
 
 class Patient(BaseModel):
     id: Annotated[str, Field(..., description="id of the patient", examples=["P001"])]
@@ -17,23 +51,16 @@ class Patient(BaseModel):
     height_m: Annotated[float, Field(..., gt=0, description="height (meters)")]
     weight_kg: Annotated[float, Field(..., gt=0, description="weight (kg)")]
 
+    # evaluated once, when the record is dumped for storage; reads return the stored values
     @computed_field
     @property
     def bmi(self) -> float:
-        return round(self.weight_kg / (self.height_m ** 2), 2)
+        return compute_bmi(self.height_m, self.weight_kg)
 
     @computed_field
     @property
     def verdict(self) -> str:
-        bmi = self.bmi
-        if bmi < 18.5:
-            return "Underweight"
-        elif bmi < 25:
-            return "Healthy"
-        elif bmi < 30:
-            return "Overweight"
-        else:
-            return "Obese"
+        return bmi_verdict(self.bmi)
 
 class PatientUpdate(BaseModel):
     # optional fields must default to None
@@ -44,67 +71,154 @@ class PatientUpdate(BaseModel):
     height_m: Annotated[Optional[float], Field(None, gt=0, description="height (meters)")]
     weight_kg: Annotated[Optional[float], Field(None, gt=0, description="weight (kg)")]
 
-def load_data() -> dict:
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    return {}  # start empty if file doesn't exist
-
-def save_data(data: dict) -> None:
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    # every field is required on Patient and apply_changes merges without re-validating the record,
+    # so a field may be left out but not set to null (runs on sent values only, not on defaults)
+    @field_validator("*")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("field may be omitted but not set to null")
+        return value
+
+class PatientBulkUpdate(PatientUpdate):
+    id: Annotated[str, Field(..., description="id of the patient to update", examples=["P001"])]
+
+# built once; each bulk request is validated in a single pass over the whole list
+PATIENT_LIST = TypeAdapter(list[Patient])
+PATIENT_UPDATE_LIST = TypeAdapter(list[PatientBulkUpdate])
+ID_LIST = TypeAdapter(list[str])
+
+def validate_batch(adapter: TypeAdapter, raw: bytes):
+    """
+    Returns ([(index, item), ...] for valid items, {index: [errors]} for invalid ones).
+    The happy path is one validate_json call; a second pass re-validates only the valid subset.
+    """
+    try:
+        return list(enumerate(adapter.validate_json(raw))), {}
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False, include_input=False)
+
+    per_item = {}
+    for err in errors:
+        if not err["loc"] or not isinstance(err["loc"][0], int):
+            # not a list of objects at all (bad JSON, wrong top-level type)
+            raise HTTPException(status_code=422, detail=errors)
+        per_item.setdefault(err["loc"][0], []).append({"loc": list(err["loc"][1:]), "msg": err["msg"]})
+
+    items = json.loads(raw)
+    keep = [i for i in range(len(items)) if i not in per_item]
+    return list(zip(keep, adapter.validate_python([items[i] for i in keep]))), per_item
+
+def bulk_response(n_items: int, ids: dict, outcomes: dict, invalid: dict):
+    results = []
+    for i in range(n_items):
+        if i in invalid:
+            results.append({"index": i, "status": "invalid", "errors": invalid[i]})
+        else:
+            status, detail = outcomes[i]
+            item = {"index": i, "id": ids[i], "status": status}
+            if status == "error":
+                item["errors"] = [{"loc": [], "msg": str(detail)}]
+            results.append(item)
+    summary = {}
+    for r in results:
+        summary[r["status"]] = summary.get(r["status"], 0) + 1
+    return {"summary": summary, "results": results}
 
 @app.get("/")
 def root():
     return {"message": "patient management system API"}
 
 @app.get("/view")
-def view():
-    data = load_data()
-    return {"data": data}
+def view(
+    cursor: Annotated[Optional[str], Query(description="next_cursor from the previous page")] = None,
+    limit: Annotated[Optional[int], Query(ge=1, le=1000, description="page size (json: default 100, ndjson: all)")] = None,
+    city: Optional[str] = None,
+    gender: Optional[Literal["Male", "Female", "Others"]] = None,
+    verdict: Optional[Literal["Underweight", "Healthy", "Overweight", "Obese"]] = None,
+    min_age: Annotated[Optional[int], Query(ge=0)] = None,
+    max_age: Annotated[Optional[int], Query(ge=0)] = None,
+    format: Literal["json", "ndjson"] = "json",
+):
+    flt = PatientFilter(city=city, gender=gender, verdict=verdict, min_age=min_age, max_age=max_age)
+
+    if format == "ndjson":
+        # one record per line, produced lazily: memory stays flat however many patients match
+        def lines():
+            for n, (patient_id, record) in enumerate(repo.scan(flt, cursor)):
+                if limit is not None and n == limit:
+                    return
+                yield json.dumps({"patient_id": patient_id, **record}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    rows, next_cursor = repo.page(flt, cursor, limit or 100)
+    return {"data": dict(rows), "next_cursor": next_cursor}
+
+@app.get("/stats")
+def stats():
+    # aggregates are maintained on every write, so this never touches the patient records
+    return repo.stats()
 
 @app.post("/create")
 def create_patient(p: Patient):
-    data = load_data()
-    if p.id in data:
-        raise HTTPException(status_code=400, detail="patient already exists")
-
     # store by id; keep 'id' out of nested record since it's the key
     # (keeping bmi/verdict is OK; they get recomputed on update)
-    data[p.id] = p.model_dump(exclude={"id"})
-    save_data(data)
+    if not repo.create(p.id, p.model_dump(exclude={"id"})):
+        raise HTTPException(status_code=400, detail="patient already exists")
     return JSONResponse(status_code=201, content={"message": "patient created successfully"})
 
+def _bulk_create(raw: bytes):
+    valid, invalid = validate_batch(PATIENT_LIST, raw)
+    ops = [("create", p.id, p.model_dump(exclude={"id"})) for _, p in valid]
+    outcomes = dict(zip([i for i, _ in valid], repo.apply(ops)))
+    return bulk_response(len(valid) + len(invalid), {i: p.id for i, p in valid}, outcomes, invalid)
+
+def _bulk_update(raw: bytes):
+    valid, invalid = validate_batch(PATIENT_UPDATE_LIST, raw)
+
+    def merge(changes: dict):
+        return lambda record: apply_changes(record, changes)
+
+    ops = [("update", u.id, merge(u.model_dump(exclude_unset=True, exclude={"id"}))) for _, u in valid]
+    outcomes = dict(zip([i for i, _ in valid], repo.apply(ops)))
+    return bulk_response(len(valid) + len(invalid), {i: u.id for i, u in valid}, outcomes, invalid)
+
+def _bulk_delete(raw: bytes):
+    valid, invalid = validate_batch(ID_LIST, raw)
+    outcomes = dict(zip([i for i, _ in valid], repo.apply([("delete", pid, None) for _, pid in valid])))
+    return bulk_response(len(valid) + len(invalid), dict(valid), outcomes, invalid)
+
+# bulk endpoints read the raw body so pydantic parses and validates the JSON in one pass;
+# the work runs in the threadpool so large batches don't block the event loop
+@app.post("/patients/bulk")
+async def bulk_create(request: Request):
+    """Body: JSON list of Patient. All valid items are written in one transaction; returns per-item results."""
+    return await run_in_threadpool(_bulk_create, await request.body())
+
+@app.patch("/patients/bulk")
+async def bulk_update(request: Request):
+    """Body: JSON list of {"id": ..., <PatientUpdate fields>}. Partial updates, one transaction."""
+    return await run_in_threadpool(_bulk_update, await request.body())
+
+@app.delete("/patients/bulk")
+async def bulk_delete(request: Request):
+    """Body: JSON list of patient ids."""
+    return await run_in_threadpool(_bulk_delete, await request.body())
+
 @app.get("/patients/{patient_id}")
 def get_patient(patient_id: str):
-    data = load_data()
-    if patient_id not in data:
+    record = repo.get(patient_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="patient not found")
-    return {"patient_id": patient_id, **data[patient_id]}
+    return {"patient_id": patient_id, **record}
 
 @app.put('/edit/{patient_id}')
 def update_patient(patient_id: str, patient_update: PatientUpdate):
-    data = load_data()
-    if patient_id not in data:
-        raise HTTPException(status_code=404, detail='patient id not in data')
-
-    existing_patient_info = data[patient_id]
     updated_patient_info = patient_update.model_dump(exclude_unset=True)
 
-    # apply partial changes
-    for key, value in updated_patient_info.items():
-        existing_patient_info[key] = value
-
-    # rebuild Patient to recompute bmi/verdict (drop any stale computed fields first)
-    existing_patient_info.pop('bmi', None)
-    existing_patient_info.pop('verdict', None)
-    existing_patient_info['id'] = patient_id
-
-    patient_pydantic_obj = Patient(**existing_patient_info)
-
-    # store back (exclude id; computed fields included, which is fine)
-    data[patient_id] = patient_pydantic_obj.model_dump(exclude={'id'})
-    save_data(data)
+    # read-modify-write happens atomically inside the repository
+    if repo.update(patient_id, lambda record: apply_changes(record, updated_patient_info)) is None:
+        raise HTTPException(status_code=404, detail='patient id not in data')
 
     return JSONResponse(status_code=202, content={'message': 'update patient'})
 
@@ -113,14 +227,7 @@ def update_patient(patient_id: str, patient_update: PatientUpdate):
 @app.delete('/delete/{patient_id}')
 def delete_patient(patient_id: str):
 
-    # load data
-    data = load_data()
-
-    if patient_id not in data:
+    if not repo.delete(patient_id):
         raise HTTPException(status_code=404, detail='Patient not found')
-    
-    del data[patient_id]
-
-    save_data(data)
 
     return JSONResponse(status_code=200, content={'message':'patient deleted'})
@@ -0,0 +1,595 @@
+import bisect
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# a record is the stored patient dict without its id (the id is the key)
+Record = dict
+
+# batch operations for PatientRepository.apply:
+#   ("create", id, record)   -> "created" | "exists"
+#   ("update", id, fn)       -> "updated" | "not_found" | "error" (fn raised; detail is the exception)
+#   ("delete", id, None)     -> "deleted" | "not_found"
+Op = Tuple[str, str, Any]
+OpResult = Tuple[str, Any]
+
+# below this many ids per list, index maintenance uses bisect.insort instead of a merge
+_BULK_MERGE_MIN = 32
+
+AGE_BANDS = ((0, 17, "0-17"), (18, 29, "18-29"), (30, 44, "30-44"), (45, 59, "45-59"), (60, 200, "60+"))
+
+
+def age_band(age: int) -> str:
+    for lo, hi, label in AGE_BANDS:
+        if lo <= age <= hi:
+            return label
+    return "unknown"
+
+
+def stat_keys(record: Record) -> List[Tuple[str, str]]:
+    """(dimension, key) groups a record counts towards; each group keeps a count and a BMI sum."""
+    keys = [("all", "")]
+    if record.get("verdict") is not None:
+        keys.append(("verdict", record["verdict"]))
+    if record.get("city") is not None:
+        keys.append(("city", record["city"]))
+    if record.get("age") is not None:
+        keys.append(("age_band", age_band(record["age"])))
+    return keys
+
+
+class PatientStats:
+    """
+    Incremental aggregates: {(dimension, key): [count, bmi_sum]}. add/remove are O(1) per record,
+    so the counters follow every write and reading them never scans the data.
+    """
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str], List[float]] = {}
+
+    def apply(self, record: Record, sign: int) -> None:
+        bmi = float(record.get("bmi") or 0.0)
+        for key in stat_keys(record):
+            g = self.groups.setdefault(key, [0, 0.0])
+            g[0] += sign
+            g[1] += sign * bmi
+
+    def snapshot(self) -> dict:
+        return stats_snapshot((dim, key, n, bmi_sum) for (dim, key), (n, bmi_sum) in self.groups.items())
+
+
+def stats_snapshot(rows: Iterable[Tuple[str, str, int, float]]) -> dict:
+    out = {"total": 0, "mean_bmi": None, "by_verdict": {}, "by_city": {}, "mean_bmi_by_age_band": {}}
+    for dim, key, n, bmi_sum in rows:
+        if n <= 0:
+            continue
+        if dim == "all":
+            out["total"], out["mean_bmi"] = n, round(bmi_sum / n, 2)
+        elif dim == "verdict":
+            out["by_verdict"][key] = n
+        elif dim == "city":
+            out["by_city"][key] = n
+        elif dim == "age_band":
+            out["mean_bmi_by_age_band"][key] = {"count": n, "mean_bmi": round(bmi_sum / n, 2)}
+    return out
+
+# equality-filterable fields, each backed by a secondary index
+INDEXED_FIELDS = ("city", "gender", "verdict")
+
+
+@dataclass(frozen=True)
+class PatientFilter:
+    city: Optional[str] = None
+    gender: Optional[str] = None
+    verdict: Optional[str] = None
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+
+    def equals(self) -> Dict[str, str]:
+        return {f: getattr(self, f) for f in INDEXED_FIELDS if getattr(self, f) is not None}
+
+    def matches(self, record: Record) -> bool:
+        if any(record.get(f) != v for f, v in self.equals().items()):
+            return False
+        age = record.get("age")
+        if self.min_age is not None and (age is None or age < self.min_age):
+            return False
+        if self.max_age is not None and (age is None or age > self.max_age):
+            return False
+        return True
+
+
+def _insort_unique(ids: List[str], patient_id: str) -> None:
+    i = bisect.bisect_left(ids, patient_id)
+    if i == len(ids) or ids[i] != patient_id:
+        ids.insert(i, patient_id)
+
+
+def _remove_sorted(ids: List[str], patient_id: str) -> None:
+    i = bisect.bisect_left(ids, patient_id)
+    if i < len(ids) and ids[i] == patient_id:
+        del ids[i]
+
+
+def _after(ids: List[str], cursor: Optional[str]) -> Iterator[str]:
+    start = bisect.bisect_right(ids, cursor) if cursor is not None else 0
+    return (ids[i] for i in range(start, len(ids)))
+
+
+class SecondaryIndexes:
+    """
+    Sorted id lists: all ids, one list per (field, value) for INDEXED_FIELDS, and one per age.
+    A query walks the most selective list from the cursor onwards, so a page costs
+    O(log N + page size / selectivity of the remaining predicates), not a full scan.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.by_field: Dict[str, Dict[str, List[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self.by_age: Dict[int, List[str]] = {}
+
+    def rebuild(self, items: Iterator[Tuple[str, Record]]) -> None:
+        # bulk load: append then sort once (per-record insort would be O(N^2) on startup)
+        self.__init__()
+        for patient_id, record in items:
+            self.ids.append(patient_id)
+            for f in INDEXED_FIELDS:
+                if record.get(f) is not None:
+                    self.by_field[f].setdefault(record[f], []).append(patient_id)
+            if record.get("age") is not None:
+                self.by_age.setdefault(record["age"], []).append(patient_id)
+        for ids in [self.ids, *self.by_age.values(), *(l for d in self.by_field.values() for l in d.values())]:
+            ids.sort()
+
+    def _lists_for(self, record: Record, create: bool) -> List[List[str]]:
+        lists = [self.ids]
+        for f in INDEXED_FIELDS:
+            if record.get(f) is not None:
+                if create:
+                    lists.append(self.by_field[f].setdefault(record[f], []))
+                elif record[f] in self.by_field[f]:
+                    lists.append(self.by_field[f][record[f]])
+        age = record.get("age")
+        if age is not None:
+            if create:
+                lists.append(self.by_age.setdefault(age, []))
+            elif age in self.by_age:
+                lists.append(self.by_age[age])
+        return lists
+
+    def _group(self, items: Iterable[Tuple[str, Record]], create: bool) -> Iterator[Tuple[List[str], List[str]]]:
+        groups: Dict[int, Tuple[List[str], List[str]]] = {}
+        for patient_id, record in items:
+            for ids in self._lists_for(record, create):
+                groups.setdefault(id(ids), (ids, []))[1].append(patient_id)
+        return iter(groups.values())
+
+    def add_many(self, items: Iterable[Tuple[str, Record]]) -> None:
+        for ids, new in self._group(items, create=True):
+            if len(new) < _BULK_MERGE_MIN:
+                for patient_id in new:
+                    _insort_unique(ids, patient_id)
+            else:
+                # one O(N + k log k) merge per touched list instead of k O(N) inserts
+                ids[:] = [k for k, _ in itertools.groupby(heapq.merge(ids, sorted(new)))]
+
+    def remove_many(self, items: Iterable[Tuple[str, Record]]) -> None:
+        for ids, gone in self._group(items, create=False):
+            if len(gone) < _BULK_MERGE_MIN:
+                for patient_id in gone:
+                    _remove_sorted(ids, patient_id)
+            else:
+                drop = set(gone)
+                ids[:] = [k for k in ids if k not in drop]
+
+    def candidates(self, flt: PatientFilter, cursor: Optional[str]) -> Iterator[str]:
+        """
+        Ids after cursor, in id order, that may match flt (the caller still checks flt.matches).
+        """
+        sources = [(len(self.ids), lambda: _after(self.ids, cursor))]
+        for f, v in flt.equals().items():
+            ids = self.by_field[f].get(v, [])
+            sources.append((len(ids), lambda ids=ids: _after(ids, cursor)))
+        if flt.min_age is not None or flt.max_age is not None:
+            lo = flt.min_age if flt.min_age is not None else float("-inf")
+            hi = flt.max_age if flt.max_age is not None else float("inf")
+            lists = [ids for age, ids in self.by_age.items() if lo <= age <= hi]
+            sources.append((sum(map(len, lists)), lambda: heapq.merge(*(_after(ids, cursor) for ids in lists))))
+        return min(sources, key=lambda s: s[0])[1]()
+
+
+class PatientRepository(ABC):
+    """
+    Storage interface used by the API. Every method is atomic per record.
+    """
+
+    @abstractmethod
+    def get(self, patient_id: str) -> Optional[Record]: ...
+
+    def create(self, patient_id: str, record: Record) -> bool:
+        """Inserts the record; returns False (and writes nothing) if the id already exists."""
+        return self.apply([("create", patient_id, record)])[0][0] == "created"
+
+    def update(self, patient_id: str, fn: Callable[[Record], Record]) -> Optional[Record]:
+        """Atomically replaces the record with fn(current); returns the new record or None if missing."""
+        status, detail = self.apply([("update", patient_id, fn)])[0]
+        if status == "error":
+            raise detail
+        return detail if status == "updated" else None
+
+    def delete(self, patient_id: str) -> bool:
+        return self.apply([("delete", patient_id, None)])[0][0] == "deleted"
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Aggregates maintained at write time (counts per verdict/city, mean BMI per age band)."""
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, Record]]: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def apply(self, ops: List[Op]) -> List[OpResult]:
+        """
+        Applies ops in order as one transaction (all durable or none) and returns one result per op.
+        Later ops see the effects of earlier ones.
+        """
+
+    @abstractmethod
+    def scan(self, flt: PatientFilter = PatientFilter(), cursor: Optional[str] = None) -> Iterator[Tuple[str, Record]]:
+        """Lazily yields matching (id, record) pairs with id > cursor, in id order."""
+
+    def page(
+        self, flt: PatientFilter = PatientFilter(), cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[Tuple[str, Record]], Optional[str]]:
+        """
+        Returns (rows, next_cursor); next_cursor is None on the last page.
+        """
+        rows = []
+        for row in self.scan(flt, cursor):
+            if len(rows) == limit:
+                return rows, rows[-1][0]
+            rows.append(row)
+        return rows, None
+
+    def __contains__(self, patient_id: str) -> bool:
+        return self.get(patient_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class LogRepository(PatientRepository):
+    """
+    Compacted JSON snapshot + append-only write-ahead log (one JSON line per change).
+    All records live in a dict (the primary-key index), so reads are O(1) and a write is one appended line.
+    After compact_every log lines the snapshot is rewritten and the log truncated.
+    Single process only: run several workers with the sqlite backend instead.
+    """
+
+    def __init__(self, snapshot: Path, wal: Path, compact_every: int = 10_000, fsync: bool = False):
+        self.snapshot = Path(snapshot)
+        self.wal = Path(wal)
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._data: dict = {}
+        self._indexes = SecondaryIndexes()
+        self._stats = PatientStats()
+        self._wal_lines = 0
+
+        if self.snapshot.exists():
+            with open(self.snapshot, "r") as f:
+                self._data = json.load(f)
+        if self.wal.exists():
+            with open(self.wal, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line from a crash mid-append
+                    self._apply([entry], maintain=False)
+                    self._wal_lines += 1
+        self._indexes.rebuild(iter(self._data.items()))
+        for record in self._data.values():
+            self._stats.apply(record, +1)
+        self._log = open(self.wal, "a")
+
+    def _apply(self, entries: List[dict], maintain: bool = True) -> None:
+        """maintain=False (log replay) skips indexes and stats; they are rebuilt once after loading."""
+        before: Dict[str, Optional[Record]] = {}  # indexed state of each touched id before this call
+        for entry in entries:
+            if entry["op"] == "batch":
+                self._apply(entry["entries"], maintain)
+                continue
+            old = self._data.pop(entry["id"], None)
+            before.setdefault(entry["id"], old)
+            if entry["op"] == "put":
+                self._data[entry["id"]] = entry["rec"]
+        if maintain and before:
+            self._indexes.remove_many((pid, rec) for pid, rec in before.items() if rec is not None)
+            self._indexes.add_many((pid, self._data[pid]) for pid in before if pid in self._data)
+            for pid, rec in before.items():
+                if rec is not None:
+                    self._stats.apply(rec, -1)
+                if pid in self._data:
+                    self._stats.apply(self._data[pid], +1)
+
+    def _append(self, entries: List[dict]) -> None:
+        # a multi-entry write is one "batch" line: replay applies all of it or (torn line) none of it
+        line = entries[0] if len(entries) == 1 else {"op": "batch", "entries": entries}
+        self._log.write(json.dumps(line, separators=(",", ":")) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._apply(entries)
+        self._wal_lines += len(entries)
+        if self._wal_lines >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.snapshot.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot)
+        self._log.close()
+        self._log = open(self.wal, "w")
+        self._wal_lines = 0
+
+    def get(self, patient_id: str) -> Optional[Record]:
+        rec = self._data.get(patient_id)
+        return dict(rec) if rec is not None else None
+
+    def apply(self, ops: List[Op]) -> List[OpResult]:
+        with self._lock:
+            view: Dict[str, Optional[Record]] = {}  # effects of earlier ops in this batch
+
+            def current(patient_id: str) -> Optional[Record]:
+                return view[patient_id] if patient_id in view else self._data.get(patient_id)
+
+            entries, results = [], []
+            for kind, patient_id, arg in ops:
+                exists = current(patient_id) is not None
+                if kind == "create":
+                    if exists:
+                        results.append(("exists", None))
+                        continue
+                    view[patient_id] = arg
+                    entries.append({"op": "put", "id": patient_id, "rec": arg})
+                    results.append(("created", arg))
+                elif kind == "update":
+                    if not exists:
+                        results.append(("not_found", None))
+                        continue
+                    try:
+                        new = arg(dict(current(patient_id)))
+                    except Exception as e:
+                        results.append(("error", e))
+                        continue
+                    view[patient_id] = new
+                    entries.append({"op": "put", "id": patient_id, "rec": new})
+                    results.append(("updated", new))
+                elif kind == "delete":
+                    if not exists:
+                        results.append(("not_found", None))
+                        continue
+                    view[patient_id] = None
+                    entries.append({"op": "del", "id": patient_id})
+                    results.append(("deleted", None))
+                else:
+                    raise ValueError(f"unknown op {kind!r}")
+            if entries:
+                self._append(entries)
+            return results
+
+    def items(self) -> Iterator[Tuple[str, Record]]:
+        # iterate over a snapshot of the keys so concurrent writes don't break the iterator
+        for patient_id in list(self._data):
+            rec = self._data.get(patient_id)
+            if rec is not None:
+                yield patient_id, rec
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats.snapshot()
+
+    def scan(self, flt: PatientFilter = PatientFilter(), cursor: Optional[str] = None) -> Iterator[Tuple[str, Record]]:
+        # candidate ids are taken in small batches under the lock; records are read without it
+        while True:
+            with self._lock:
+                batch = []
+                for patient_id in self._indexes.candidates(flt, cursor):
+                    batch.append(patient_id)
+                    if len(batch) == 1000:
+                        break
+            if not batch:
+                return
+            for patient_id in batch:
+                rec = self._data.get(patient_id)
+                if rec is not None and flt.matches(rec):
+                    yield patient_id, rec
+            cursor = batch[-1]
+
+    def close(self) -> None:
+        with self._lock:
+            self._log.close()
+
+
+class SqliteRepository(PatientRepository):
+    """
+    SQLite in WAL mode: readers never block the writer and several API processes can share the file.
+    Updates run read-modify-write inside BEGIN IMMEDIATE, so concurrent writers cannot lose updates.
+    """
+
+    def __init__(self, db_path: Path, seed_from: Optional[Path] = None):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS patients (id TEXT PRIMARY KEY, record TEXT NOT NULL)")
+        # expression indexes: (field, id) so filtered pages stay in id order without a sort
+        for f in INDEXED_FIELDS + ("age",):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS patients_{f} ON patients (json_extract(record, '$.{f}'), id)"
+            )
+
+        # aggregates live in the same database and change in the same transaction as the records
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS patient_stats "
+            "(dim TEXT NOT NULL, key TEXT NOT NULL, n INTEGER NOT NULL, bmi_sum REAL NOT NULL, PRIMARY KEY (dim, key))"
+        )
+
+        # first start: import the legacy JSON file
+        if seed_from is not None and Path(seed_from).exists() and len(self) == 0:
+            with open(seed_from, "r") as f:
+                data = json.load(f)
+            self.apply([("create", pid, rec) for pid, rec in data.items()])
+
+        # databases written before patient_stats existed: build it once from the records
+        with self._lock:
+            has_stats = self._conn.execute("SELECT 1 FROM patient_stats LIMIT 1").fetchone()
+        if not has_stats and len(self):
+            stats = PatientStats()
+            for _, record in self.items():
+                stats.apply(record, +1)
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._write_stats(stats)
+                self._conn.execute("COMMIT")
+
+    def _write_stats(self, delta: PatientStats) -> None:
+        # caller holds the lock inside an open transaction
+        self._conn.executemany(
+            "INSERT INTO patient_stats VALUES (?, ?, ?, ?) ON CONFLICT (dim, key) "
+            "DO UPDATE SET n = n + excluded.n, bmi_sum = bmi_sum + excluded.bmi_sum",
+            ((dim, key, n, bmi_sum) for (dim, key), (n, bmi_sum) in delta.groups.items()),
+        )
+
+    def get(self, patient_id: str) -> Optional[Record]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM patients WHERE id = ?", (patient_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def apply(self, ops: List[Op]) -> List[OpResult]:
+        results = []
+        delta = PatientStats()  # net change to patient_stats, written before COMMIT
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for kind, patient_id, arg in ops:
+                    if kind == "create":
+                        cur = self._conn.execute(
+                            "INSERT OR IGNORE INTO patients VALUES (?, ?)", (patient_id, json.dumps(arg))
+                        )
+                        if cur.rowcount == 1:
+                            delta.apply(arg, +1)
+                            results.append(("created", arg))
+                        else:
+                            results.append(("exists", None))
+                    elif kind == "update":
+                        row = self._conn.execute("SELECT record FROM patients WHERE id = ?", (patient_id,)).fetchone()
+                        if row is None:
+                            results.append(("not_found", None))
+                            continue
+                        old = json.loads(row[0])
+                        try:
+                            new = arg(dict(old))
+                        except Exception as e:
+                            results.append(("error", e))
+                            continue
+                        self._conn.execute("UPDATE patients SET record = ? WHERE id = ?", (json.dumps(new), patient_id))
+                        delta.apply(old, -1)
+                        delta.apply(new, +1)
+                        results.append(("updated", new))
+                    elif kind == "delete":
+                        row = self._conn.execute("SELECT record FROM patients WHERE id = ?", (patient_id,)).fetchone()
+                        if row is None:
+                            results.append(("not_found", None))
+                            continue
+                        self._conn.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
+                        delta.apply(json.loads(row[0]), -1)
+                        results.append(("deleted", None))
+                    else:
+                        raise ValueError(f"unknown op {kind!r}")
+                self._write_stats(delta)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def items(self) -> Iterator[Tuple[str, Record]]:
+        # keyset pages keep memory flat and never hold the lock across a yield
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, record FROM patients WHERE id > ? ORDER BY id LIMIT 1000", (last,)
+                ).fetchall()
+            if not rows:
+                return
+            for pid, rec in rows:
+                yield pid, json.loads(rec)
+            last = rows[-1][0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+
+    def stats(self) -> dict:
+        # a few rows per city/verdict/age band, independent of the number of patients
+        with self._lock:
+            return stats_snapshot(self._conn.execute("SELECT dim, key, n, bmi_sum FROM patient_stats").fetchall())
+
+    def scan(self, flt: PatientFilter = PatientFilter(), cursor: Optional[str] = None) -> Iterator[Tuple[str, Record]]:
+        where, args = ["id > ?"], [cursor or ""]
+        for f, v in flt.equals().items():
+            where.append(f"json_extract(record, '$.{f}') = ?")
+            args.append(v)
+        if flt.min_age is not None:
+            where.append("json_extract(record, '$.age') >= ?")
+            args.append(flt.min_age)
+        if flt.max_age is not None:
+            where.append("json_extract(record, '$.age') <= ?")
+            args.append(flt.max_age)
+        sql = f"SELECT id, record FROM patients WHERE {' AND '.join(where)} ORDER BY id LIMIT 1000"
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, args).fetchall()
+            if not rows:
+                return
+            for pid, rec in rows:
+                yield pid, json.loads(rec)
+            args[0] = rows[-1][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_repository(data_dir: Path) -> PatientRepository:
+    """
+    PATIENT_STORE=log (default) or sqlite. Both start from patients.json when it exists.
+    """
+    data_dir = Path(data_dir)
+    backend = os.environ.get("PATIENT_STORE", "log").lower()
+    if backend == "sqlite":
+        return SqliteRepository(data_dir / "patients.sqlite3", seed_from=data_dir / "patients.json")
+    if backend == "log":
+        return LogRepository(data_dir / "patients.json", data_dir / "patients.wal")
+    raise ValueError(f"unknown PATIENT_STORE backend: {backend!r}")
@@ -2,15 +2,38 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, computed_field, field_validator
 from typing import Literal, Annotated
+import os
 import pickle
+import threading
+import time
+from collections import OrderedDict
+import joblib
 import pandas as pd
 
 # import the ml model
-with open('model.pkl', 'rb') as f:
-    model = pickle.load(f)
+# model.joblib (an uncompressed joblib.dump of the same model) is memory-mapped, so uvicorn workers
+# share its arrays through the page cache instead of each unpickling a private copy
+if os.path.exists('model.joblib'):
+    model = joblib.load('model.joblib', mmap_mode='r')
+else:
+    with open('model.pkl', 'rb') as f:
+        model = pickle.load(f)
 
 app = FastAPI()
 
+# prediction cache: requests with the same derived features get the same answer from the model.
+# Keyed on the canonical feature tuple; bmi/income are rounded to CACHE_BMI_DECIMALS/CACHE_INCOME_DECIMALS
+# (lower = coarser buckets, more hits, slightly approximate). The cache lives in the process,
+# so loading a new model (restart) always starts from an empty cache.
+CACHE_SIZE = int(os.environ.get('PREDICT_CACHE_SIZE', '100000'))
+CACHE_TTL_S = float(os.environ.get('PREDICT_CACHE_TTL_S', '3600'))
+CACHE_BMI_DECIMALS = int(os.environ.get('PREDICT_CACHE_BMI_DECIMALS', '6'))
+CACHE_INCOME_DECIMALS = int(os.environ.get('PREDICT_CACHE_INCOME_DECIMALS', '6'))
+
+cache = OrderedDict()
+cache_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
 tier_1_cities = ["Mumbai", "Delhi", "Bangalore", "Chennai", "Kolkata", "Hyderabad", "Pune"]
 tier_2_cities = [
     "Jaipur", "Chandigarh", "Indore", "Lucknow", "Patna", "Ranchi", "Visakhapatnam", "Coimbatore",
@@ -69,9 +92,27 @@ class UserInput(BaseModel):
         else:
             return 3
 
+def cache_key(data: UserInput) -> tuple:
+    return (round(data.bmi, CACHE_BMI_DECIMALS), data.age_group, data.lifestyle_risk, data.city_tier,
+            round(data.income_lpa, CACHE_INCOME_DECIMALS), data.occupation)
+
+@app.get('/metrics')
+def metrics():
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    return {**cache_stats, 'size': len(cache), 'hit_rate': round(cache_stats['hits'] / lookups, 4) if lookups else 0.0}
+
 @app.post('/predict')
 def predict_premium(data: UserInput):
 
+    key = cache_key(data)
+    with cache_lock:
+        entry = cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            cache.move_to_end(key)
+            cache_stats['hits'] += 1
+            return JSONResponse(status_code=200, content={'predicted_category': entry[1]})
+        cache_stats['misses'] += 1
+
     input_df = pd.DataFrame([{
         'bmi': data.bmi,
         'age_group': data.age_group,
@@ -83,6 +124,14 @@ def predict_premium(data: UserInput):
 
     prediction = model.predict(input_df)[0]
 
+    if CACHE_SIZE > 0:
+        with cache_lock:
+            cache[key] = (time.monotonic() + CACHE_TTL_S, prediction)
+            cache.move_to_end(key)
+            while len(cache) > CACHE_SIZE:
+                cache.popitem(last=False)
+                cache_stats['evictions'] += 1
+
     return JSONResponse(status_code=200, content={'predicted_category': prediction})
 
 
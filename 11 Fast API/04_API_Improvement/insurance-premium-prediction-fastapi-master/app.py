@@ -1,11 +1,49 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from schema.user_input import UserInput
 from schema.prediction_response import PredictionResponse
-from model.predict import predict_output, model, MODEL_VERSION
+from schema.batch_input import read_columns, validate_columns
+from schema.routing import RoutingUpdate
+from model.predict import predict_routed, predict_columns, registry
+from model.batcher import MicroBatcher
+from model.cache import PredictionCache
+from model.features import RAW_COLUMNS, MODEL_COLUMNS, derive_features
+import json
+import os
 
 app = FastAPI()
 
+# concurrent /predict calls are scored together: one DataFrame, one feature derivation
+# and one predict_proba per batch
+batcher = MicroBatcher(
+    predict_routed,
+    max_batch=int(os.environ.get('PREDICT_MAX_BATCH', '64')),
+    max_wait_ms=float(os.environ.get('PREDICT_MAX_WAIT_MS', '2')),
+)
+
+# applicants with the same derived features get the same prediction; PREDICT_CACHE_SIZE=0 disables the cache
+cache = PredictionCache(
+    maxsize=int(os.environ.get('PREDICT_CACHE_SIZE', '100000')),
+    ttl_s=float(os.environ.get('PREDICT_CACHE_TTL_S', '3600')),
+    bmi_step=float(os.environ['PREDICT_CACHE_BMI_STEP']) if os.environ.get('PREDICT_CACHE_BMI_STEP') else None,
+    income_step=float(os.environ['PREDICT_CACHE_INCOME_STEP']) if os.environ.get('PREDICT_CACHE_INCOME_STEP') else None,
+)
+cached_routing = None
+
+@app.on_event('startup')
+async def start_batcher():
+    await batcher.start()
+    # warm the routed versions so the first request does not pay for unpickling
+    try:
+        await run_in_threadpool(registry.resolve)
+    except KeyError:
+        pass
+
+@app.on_event('shutdown')
+async def stop_batcher():
+    await batcher.stop()
+
 # human readable       
 @app.get('/')
 def home():
@@ -14,27 +52,81 @@ def home():
 # machine readable
 @app.get('/health')
 def health_check():
+    routing = registry.routing()
+    resident = registry.resident()
     return {
         'status': 'OK',
-        'version': MODEL_VERSION,
-        'model_loaded': model is not None
+        'version': routing.get('stable'),
+        'canary': routing.get('canary'),
+        'canary_percent': routing.get('canary_percent', 0),
+        'model_loaded': any(m['version'] == routing.get('stable') for m in resident),
+        'resident_models': resident
     }
 
+@app.get('/models')
+def list_models():
+    return {'versions': registry.versions(), 'routing': registry.routing(), 'resident_models': registry.resident()}
+
+@app.put('/models/routing')
+async def update_routing(update: RoutingUpdate):
+
+    # new versions are loaded before routing.json is swapped, so traffic never waits on a cold load;
+    # other workers pick the file up within a second
+    try:
+        routing = await run_in_threadpool(registry.set_routing, update.stable, update.canary, update.canary_percent)
+    except KeyError as e:
+        return JSONResponse(status_code=404, content={'detail': str(e)})
+    return {'routing': routing, 'resident_models': registry.resident()}
+
+async def resolve_model(version, routing_key):
+    # an explicit version (query or X-Model-Version header) wins; otherwise stable/canary routing,
+    # sticky per X-Routing-Key. A resident version is returned directly; only a cold version is
+    # unpickled in the thread pool, off the event loop.
+    name = registry.route(version, routing_key)
+    loaded = registry.peek(name)
+    if loaded is None:
+        loaded = await run_in_threadpool(registry.get, name)
+    return loaded
+
+def follow_routing():
+    # routing.json changed (here or in another worker): drop cached predictions of versions no longer routed
+    global cached_routing
+    routing = registry.routing()
+    if routing is not cached_routing:
+        if cached_routing is not None:
+            cache.retain(filter(None, (routing.get('stable'), routing.get('canary'))))
+        cached_routing = routing
+
+@app.get('/metrics')
+def metrics():
+    return {'batching': batcher.stats(), 'cache': cache.stats()}
+
 @app.post('/predict', response_model=PredictionResponse)
-def predict_premium(data: UserInput):
-
-    user_input = {
-        'bmi': data.bmi,
-        'age_group': data.age_group,
-        'lifestyle_risk': data.lifestyle_risk,
-        'city_tier': data.city_tier,
-        'income_lpa': data.income_lpa,
-        'occupation': data.occupation
-    }
+async def predict_premium(
+    data: UserInput,
+    version: str | None = None,
+    x_model_version: str | None = Header(None),
+    x_routing_key: str | None = Header(None),
+):
+
+    # raw fields only: bmi/age_group/lifestyle_risk/city_tier are derived per batch by model.features
+    user_input = data.model_dump(include=set(RAW_COLUMNS))
 
     try:
+        loaded = await resolve_model(version or x_model_version, x_routing_key)
+    except KeyError as e:
+        return JSONResponse(status_code=404, content={'detail': str(e)})
 
-        prediction = predict_output(user_input)
+    follow_routing()
+    features = data.model_dump(include=set(MODEL_COLUMNS))
+    prediction = cache.get(loaded, features)
+    if prediction is not None:
+        return JSONResponse(status_code=200, content={'response': prediction})
+
+    try:
+
+        prediction = await batcher.submit((loaded, user_input))
+        cache.put(loaded, features, prediction)
 
         return JSONResponse(status_code=200, content={'response': prediction})
     
@@ -44,5 +136,51 @@ def predict_premium(data: UserInput):
 
 
 
+def score_columns(loaded, df):
+    return predict_columns(loaded, derive_features(df))
+
+def stream_columns(loaded, df, chunk_size: int):
+    # one NDJSON line per chunk of rows, each holding the same columns as the non-streamed response
+    for offset in range(0, len(df), chunk_size):
+        chunk = score_columns(loaded, df.iloc[offset:offset + chunk_size])
+        yield json.dumps({'offset': offset, **chunk}) + '\n'
+
+@app.post('/predict/batch')
+async def predict_premium_batch(
+    request: Request,
+    stream: bool = False,
+    chunk_size: int = Query(10_000, ge=1, le=100_000),
+    version: str | None = None,
+    x_model_version: str | None = Header(None),
+    x_routing_key: str | None = Header(None),
+):
+    """
+    Body: columnar JSON ({"age": [...], "weight": [...], ...}), an Arrow IPC stream/file or a Parquet file,
+    selected by Content-Type. Features are derived column-wise and the whole batch is scored at once.
+    Returns predicted_category, confidence and class_probabilities as columns; stream=true sends them
+    back as NDJSON chunks of chunk_size rows. The whole batch is scored by one model version
+    (routed like /predict) and the response names it in model_version.
+    """
+    content_type = request.headers.get('content-type', 'application/json').split(';')[0].strip().lower()
+    try:
+        df = await run_in_threadpool(read_columns, await request.body(), content_type)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={'detail': str(e)})
 
+    errors = validate_columns(df)
+    if errors:
+        return JSONResponse(status_code=422, content={'detail': errors})
 
+    try:
+        loaded = await resolve_model(version or x_model_version, x_routing_key)
+    except KeyError as e:
+        return JSONResponse(status_code=404, content={'detail': str(e)})
+
+    if stream:
+        return StreamingResponse(stream_columns(loaded, df, chunk_size), media_type='application/x-ndjson')
+
+    try:
+        result = await run_in_threadpool(score_columns, loaded, df)
+        return JSONResponse(status_code=200, content={'rows': len(df), **result})
+    except Exception as e:
+        return JSONResponse(status_code=500, content=str(e))
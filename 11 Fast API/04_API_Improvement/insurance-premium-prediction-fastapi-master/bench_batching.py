@@ -0,0 +1,72 @@
+# bench_batching.py — /predict throughput with and without micro-batching under concurrent load
+#
+# Run from this directory:  python bench_batching.py --requests 5000 --concurrency 256
+# Drives the ASGI app in-process through httpx (no network), so the numbers isolate the server side.
+# The prediction cache is disabled: every request is scored by the model.
+
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app import app, batcher, cache
+
+CITIES = ["Mumbai", "Delhi", "Jaipur", "Indore", "Noida", "Shimla", "Ooty", "Pune"]
+OCCUPATIONS = ['retired', 'freelancer', 'student', 'government_job', 'business_owner', 'unemployed', 'private_job']
+
+
+def payload(rng: random.Random) -> dict:
+    return {
+        'age': rng.randint(18, 80), 'weight': round(rng.uniform(45, 120), 1), 'height': round(rng.uniform(1.5, 1.95), 2),
+        'income_lpa': round(rng.uniform(1, 50), 1), 'smoker': rng.random() < 0.2,
+        'city': rng.choice(CITIES), 'occupation': rng.choice(OCCUPATIONS),
+    }
+
+
+async def run(n: int, concurrency: int) -> tuple:
+    rng = random.Random(0)
+    bodies = [payload(rng) for _ in range(n)]
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def one(body):
+            async with sem:
+                t0 = time.perf_counter()
+                resp = await client.post('/predict', json=body)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                resp.raise_for_status()
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(b) for b in bodies))
+        elapsed = time.perf_counter() - t0
+    await batcher.stop()
+    latencies.sort()
+    return n / elapsed, latencies[len(latencies) // 2], latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--requests', type=int, default=5000)
+    ap.add_argument('--concurrency', type=int, default=256)
+    ap.add_argument('--max-batch', type=int, default=64)
+    ap.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = ap.parse_args()
+
+    # both passes send the same bodies: with the prediction cache on, the second pass would be served
+    # from it and never reach the batcher
+    cache.maxsize = 0
+
+    for label, max_batch, max_wait_ms in (('no batching', 1, 0.0), ('micro-batching', args.max_batch, args.max_wait_ms)):
+        batcher.max_batch, batcher.max_wait_s = max_batch, max_wait_ms / 1000
+        batcher.batch_sizes.clear()
+        rps, p50, p99 = asyncio.run(run(args.requests, args.concurrency))
+        stats = batcher.stats()
+        print(f'{label:<15} {rps:8.0f} req/s   p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   '
+              f'mean batch {stats["mean_batch_size"]:6.1f}   p95 batch {stats["p95_batch_size"]}')
+
+
+if __name__ == '__main__':
+    main()
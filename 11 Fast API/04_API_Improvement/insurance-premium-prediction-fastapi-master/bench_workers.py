@@ -0,0 +1,101 @@
+# bench_workers.py — model startup time and per-worker memory for 1, 4 and 16 worker processes
+#
+# Run from this directory (Linux; reads /proc/self/smaps_rollup):  python bench_workers.py --version 1.0.0
+# Modes:
+#   pickle   every worker unpickles model.pkl (what uvicorn --workers N did before)
+#   mmap     every worker loads model.joblib with mmap_mode='r' (written on the fly if missing)
+#   preload  the parent loads model.pkl once and forks the workers (gunicorn --preload), pages shared copy-on-write
+# RSS counts shared pages in every process; PSS splits them between the processes sharing them, so
+# sum(PSS) is what the workers really cost together.
+
+import argparse
+import multiprocessing as mp
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from model.artifact import load_artifact, save_artifact
+from model.features import derive_features
+
+SAMPLE = pd.DataFrame([
+    {'age': 30, 'weight': 70.0, 'height': 1.75, 'income_lpa': 10.0, 'smoker': False, 'city': 'Mumbai', 'occupation': 'private_job'},
+    {'age': 61, 'weight': 95.0, 'height': 1.65, 'income_lpa': 3.0, 'smoker': True, 'city': 'Ooty', 'occupation': 'retired'},
+])
+
+_preloaded = None
+
+
+def memory_kb() -> dict:
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                fields[key.lower()] = int(rest.split()[0])
+    return fields
+
+
+def worker(mode: str, path: str, loaded, done, out) -> None:
+    t0 = time.perf_counter()
+    model = _preloaded if mode == 'preload' else load_artifact(path, mmap=(mode == 'mmap'))
+    model.predict_proba(derive_features(SAMPLE))  # touch the model the way a first request would
+    load_s = time.perf_counter() - t0
+    loaded.wait()  # measure once every worker is up, so shared pages are counted for all of them
+    out.put({'load_s': load_s, **memory_kb()})
+    done.wait()
+
+
+def run(mode: str, path: Path, workers: int) -> dict:
+    global _preloaded
+    ctx = mp.get_context('fork' if mode == 'preload' else 'spawn')
+    t0 = time.perf_counter()
+    if mode == 'preload':
+        _preloaded = load_artifact(path, mmap=False)
+    loaded, done, out = ctx.Barrier(workers + 1), ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, str(path), loaded, done, out)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    loaded.wait()
+    ready_s = time.perf_counter() - t0
+    results = [out.get() for _ in procs]
+    done.set()
+    for p in procs:
+        p.join()
+    _preloaded = None
+    return {
+        'ready_s': ready_s,
+        'load_s': statistics.mean(r['load_s'] for r in results),
+        'rss_mb': statistics.mean(r['rss'] for r in results) / 1024,
+        'pss_mb': statistics.mean(r['pss'] for r in results) / 1024,
+        'total_pss_mb': sum(r['pss'] for r in results) / 1024,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--version', default='1.0.0')
+    ap.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    ap.add_argument('--modes', nargs='+', default=['pickle', 'mmap', 'preload'])
+    args = ap.parse_args()
+
+    version_dir = Path('model/versions') / args.version
+    pkl, joblib_path = version_dir / 'model.pkl', version_dir / 'model.joblib'
+    if 'mmap' in args.modes and not joblib_path.exists():
+        save_artifact(load_artifact(pkl), joblib_path)
+        print(f'wrote {joblib_path}')
+    print(f'model.pkl {pkl.stat().st_size / 1e6:.1f} MB   model.joblib '
+          f'{joblib_path.stat().st_size / 1e6 if joblib_path.exists() else 0:.1f} MB   python {sys.version.split()[0]}\n')
+
+    for n in args.workers:
+        for mode in args.modes:
+            r = run(mode, joblib_path if mode == 'mmap' else pkl, n)
+            print(f'{n:>2} workers  {mode:<8} all ready {r["ready_s"]:6.2f} s   model load {r["load_s"] * 1000:7.1f} ms/worker   '
+                  f'RSS {r["rss_mb"]:6.1f} MB/worker   PSS {r["pss_mb"]:6.1f} MB/worker   total PSS {r["total_pss_mb"]:7.1f} MB')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import pickle
+import sys
+from pathlib import Path
+import joblib
+
+# Model artifacts on disk:
+#   model.joblib  uncompressed joblib dump; its NumPy arrays are stored aligned in the file and loaded with
+#                 mmap_mode='r', so every worker maps the same page-cache pages instead of holding a private copy
+#   model.pkl     plain pickle (the original format), fully deserialized into each worker
+# load_artifact prefers model.joblib when a directory holds both.
+ARTIFACT_NAMES = ('model.joblib', 'model.pkl')
+
+
+def find_artifact(directory: Path):
+    for name in ARTIFACT_NAMES:
+        path = Path(directory) / name
+        if path.exists():
+            return path
+    return None
+
+
+def save_artifact(model, path: Path) -> Path:
+    # compress=0 keeps the arrays mappable; compressed dumps are always read into memory
+    path = Path(path)
+    joblib.dump(model, path, compress=0)
+    return path
+
+
+def load_artifact(path: Path, mmap: bool = True):
+    path = Path(path)
+    if path.suffix == '.joblib':
+        return joblib.load(path, mmap_mode='r' if mmap else None)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def convert(pkl_path: Path) -> Path:
+    # writes model.joblib next to an existing model.pkl
+    pkl_path = Path(pkl_path)
+    return save_artifact(load_artifact(pkl_path), pkl_path.with_name('model.joblib'))
+
+
+if __name__ == '__main__':
+    # python -m model.artifact model/versions/*/model.pkl
+    for arg in sys.argv[1:]:
+        print(f'{arg} -> {convert(arg)}')
@@ -0,0 +1,103 @@
+import asyncio
+from collections import Counter
+from typing import Any, Callable, List, Optional
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one model call.
+
+    The first queued request opens a batch; the batch is closed after max_wait_ms or once it holds
+    max_batch rows, and predict_fn(rows) runs in a worker thread so the event loop keeps accepting
+    requests (which then form the next batch).
+    """
+
+    def __init__(self, predict_fn: Callable[[List[dict]], List[Any]], max_batch: int = 64, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1000
+        self.batch_sizes: Counter = Counter()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, row: dict) -> Any:
+        await self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, fut))
+        return await fut
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # requests whose client already went away are dropped before scoring
+            batch = [(row, fut) for row, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            self.batch_sizes[len(batch)] += 1
+            try:
+                results = await loop.run_in_executor(None, self.predict_fn, [row for row, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        rows = sum(size * n for size, n in self.batch_sizes.items())
+
+        def percentile(q: float) -> int:
+            seen = 0
+            for size in sorted(self.batch_sizes):
+                seen += self.batch_sizes[size]
+                if seen >= q * batches:
+                    return size
+            return 0
+
+        return {
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait_s * 1000,
+            'batches': batches,
+            'rows': rows,
+            'mean_batch_size': round(rows / batches, 2) if batches else 0.0,
+            'p50_batch_size': percentile(0.5),
+            'p95_batch_size': percentile(0.95),
+            'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+        }
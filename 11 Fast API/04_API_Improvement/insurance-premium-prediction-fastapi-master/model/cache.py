@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of /predict results keyed on (model version, derived features).
+
+    The model only sees bmi, age_group, lifestyle_risk, city_tier, income_lpa and occupation, so applicants
+    whose derived features match get the same prediction. bmi and income_lpa are continuous: by default they
+    are only rounded to 6 decimals (exact matches); bmi_step / income_step bucket them (e.g. 0.1 and 0.5)
+    for more hits, at the cost of returning the prediction of a neighbour within the same bucket.
+
+    Entries of a version are dropped when that version is reloaded as a different model object or
+    when it stops being routed (retain).
+    """
+
+    def __init__(self, maxsize: int = 100_000, ttl_s: float = 3600.0,
+                 bmi_step: Optional[float] = None, income_step: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.bmi_step = bmi_step
+        self.income_step = income_step
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._owners: dict = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @staticmethod
+    def _canonical(value: float, step: Optional[float]):
+        return round(value / step) if step else round(value, 6)
+
+    def key(self, features: dict) -> tuple:
+        return (
+            self._canonical(features['bmi'], self.bmi_step),
+            features['age_group'],
+            features['lifestyle_risk'],
+            int(features['city_tier']),
+            self._canonical(features['income_lpa'], self.income_step),
+            features['occupation'],
+        )
+
+    def _claim(self, loaded) -> None:
+        # a version republished and reloaded is a new model object: its old entries are stale
+        owner = self._owners.get(loaded.version)
+        if owner is not loaded.model:
+            if owner is not None:
+                self._drop(lambda version: version == loaded.version)
+            self._owners[loaded.version] = loaded.model
+
+    def _drop(self, predicate) -> None:
+        stale = [k for k in self._entries if predicate(k[0])]
+        for k in stale:
+            del self._entries[k]
+        self.invalidations += len(stale)
+
+    def get(self, loaded, features: dict) -> Any:
+        if self.maxsize <= 0:
+            return None
+        k = (loaded.version, self.key(features))
+        now = time.monotonic()
+        with self._lock:
+            self._claim(loaded)
+            entry = self._entries.get(k)
+            if entry is not None:
+                expires, value = entry
+                if expires > now:
+                    self._entries.move_to_end(k)
+                    self.hits += 1
+                    return value
+                del self._entries[k]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, loaded, features: dict, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        k = (loaded.version, self.key(features))
+        with self._lock:
+            self._claim(loaded)
+            self._entries[k] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def retain(self, versions: Iterable[str]) -> None:
+        # called when routing changes: versions no longer served by default are invalidated
+        keep = set(versions)
+        with self._lock:
+            self._drop(lambda version: version not in keep)
+            for version in [v for v in self._owners if v not in keep]:
+                del self._owners[version]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'maxsize': self.maxsize,
+            'ttl_s': self.ttl_s,
+            'bmi_step': self.bmi_step,
+            'income_step': self.income_step,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
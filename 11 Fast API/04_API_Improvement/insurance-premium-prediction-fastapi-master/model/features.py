@@ -0,0 +1,73 @@
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from config.city_tier import tier_1_cities, tier_2_cities
+
+# raw applicant columns accepted by /predict and /predict/batch, and the feature columns the pipeline was trained on
+RAW_COLUMNS = ['age', 'weight', 'height', 'income_lpa', 'smoker', 'city', 'occupation']
+MODEL_COLUMNS = ['bmi', 'age_group', 'lifestyle_risk', 'city_tier', 'income_lpa', 'occupation']
+
+# city -> tier, built once from config/city_tier.py (O(1) lookups instead of scanning the lists); read-only
+CITY_TIERS = MappingProxyType({**{c: 2 for c in tier_2_cities}, **{c: 1 for c in tier_1_cities}})
+DEFAULT_TIER = 3
+
+# upper bounds (exclusive) for age groups; anything older is 'senior'
+AGE_GROUPS = ((25, 'young'), (45, 'adult'), (60, 'middle_aged'))
+
+
+@lru_cache(maxsize=4096)
+def normalize_city(city: str) -> str:
+    # the same few hundred spellings repeat across requests, so cache them
+    return city.strip().title()
+
+
+@lru_cache(maxsize=4096)
+def city_tier(city: str) -> int:
+    return CITY_TIERS.get(normalize_city(city), DEFAULT_TIER)
+
+
+def bmi(weight: float, height: float) -> float:
+    return weight / (height ** 2)
+
+
+def lifestyle_risk(smoker: bool, bmi_value: float) -> str:
+    if smoker and bmi_value > 30:
+        return 'high'
+    elif smoker or bmi_value > 27:
+        return 'medium'
+    return 'low'
+
+
+def age_group(age: int) -> str:
+    for upper, label in AGE_GROUPS:
+        if age < upper:
+            return label
+    return 'senior'
+
+
+def derive_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized derivation of bmi, lifestyle_risk, age_group and city_tier for a whole frame of RAW_COLUMNS
+    (the same rules as the scalar helpers above). Used by /predict (per micro-batch) and /predict/batch;
+    returns a frame with MODEL_COLUMNS.
+    """
+    age = df['age'].to_numpy()
+    smoker = df['smoker'].to_numpy(dtype=bool)
+    bmi_values = df['weight'].to_numpy(dtype='float64') / df['height'].to_numpy(dtype='float64') ** 2
+
+    risk = np.select([smoker & (bmi_values > 30), smoker | (bmi_values > 27)], ['high', 'medium'], 'low')
+    groups = np.select([age < upper for upper, _ in AGE_GROUPS], [label for _, label in AGE_GROUPS], 'senior')
+
+    # each distinct spelling is normalized and looked up once, then broadcast back to its rows
+    codes, uniques = pd.factorize(df['city'].astype(str))
+    tiers = np.fromiter((city_tier(c) for c in uniques), dtype='int64', count=len(uniques))[codes]
+
+    return pd.DataFrame({
+        'bmi': bmi_values,
+        'age_group': groups,
+        'lifestyle_risk': risk,
+        'city_tier': tiers,
+        'income_lpa': df['income_lpa'].to_numpy(dtype='float64'),
+        'occupation': df['occupation'].to_numpy(),
+    }, index=df.index)
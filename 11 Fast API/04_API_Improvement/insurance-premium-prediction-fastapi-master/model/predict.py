@@ -1,32 +1,77 @@
-import pickle
+import os
+import numpy as np
 import pandas as pd
+from model.features import RAW_COLUMNS, derive_features
+from model.registry import LoadedModel, ModelRegistry
 
-# import the ml model
-with open('model/model.pkl', 'rb') as f:
-    model = pickle.load(f)
+# versioned models live in model/versions/<version>/model.pkl and are loaded on first use;
+# model/versions/routing.json picks the stable (and optional canary) version
+registry = ModelRegistry(
+    os.environ.get('MODEL_REGISTRY_DIR', 'model/versions'),
+    max_resident=int(os.environ.get('MODEL_MAX_RESIDENT', '2')),
+    mmap=os.environ.get('MODEL_MMAP', '1') != '0',
+)
 
-# MLFlow
-MODEL_VERSION = '1.0.0'
+def predict_frame(loaded: LoadedModel, df: pd.DataFrame):
 
-# Get class labels from model (important for matching probabilities to class names)
-class_labels = model.classes_.tolist()
+    # one predict_proba pass for the whole frame; the class is the argmax
+    # (same as model.predict, without running the pipeline a second time)
+    probabilities = loaded.model.predict_proba(df)
+    return probabilities.argmax(axis=1), probabilities
 
-def predict_output(user_input: dict):
+def predict_columns(loaded: LoadedModel, df: pd.DataFrame) -> dict:
 
-    df = pd.DataFrame([user_input])
+    class_labels = loaded.class_labels
+    best, probabilities = predict_frame(loaded, df)
+    return {
+        "model_version": loaded.version,
+        "predicted_category": np.asarray(class_labels, dtype=object)[best].tolist(),
+        "confidence": probabilities.max(axis=1).round(4).tolist(),
+        "class_probabilities": {label: probabilities[:, i].round(4).tolist() for i, label in enumerate(class_labels)}
+    }
 
-    # Predict the class
-    predicted_class = model.predict(df)[0]
+def predict_rows(loaded: LoadedModel, df: pd.DataFrame) -> list[dict]:
 
-    # Get probabilities for all classes
-    probabilities = model.predict_proba(df)[0]
-    confidence = max(probabilities)
-    
-    # Create mapping: {class_name: probability}
-    class_probs = dict(zip(class_labels, map(lambda p: round(p, 4), probabilities)))
+    class_labels = loaded.class_labels
+    best, probabilities = predict_frame(loaded, df)
 
-    return {
-        "predicted_category": predicted_class,
-        "confidence": round(confidence, 4),
-        "class_probabilities": class_probs
-    }
+    results = []
+    for idx, probs in zip(best.tolist(), probabilities.tolist()):
+        results.append({
+            "predicted_category": class_labels[idx],
+            "confidence": round(probs[idx], 4),
+            # Create mapping: {class_name: probability}
+            "class_probabilities": dict(zip(class_labels, map(lambda p: round(p, 4), probs))),
+            "model_version": loaded.version
+        })
+    return results
+
+def predict_batch(loaded: LoadedModel, rows: list[dict]) -> list[dict]:
+
+    # rows of already-derived model features
+    return predict_rows(loaded, pd.DataFrame.from_records(rows))
+
+def predict_applicants(loaded: LoadedModel, rows: list[dict]) -> list[dict]:
+
+    # rows of raw applicant fields; features are derived column-wise for the whole batch
+    return predict_rows(loaded, derive_features(pd.DataFrame.from_records(rows, columns=RAW_COLUMNS)))
+
+def predict_routed(items: list[tuple]) -> list[dict]:
+
+    # (loaded_model, raw_row) pairs from the micro-batcher; a batch can mix versions while a canary
+    # is live, so rows are scored once per version and put back in request order
+    by_version = {}
+    for i, (loaded, row) in enumerate(items):
+        by_version.setdefault(loaded.version, (loaded, [], []))
+        by_version[loaded.version][1].append(i)
+        by_version[loaded.version][2].append(row)
+
+    results = [None] * len(items)
+    for loaded, positions, rows in by_version.values():
+        for i, result in zip(positions, predict_applicants(loaded, rows)):
+            results[i] = result
+    return results
+
+def predict_output(user_input: dict, version: str | None = None):
+
+    return predict_batch(registry.resolve(version), [user_input])[0]
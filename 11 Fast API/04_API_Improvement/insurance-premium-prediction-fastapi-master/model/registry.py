@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+from model.artifact import ARTIFACT_NAMES, find_artifact, load_artifact
+
+# On-disk layout (one directory per version, never modified after publishing):
+#   <root>/<version>/model.joblib   or model.pkl (see model/artifact.py; model.joblib is memory-mapped)
+#   <root>/<version>/meta.json      optional: {"created": ..., "notes": ...}
+#   <root>/routing.json             {"stable": "1.0.0", "canary": null, "canary_percent": 0}
+# Editing routing.json (or calling set_routing) switches versions in every worker without a restart.
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    model: Any
+    class_labels: list
+    load_seconds: float
+    artifact: str = 'model.pkl'
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+
+
+class ModelRegistry:
+    """
+    Versioned models loaded lazily on first use and kept in an LRU of max_resident versions
+    (the routed stable/canary versions are never evicted).
+    Requests hold a reference to the LoadedModel they were routed to, so swapping or evicting a version
+    never affects a prediction that is already running.
+    """
+
+    def __init__(self, root: Path, max_resident: int = 2, routing_check_s: float = 1.0, mmap: bool = True):
+        self.root = Path(root)
+        self.max_resident = max_resident
+        self.mmap = mmap
+        self.routing_check_s = routing_check_s
+        self._resident: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict = {}
+        self._routing: dict = {}
+        self._routing_mtime = None
+        self._routing_checked = 0.0
+
+    # ---------- versions ----------
+
+    def versions(self) -> list:
+        return sorted({p.parent.name for name in ARTIFACT_NAMES for p in self.root.glob(f'*/{name}')})
+
+    def _artifact(self, version: str) -> Path:
+        path = find_artifact(self.root / version) if Path(version).name == version else None
+        if path is None:
+            raise KeyError(f'unknown model version {version!r}')
+        return path
+
+    def _load(self, version: str, path: Path) -> LoadedModel:
+        t0 = time.perf_counter()
+        model = load_artifact(path, mmap=self.mmap)
+        # Get class labels from model (important for matching probabilities to class names)
+        return LoadedModel(version, model, model.classes_.tolist(), time.perf_counter() - t0, path.name)
+
+    def peek(self, version: str) -> Optional[LoadedModel]:
+        """
+        The resident model for version, or None when it still has to be loaded. Lock-free (a dict lookup),
+        so the event loop can serve resident versions without a thread hop.
+        """
+        loaded = self._resident.get(version)
+        if loaded is not None:
+            loaded.last_used = time.time()
+        return loaded
+
+    def get(self, version: str) -> LoadedModel:
+        with self._lock:
+            loaded = self._resident.get(version)
+            if loaded is not None:
+                self._resident.move_to_end(version)
+                loaded.last_used = time.time()
+                return loaded
+
+        # unknown versions raise here, before they get a load lock (request headers pick the version)
+        path = self._artifact(version)
+        with self._lock:
+            load_lock = self._load_locks.setdefault(version, threading.Lock())
+
+        # one loader per version; other versions keep serving meanwhile
+        with load_lock:
+            with self._lock:
+                if version in self._resident:
+                    return self._resident[version]
+            loaded = self._load(version, path)
+            with self._lock:
+                self._resident[version] = loaded
+                pinned = {self._routing.get('stable'), self._routing.get('canary'), version}
+                # least recently used by last_used, which peek() also updates
+                for old in sorted(self._resident.values(), key=lambda m: m.last_used):
+                    if len(self._resident) <= self.max_resident:
+                        break
+                    if old.version not in pinned:
+                        del self._resident[old.version]
+            return loaded
+
+    def resident(self) -> list:
+        with self._lock:
+            return [
+                {
+                    'version': m.version,
+                    'load_seconds': round(m.load_seconds, 4),
+                    'artifact': m.artifact,
+                    'loaded_at': m.loaded_at,
+                    'last_used': m.last_used,
+                }
+                for m in self._resident.values()
+            ]
+
+    # ---------- routing ----------
+
+    def routing(self) -> dict:
+        now = time.monotonic()
+        if now - self._routing_checked >= self.routing_check_s:
+            self._routing_checked = now
+            path = self.root / 'routing.json'
+            try:
+                mtime = path.stat().st_mtime_ns
+                if mtime != self._routing_mtime:
+                    self._routing, self._routing_mtime = json.loads(path.read_text()), mtime
+            except FileNotFoundError:
+                self._routing = {}
+            if not self._routing.get('stable'):
+                # no routing file yet: serve the newest published version
+                versions = self.versions()
+                self._routing = {'stable': versions[-1] if versions else None, 'canary': None, 'canary_percent': 0}
+        return self._routing
+
+    def set_routing(self, stable: str, canary: Optional[str] = None, canary_percent: float = 0) -> dict:
+        """
+        Loads the new versions first, then atomically replaces routing.json, so the switch
+        never stalls a request on a cold load.
+        """
+        for version in filter(None, (stable, canary)):
+            self.get(version)
+        routing = {'stable': stable, 'canary': canary, 'canary_percent': canary_percent if canary else 0}
+        tmp = self.root / 'routing.json.tmp'
+        tmp.write_text(json.dumps(routing, indent=2))
+        os.replace(tmp, self.root / 'routing.json')
+        self._routing_checked = 0.0
+        return self.routing()
+
+    def resolve(self, requested: Optional[str] = None, routing_key: Optional[str] = None) -> LoadedModel:
+        return self.get(self.route(requested, routing_key))
+
+    def route(self, requested: Optional[str] = None, routing_key: Optional[str] = None) -> str:
+        """
+        The version a request is served by. An explicitly requested version wins; otherwise canary_percent
+        of traffic goes to the canary. With a routing_key (user id, session...) the canary decision is sticky
+        for that key.
+        """
+        if requested:
+            return requested
+        routing = self.routing()
+        if routing.get('canary') and routing.get('canary_percent', 0) > 0:
+            if routing_key is not None:
+                bucket = int.from_bytes(hashlib.sha1(routing_key.encode()).digest()[:4], 'big') % 10_000 / 100
+            else:
+                bucket = random.random() * 100
+            if bucket < routing['canary_percent']:
+                return routing['canary']
+        if not routing.get('stable'):
+            raise KeyError('no model version published')
+        return routing['stable']
@@ -0,0 +1,83 @@
+import io
+import json
+import numpy as np
+import pandas as pd
+from typing import get_args
+from schema.user_input import UserInput
+from model.features import RAW_COLUMNS
+
+OCCUPATIONS = set(get_args(UserInput.model_fields['occupation'].annotation))
+
+JSON_TYPES = {'application/json'}
+ARROW_TYPES = {'application/vnd.apache.arrow.stream', 'application/vnd.apache.arrow.file'}
+PARQUET_TYPES = {'application/vnd.apache.parquet', 'application/x-parquet'}
+
+
+def read_columns(body: bytes, content_type: str) -> pd.DataFrame:
+    """
+    Columnar JSON ({"age": [...], "weight": [...], ...}), an Arrow IPC stream/file, or a Parquet file.
+    Raises ValueError for anything unreadable.
+    """
+    try:
+        if content_type in JSON_TYPES:
+            data = json.loads(body)
+            if not isinstance(data, dict) or not all(isinstance(v, list) for v in data.values()):
+                raise ValueError('expected an object of equal-length column arrays')
+            return pd.DataFrame(data)
+        if content_type in ARROW_TYPES or content_type in PARQUET_TYPES:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if content_type in PARQUET_TYPES:
+                table = pq.read_table(io.BytesIO(body))
+            elif content_type.endswith('.file'):
+                table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+            else:
+                table = pa.ipc.open_stream(body).read_all()
+            return table.to_pandas()
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f'could not read {content_type} body: {e}') from e
+    raise ValueError(f'unsupported content type {content_type!r}')
+
+
+def _bad_rows(mask: np.ndarray, limit: int = 10) -> list:
+    return np.flatnonzero(mask)[:limit].tolist()
+
+
+def validate_columns(df: pd.DataFrame) -> list:
+    """
+    Vectorized version of the UserInput field constraints. Returns a list of error dicts (empty when valid);
+    numeric columns are coerced in place.
+    """
+    missing = [c for c in RAW_COLUMNS if c not in df.columns]
+    if missing:
+        return [{'column': c, 'msg': 'missing column'} for c in missing]
+    if len(df) == 0:
+        return [{'column': None, 'msg': 'no rows'}]
+
+    errors = []
+
+    def check(column: str, bad: np.ndarray, msg: str) -> None:
+        if bad.any():
+            errors.append({'column': column, 'msg': msg, 'count': int(bad.sum()), 'rows': _bad_rows(bad)})
+
+    for column in ('age', 'weight', 'height', 'income_lpa'):
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    age, weight, height, income = (df[c].to_numpy(dtype='float64') for c in ('age', 'weight', 'height', 'income_lpa'))
+
+    check('age', ~((age > 0) & (age < 120) & (np.mod(age, 1) == 0)), 'must be an integer with 0 < age < 120')
+    check('weight', ~(weight > 0), 'must be a number > 0')
+    check('height', ~((height > 0) & (height < 2.5)), 'must be a number with 0 < height < 2.5')
+    check('income_lpa', ~(income > 0), 'must be a number > 0')
+    # only real booleans: isin([True, False]) also matches 0/1 and 0.0/1.0, since 1 == True
+    if not pd.api.types.is_bool_dtype(df['smoker']):
+        check('smoker', ~df['smoker'].map(lambda v: isinstance(v, (bool, np.bool_))).to_numpy(), 'must be true or false')
+    check('city', ~df['city'].map(lambda v: isinstance(v, str)).to_numpy(), 'must be a string')
+    check('occupation', ~df['occupation'].isin(OCCUPATIONS).to_numpy(), f'must be one of {sorted(OCCUPATIONS)}')
+
+    if not errors:
+        df['age'] = df['age'].astype('int64')
+        df['smoker'] = df['smoker'].astype(bool)
+    return errors
@@ -17,3 +17,8 @@ class PredictionResponse(BaseModel):
         description="Probability distribution across all possible classes",
         example={"Low": 0.01, "Medium": 0.15, "High": 0.84}
     )
+    model_version: str = Field(
+        ...,
+        description="Version of the model that produced this prediction",
+        example="1.0.0"
+    )
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, Optional
+
+class RoutingUpdate(BaseModel):
+    stable: Annotated[str, Field(..., description='Version served by default', examples=['1.0.0'])]
+    canary: Annotated[Optional[str], Field(default=None, description='Version receiving a share of traffic', examples=['1.1.0'])]
+    canary_percent: Annotated[float, Field(default=0, ge=0, le=100, description='Share of traffic sent to the canary (0-100)')]
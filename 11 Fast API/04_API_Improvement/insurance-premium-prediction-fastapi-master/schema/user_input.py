@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, computed_field, field_validator
 from typing import Literal, Annotated
-from config.city_tier import tier_1_cities, tier_2_cities
+from model import features
 
 
 # pydantic model to validate incoming data
@@ -18,41 +18,25 @@ class UserInput(BaseModel):
     @field_validator('city')
     @classmethod
     def normalize_city(cls, v: str) -> str:
-        v = v.strip().title()
-        return v
-    
+        return features.normalize_city(v)
+
+    # derived features share their rules with the vectorized batch path (model/features.py)
     @computed_field
     @property
     def bmi(self) -> float:
-        return self.weight/(self.height**2)
+        return features.bmi(self.weight, self.height)
     
     @computed_field
     @property
     def lifestyle_risk(self) -> str:
-        if self.smoker and self.bmi > 30:
-            return "high"
-        elif self.smoker or self.bmi > 27:
-            return "medium"
-        else:
-            return "low"
+        return features.lifestyle_risk(self.smoker, self.bmi)
         
     @computed_field
     @property
     def age_group(self) -> str:
-        if self.age < 25:
-            return "young"
-        elif self.age < 45:
-            return "adult"
-        elif self.age < 60:
-            return "middle_aged"
-        return "senior"
+        return features.age_group(self.age)
     
     @computed_field
     @property
     def city_tier(self) -> int:
-        if self.city in tier_1_cities:
-            return 1
-        elif self.city in tier_2_cities:
-            return 2
-        else:
-            return 3
+        return features.city_tier(self.city)
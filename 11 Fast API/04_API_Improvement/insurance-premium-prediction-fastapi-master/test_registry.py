@@ -0,0 +1,60 @@
+# test_registry.py — ModelRegistry only keeps per-version state for versions that exist
+#
+# Run:  python -m pytest test_registry.py
+
+import pickle
+import pytest
+from model.registry import ModelRegistry
+
+
+class Labels(list):
+    def tolist(self):
+        return list(self)
+
+
+class StubModel:
+    classes_ = Labels(['High', 'Low', 'Medium'])
+
+
+def publish(root, version):
+    (root / version).mkdir()
+    with open(root / version / 'model.pkl', 'wb') as f:
+        pickle.dump(StubModel(), f)
+
+
+def test_unknown_version_leaves_load_locks_unchanged(tmp_path):
+    publish(tmp_path, '1.0.0')
+    registry = ModelRegistry(tmp_path)
+    registry.get('1.0.0')
+    before = dict(registry._load_locks)
+
+    for version in ('9.9.9', '../1.0.0', 'junk-' * 10):
+        with pytest.raises(KeyError):
+            registry.get(version)
+
+    assert registry._load_locks == before
+
+
+def test_known_version_loads_once(tmp_path):
+    publish(tmp_path, '1.0.0')
+    registry = ModelRegistry(tmp_path)
+
+    first = registry.get('1.0.0')
+
+    assert registry.get('1.0.0') is first
+    assert first.class_labels == ['High', 'Low', 'Medium']
+    assert list(registry._load_locks) == ['1.0.0']
+
+
+def test_peek_only_returns_resident_models(tmp_path):
+    publish(tmp_path, '1.0.0')
+    registry = ModelRegistry(tmp_path)
+
+    version = registry.route()
+    assert version == '1.0.0'
+    assert registry.peek(version) is None
+
+    loaded = registry.get(version)
+
+    assert registry.peek(version) is loaded
+    assert registry.peek('9.9.9') is None
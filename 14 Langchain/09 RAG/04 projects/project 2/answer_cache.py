@@ -0,0 +1,141 @@
+# answer_cache.py — per-video semantic cache of (question → answer, snippets)
+#
+# If a previous question for the same video is within the cosine threshold (and not expired) its answer
+# is returned without calling the LLM. The question is embedded lazily and at most once (QueryVector):
+# only when there are cached vectors to compare it with, or when the retriever needs it on a miss, so
+# the hybrid retriever's BM25-only fast path still skips the embedding call.
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _normalize_question(q: str) -> str:
+    return " ".join(q.lower().split()).rstrip("?!. ")
+
+
+class QueryVector:
+    """
+    A question's embedding, computed on the first call and then reused. Retrievers accept it as
+    query_vector and only call it when they actually run a vector search.
+    """
+
+    def __init__(self, embeddings, question: str):
+        self.embeddings = embeddings
+        self.question = question
+        self.value: Optional[List[float]] = None  # None until someone needed it
+
+    def __call__(self) -> List[float]:
+        if self.value is None:
+            self.value = self.embeddings.embed_query(self.question)
+        return self.value
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    vector: Optional[np.ndarray]  # L2-normalized; None if the question was never embedded (exact-text hits only)
+    answer: str
+    snippets: List[str]
+    created: float
+
+
+class SemanticAnswerCache:
+    """
+    Thread-safe; one LRU (OrderedDict) per video, shared by every caller (e.g. all Streamlit sessions).
+    ttl_s and max_entries bound what is kept; threshold and max_age_s can be set per lookup, so one caller's
+    settings never change what another one gets.
+    """
+
+    def __init__(self, embeddings, threshold: float = 0.92, ttl_s: float = 3600.0, max_entries: int = 256):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._videos: Dict[str, "OrderedDict[str, CachedAnswer]"] = {}
+        self._lock = threading.Lock()
+
+    def _live_entries(self, video_id: str) -> "OrderedDict[str, CachedAnswer]":
+        entries = self._videos.setdefault(video_id, OrderedDict())
+        cutoff = time.time() - self.ttl_s
+        for key in [k for k, e in entries.items() if e.created < cutoff]:
+            del entries[key]
+        return entries
+
+    def lookup(
+        self,
+        video_id: str,
+        question: str,
+        threshold: Optional[float] = None,
+        max_age_s: Optional[float] = None,
+    ) -> Tuple[Optional[CachedAnswer], QueryVector]:
+        """
+        Returns (cached_answer_or_None, query_vector). threshold / max_age_s default to the cache's own
+        (max_age_s is capped at ttl_s). query_vector has only been computed if a similarity search ran;
+        pass it on to the retriever and to store().
+        """
+        threshold = self.threshold if threshold is None else threshold
+        max_age_s = self.ttl_s if max_age_s is None else min(max_age_s, self.ttl_s)
+        qv = QueryVector(self.embeddings, question)
+        key = _normalize_question(question)
+
+        def candidates(entries, cutoff):
+            return [k for k, e in entries.items() if e.vector is not None and e.created >= cutoff]
+
+        with self._lock:
+            entries = self._live_entries(video_id)
+            cutoff = time.time() - max_age_s
+            if key in entries and entries[key].created >= cutoff:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key], qv
+            if not candidates(entries, cutoff):
+                # nothing to compare with: don't embed just for the cache
+                self.misses += 1
+                return None, qv
+
+        q = np.asarray(qv(), dtype="float32")
+        q /= np.linalg.norm(q) or 1.0
+
+        with self._lock:
+            entries = self._live_entries(video_id)
+            keys = candidates(entries, cutoff)
+            if keys:
+                sims = np.stack([entries[k].vector for k in keys]) @ q
+                best = int(np.argmax(sims))
+                if sims[best] >= threshold:
+                    entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return entries[keys[best]], qv
+            self.misses += 1
+        return None, qv
+
+    def store(self, video_id: str, question: str, qvec: Optional[List[float]], answer: str, snippets: List[str]) -> None:
+        """
+        qvec None (the question was never embedded) stores an entry that only exact-text lookups can hit.
+        """
+        v = None
+        if qvec is not None:
+            v = np.asarray(qvec, dtype="float32")
+            v /= np.linalg.norm(v) or 1.0
+        with self._lock:
+            entries = self._live_entries(video_id)
+            entries[_normalize_question(question)] = CachedAnswer(question, v, answer, list(snippets), time.time())
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": sum(len(v) for v in self._videos.values()),
+            }
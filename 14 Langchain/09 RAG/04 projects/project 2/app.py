@@ -3,9 +3,11 @@
 #           langchain-text-splitters, faiss-cpu, youtube-transcript-api, yt-dlp,
 #           faster-whisper, ctranslate2, tiktoken, ffmpeg (system)
 
+import importlib.util
 import os
 import shutil
 import tempfile
+import time
 from pathlib import Path
 from typing import List, Tuple, Optional
 
@@ -29,6 +31,88 @@ from youtube_transcript_api import (
     CouldNotRetrieveTranscript,
 )
 
+# On-disk index cache (survives restarts, shared by replicas on the same volume)
+from index_store import IndexStore
+# Chunk-level embedding dedup cache (shared across videos)
+from embedding_cache import CachedEmbeddings, EmbeddingCache
+# Incremental, time-anchored ingestion (answer while indexing)
+from streaming_ingest import StreamingIndexer, fmt_ts, iter_time_chunks
+# BM25 + vector retrieval fused with RRF (keyword-only fast path skips the query embedding)
+from hybrid_retriever import HybridRetriever
+# MMR + overlap merging + tiktoken budget for the answer prompt
+from context_builder import build_context
+# Per-video semantic cache of answers to (near-)repeated questions
+from answer_cache import SemanticAnswerCache
+# Concurrent caption-track probing (memoized per video)
+from caption_resolver import get_resolver
+# Multi-video corpus (sharded FAISS, per-video filtering, IVF-PQ once a shard grows large)
+from corpus_index import CorpusIndex, CorpusRetriever
+# Background indexing jobs (bounded worker pool, one job per video + settings)
+from jobs import DONE, EMBEDDING, FAILED, FETCHING, QUEUED, TRANSCRIBING, Job, JobQueue
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+EMBED_MODEL = "text-embedding-3-small"
+LLM_MODEL = "gpt-4o-mini"
+CONTEXT_FETCH_K = 8          # candidates handed to the context builder
+CONTEXT_BUDGET_TOKENS = 800   # ~ top-4 chunks minus their 200-char overlaps
+
+INDEX_STORE = IndexStore(
+    Path(os.environ.get("INDEX_CACHE_DIR", Path(__file__).with_name(".index_cache"))),
+    max_bytes=int(os.environ.get("INDEX_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+)
+QA_PROMPT = PromptTemplate(
+    template=(
+        "You are a helpful assistant.\n"
+        "Answer ONLY from the provided transcript context.\n"
+        "If the context is insufficient, say you don't know.\n"
+        "When a snippet starts with a [mm:ss–mm:ss] timestamp, cite it in your answer.\n\n"
+        "{context}\n"
+        "Question: {question}"
+    ),
+    input_variables=["context", "question"],
+)
+
+
+# ---------------------------
+# Process-wide singletons (survive Streamlit reruns, shared by sessions)
+# ---------------------------
+
+@st.cache_resource(show_spinner=False)
+def get_embed_cache() -> EmbeddingCache:
+    return EmbeddingCache(
+        Path(os.environ.get("EMBED_CACHE_DB", Path(__file__).with_name(".index_cache") / "embeddings.sqlite3"))
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm() -> ChatOpenAI:
+    return ChatOpenAI(model=LLM_MODEL, temperature=0.2)
+
+
+@st.cache_resource(show_spinner=False)
+def get_answer_cache() -> SemanticAnswerCache:
+    # shared by every session: ttl_s is the longest max age a session can pick in the sidebar
+    return SemanticAnswerCache(
+        OpenAIEmbeddings(model=EMBED_MODEL),
+        ttl_s=24 * 3600,
+        max_entries=int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "256")),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_corpus() -> CorpusIndex:
+    return CorpusIndex(
+        Path(os.environ.get("CORPUS_DIR", Path(__file__).with_name(".index_cache") / "corpus")),
+        ivf_threshold=int(os.environ.get("CORPUS_IVF_THRESHOLD", "20000")),
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue() -> JobQueue:
+    return JobQueue(max_workers=int(os.environ.get("INDEX_JOB_WORKERS", "2")))
+
+
 st.set_page_config(page_title="Chat with a YouTube Video", page_icon="🎬", layout="wide")
 
 
@@ -58,46 +142,15 @@ def try_fetch_transcript_api(
     4) first available transcript (any language)
     Returns list of {'text','start','duration'} or None.
     """
-    # Newer API shape
-    if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+    # Newer API shape: all candidate tracks are probed concurrently, highest priority wins (memoized)
+    if hasattr(YouTubeTranscriptApi, "list_transcripts") or hasattr(YouTubeTranscriptApi, "list"):
         try:
-            tl = YouTubeTranscriptApi.list_transcripts(video_id)
-
-            # 1) Manual in preferred languages
-            if preferred_languages:
-                try:
-                    t = tl.find_manually_created_transcript(list(preferred_languages))
-                    return t.fetch()
-                except Exception:
-                    pass
-
-            # 2) Auto-generated in preferred languages
-            if preferred_languages:
-                try:
-                    t = tl.find_generated_transcript(list(preferred_languages))
-                    return t.fetch()
-                except Exception:
-                    pass
-
-            # 3) Translate any transcript to target language
-            if target_language_for_translation:
-                for t in tl:
-                    try:
-                        if getattr(t, "is_translatable", False):
-                            return t.translate(target_language_for_translation).fetch()
-                    except Exception:
-                        continue
-
-            # 4) First available (any language)
-            if accept_any_language:
-                for t in tl:
-                    try:
-                        return t.fetch()
-                    except Exception:
-                        continue
-
-            return None
-
+            return get_resolver().resolve(
+                video_id,
+                preferred_languages,
+                accept_any_language,
+                target_language_for_translation,
+            )
         except (TranscriptsDisabled, NoTranscriptFound, CouldNotRetrieveTranscript):
             return None
         except Exception:
@@ -129,10 +182,10 @@ def fallback_transcribe_with_whisper(video_id: str, model_size: str = "small.en"
         import yt_dlp
     except Exception as e:
         raise RuntimeError("yt-dlp not installed. `pip install yt-dlp`") from e
-    try:
-        from faster_whisper import WhisperModel
-    except Exception as e:
-        raise RuntimeError("faster-whisper not installed. `pip install faster-whisper ctranslate2`") from e
+    # transcribe imports faster_whisper lazily (in the worker processes), so check for it up front
+    if importlib.util.find_spec("faster_whisper") is None:
+        raise RuntimeError("faster-whisper not installed. `pip install faster-whisper ctranslate2`")
+    from transcribe import get_engine
 
     if not shutil.which("ffmpeg"):
         raise RuntimeError("ffmpeg not found. On macOS: `brew install ffmpeg`")
@@ -156,101 +209,189 @@ def fallback_transcribe_with_whisper(video_id: str, model_size: str = "small.en"
         raise RuntimeError(f"Audio download failed: {e}") from e
 
     try:
-        model = WhisperModel(model_size, compute_type="int8")  # fast on CPU
-        segments, info = model.transcribe(str(audio_path), language="en", vad_filter=True)
-        parts = [s.text.strip() for s in segments if s.text]
-        text = " ".join(parts).strip()
+        # VAD-sharded, one warm model per core (models are reused across videos)
+        segments = get_engine(model_size).transcribe(str(audio_path), language="en")
+        text = " ".join(s["text"] for s in segments).strip()
         return text or None
     finally:
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
-def make_vectorstore(transcript_text: str):
-    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+def make_vectorstore(transcript_text: str, embed_cache: EmbeddingCache):
+    """
+    Returns (vector_store, retriever, docs, embed_stats); only chunks missing from
+    the shared embedding cache are sent to the embedding API.
+    """
+    # start_index lets the context builder merge overlapping neighbours exactly
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, add_start_index=True)
     docs = splitter.create_documents([transcript_text])
     if not docs:
         raise RuntimeError("No chunks produced from transcript text.")
 
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBED_MODEL), embed_cache, model_name=EMBED_MODEL)
     vs = FAISS.from_documents(docs, embeddings)
-    retriever = vs.as_retriever(search_type="similarity", search_kwargs={"k": 4})
-    return vs, retriever, docs
-
-
-def answer_question(retriever, question: str):
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
-    prompt = PromptTemplate(
-        template=(
-            "You are a helpful assistant.\n"
-            "Answer ONLY from the provided transcript context.\n"
-            "If the context is insufficient, say you don't know.\n\n"
-            "{context}\n"
-            "Question: {question}"
-        ),
-        input_variables=["context", "question"],
-    )
-    docs = retriever.invoke(question) or []
-    snippets = [d.page_content for d in docs]
+    retriever = HybridRetriever(vs, docs, k=4)
+    return vs, retriever, docs, embeddings.pop_stats().as_dict()
+
+
+def answer_question(
+    retriever,
+    question: str,
+    query_vector: Optional[List[float]] = None,
+    budget_tokens: int = CONTEXT_BUDGET_TOKENS,
+):
+    """
+    Returns (answer, snippets, info). Retrieves CONTEXT_FETCH_K chunks, then MMR-dedupes, merges
+    overlapping neighbours and packs them into budget_tokens. info reports prompt tokens, tokens
+    saved versus the old top-4 concatenation, and the LLM call latency.
+    """
+    docs = retriever.invoke(question, k=CONTEXT_FETCH_K, query_vector=query_vector) or []
+    packed = build_context(docs, budget_tokens=budget_tokens, model=LLM_MODEL)
+    multi_video = len({b.video_id for b in packed.blocks}) > 1
+    snippets = []
+    for b in packed.blocks:
+        label = [b.video_id] if multi_video and b.video_id else []
+        if b.start is not None:
+            label.append(f"{fmt_ts(b.start)}–{fmt_ts(b.end)}")
+        snippets.append(f"[{' '.join(label)}] {b.text}" if label else b.text)
     context_text = "\n\n".join(snippets)
-    final_prompt = prompt.invoke({"context": context_text, "question": question})
-    resp = llm.invoke(final_prompt.to_string())
-    return resp.content.strip(), snippets
+    final_prompt = QA_PROMPT.invoke({"context": context_text, "question": question})
+    t0 = time.perf_counter()
+    resp = get_llm().invoke(final_prompt.to_string())
+    info = {
+        "context_tokens": packed.tokens,
+        "tokens_saved": packed.tokens_saved,
+        "naive_tokens": packed.naive_tokens,
+        "dropped_duplicates": packed.dropped_duplicates,
+        "llm_latency_s": time.perf_counter() - t0,
+    }
+    return resp.content.strip(), snippets, info
 
 
-@st.cache_resource(show_spinner=False)
-def build_store_for_video(
+def add_to_corpus(corpus: CorpusIndex, video_id: str, vs: FAISS, collection: Optional[str]) -> None:
+    # best effort: the per-video index is already usable, a corpus failure must not fail the job
+    try:
+        if corpus.add_from_faiss(video_id, vs, channel=collection):
+            corpus.save()
+    except Exception:
+        pass
+
+
+def index_video_job(
+    job: Job,
     video_id: str,
     preferred_langs: Tuple[str, ...],
     accept_any: bool,
     translate_to: Optional[str],
     use_fallback: bool,
     whisper_model: str,
+    streaming: bool,
+    embed_cache: EmbeddingCache,
+    corpus: CorpusIndex,
+    collection: Optional[str] = None,
 ):
     """
-    Returns (vector_store, retriever, transcript_text, n_chunks, error_reason)
+    Background job: disk cache → captions → (Whisper fallback) → split/embed/index → persist.
+    Every finished index is also appended to the multi-video corpus (shard = collection).
+    Returns {'retriever', 'transcript_text', 'n_chunks', 'embed_stats'}; embed_stats is None when the
+    index came from the on-disk cache. Raises RuntimeError with the collected reasons on failure.
+    In streaming mode job.result is published as soon as indexing starts, so the chat can open early.
     """
     error_reason = None
     transcript_text = None
+    captions = None
+
+    text_inputs = {
+        "video_id": video_id,
+        "languages": list(preferred_langs),
+        "accept_any_language": accept_any,  # a fallback-language transcript must not serve a strict request
+        "translate_to": translate_to,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "embed_model": EMBED_MODEL,
+    }
+    segment_inputs = {**text_inputs, "chunking": "segments"}
+    text_key = IndexStore.make_key(**text_inputs)
+    segment_key = IndexStore.make_key(**segment_inputs)
+
+    # 0) On-disk index cache (skips caption fetch, transcription and embedding entirely)
+    for cache_key in ([segment_key, text_key] if streaming else [text_key]):
+        try:
+            cached = INDEX_STORE.load(cache_key, OpenAIEmbeddings(model=EMBED_MODEL))
+        except Exception:
+            cached = None
+        if cached:
+            vs, transcript_text, n_chunks = cached
+            add_to_corpus(corpus, video_id, vs, collection)
+            return {
+                "retriever": HybridRetriever(vs, k=4),
+                "transcript_text": transcript_text,
+                "n_chunks": n_chunks,
+                "embed_stats": None,
+            }
 
     # 1) Captions
+    job.set_state(FETCHING, "captions")
     try:
-        with st.status("Fetching captions…", expanded=False):
-            captions = try_fetch_transcript_api(
-                video_id,
-                preferred_languages=preferred_langs,
-                accept_any_language=accept_any,
-                target_language_for_translation=translate_to if translate_to else None,
-            )
-            if captions:
-                transcript_text = " ".join((c.get("text") or "").strip() for c in captions if c.get("text")).strip()
+        captions = try_fetch_transcript_api(
+            video_id,
+            preferred_languages=preferred_langs,
+            accept_any_language=accept_any,
+            target_language_for_translation=translate_to if translate_to else None,
+        )
+        if captions:
+            transcript_text = " ".join((c.get("text") or "").strip() for c in captions if c.get("text")).strip()
     except Exception as e:
         error_reason = f"Caption fetch error: {type(e).__name__}: {e}"
 
+    # 1b) Streaming: queryable after the first batch, persisted once complete
+    if transcript_text and streaming:
+        def persist(indexer: StreamingIndexer) -> None:
+            INDEX_STORE.save(segment_key, indexer.vs, transcript_text, indexer.n_chunks, key_inputs=segment_inputs)
+            add_to_corpus(corpus, video_id, indexer.vs, collection)
+
+        embeddings = CachedEmbeddings(OpenAIEmbeddings(model=EMBED_MODEL), embed_cache, model_name=EMBED_MODEL)
+        indexer = StreamingIndexer(embeddings, k=4, on_complete=persist)
+        job.set_state(EMBEDDING, "streaming")
+        job.result = {"retriever": indexer, "transcript_text": transcript_text, "n_chunks": 0, "embed_stats": None}
+        indexer.start(iter_time_chunks(captions, CHUNK_SIZE, CHUNK_OVERLAP, video_id=video_id))
+        indexer.wait()
+        if indexer.error:
+            raise RuntimeError(f"Vector store error: {indexer.error}")
+        return {**job.result, "n_chunks": indexer.n_chunks, "embed_stats": embeddings.stats.as_dict()}
+
     # 2) Fallback
     if not transcript_text:
         if use_fallback:
+            job.set_state(TRANSCRIBING, f"Faster-Whisper ({whisper_model})")
             try:
-                with st.status("Captions missing. Downloading audio & transcribing (Faster-Whisper)…", expanded=False):
-                    text = fallback_transcribe_with_whisper(video_id, model_size=whisper_model)
-                    if text:
-                        transcript_text = text
-                    else:
-                        error_reason = (error_reason or "") + " | Fallback transcription returned empty text."
+                text = fallback_transcribe_with_whisper(video_id, model_size=whisper_model)
+                if text:
+                    transcript_text = text
+                else:
+                    error_reason = (error_reason or "") + " | Fallback transcription returned empty text."
             except Exception as e:
                 error_reason = (error_reason or "") + f" | Fallback error: {type(e).__name__}: {e}"
         else:
             error_reason = (error_reason or "") + " | Captions not available and fallback is disabled."
 
     if not transcript_text:
-        return None, None, None, 0, (error_reason or "Unknown transcript failure")
+        raise RuntimeError(error_reason or "Unknown transcript failure")
 
     # 3) Vector store
+    job.set_state(EMBEDDING, "split → embed → index")
     try:
-        with st.status("Building vector store (split → embed → index)…", expanded=False):
-            vs, retriever, docs = make_vectorstore(transcript_text)
-            return vs, retriever, transcript_text, len(docs), None
+        vs, retriever, docs, embed_stats = make_vectorstore(transcript_text, embed_cache)
     except Exception as e:
-        return None, None, None, 0, f"Vector store error: {type(e).__name__}: {e}"
+        raise RuntimeError(f"Vector store error: {type(e).__name__}: {e}") from e
+
+    # 4) Persist for future cold starts (a cache write failure must not break the app)
+    try:
+        INDEX_STORE.save(text_key, vs, transcript_text, len(docs), key_inputs=text_inputs)
+    except Exception:
+        pass
+    add_to_corpus(corpus, video_id, vs, collection)
+    return {"retriever": retriever, "transcript_text": transcript_text, "n_chunks": len(docs), "embed_stats": embed_stats}
 
 
 # ---------------------------
@@ -279,6 +420,41 @@ with st.sidebar:
     whisper_model = st.selectbox("Faster-Whisper model", ["tiny.en", "base.en", "small.en", "medium.en"], index=2)
     st.markdown("**macOS tip:** `brew install ffmpeg` for fallback.")
 
+    st.markdown("---")
+    streaming = st.toggle(
+        "Streaming ingestion (ask while indexing, timestamped answers)",
+        value=True,
+        help="Caption videos are indexed in the background; Whisper fallback still builds the full index first.",
+    )
+
+    st.markdown("---")
+    st.markdown("**Answer cache** (repeated questions skip the LLM)")
+    answer_cache = get_answer_cache()
+    # this session's settings, passed to each lookup; the cache itself is shared by every session
+    cache_threshold = st.slider("Question similarity threshold", 0.80, 0.99, 0.92, 0.01)
+    cache_max_age_s = st.number_input("Max answer age (minutes)", min_value=1, max_value=24 * 60, value=60) * 60
+    cache_stats_box = st.empty()  # filled at the end of the run so it includes this turn
+
+    st.markdown("---")
+    context_budget = int(st.number_input(
+        "Context token budget", min_value=200, max_value=16_000, value=CONTEXT_BUDGET_TOKENS, step=100,
+        help="Transcript tokens sent to the LLM per question (measured with tiktoken).",
+    ))
+
+    st.markdown("---")
+    st.markdown("**Corpus** (every processed video is added)")
+    collection = st.text_input(
+        "Channel / collection (optional)", value="",
+        help="Videos in the same collection share one shard; large shards are compressed with IVF-PQ.",
+    )
+    corpus = get_corpus()
+    corpus_stats = corpus.stats()
+    search_all = st.toggle(f"Ask across all indexed videos ({corpus_stats['videos']})", value=False)
+    st.caption(
+        f"shards: {corpus_stats['shards']} (IVF-PQ: {corpus_stats['ivf_shards']}) • "
+        f"vectors: {corpus_stats['vectors']:,} • index: {corpus_stats['index_bytes'] / 1e6:.1f} MB"
+    )
+
 # Input row
 col1, col2 = st.columns([2, 1], vertical_alignment="bottom")
 with col1:
@@ -291,31 +467,105 @@ if go:
         st.error("Please enter a Video ID.")
         st.stop()
 
-    with st.spinner("Preparing…"):
-        vs, retriever, transcript_text, n_chunks, err = build_store_for_video(
-            video_id.strip(),
-            preferred_langs,
-            accept_any,
-            translate_to if translate_to.strip() else None,
-            use_fallback,
-            whisper_model,
-        )
+    job_args = (
+        video_id.strip(),
+        preferred_langs,
+        accept_any,
+        translate_to.strip() or None,
+        use_fallback,
+        whisper_model,
+        streaming,
+    )
+    collection_name = collection.strip() or None
+    # Same video + settings (including the corpus collection) → same job, even across sessions
+    job_key = "|".join(map(str, (*job_args, collection_name)))
+    # (st.cache_resource getters are resolved here, on the script thread, not inside the worker)
+    get_job_queue().submit(
+        job_key, video_id.strip(), index_video_job, *job_args,
+        embed_cache=get_embed_cache(), corpus=corpus, collection=collection_name,
+    )
+    st.session_state["job_key"] = job_key
+    st.session_state.pop("retriever", None)
+
+JOB_LABELS = {
+    QUEUED: "Queued (waiting for a free worker)",
+    FETCHING: "Fetching captions",
+    TRANSCRIBING: "Captions missing. Downloading audio & transcribing",
+    EMBEDDING: "Building vector store (split → embed → index)",
+}
 
-    if err:
-        st.error(f"Could not build a knowledge base.\n\n**Details:** {err}")
-        st.info("Tips: check video region/age restrictions, enable fallback, ensure ffmpeg is installed, or try a different video.")
-        st.stop()
 
+@st.fragment(run_every=1.0)
+def job_progress(job_key: str) -> None:
+    """
+    Polls the background job without rerunning the whole page; triggers one full rerun once the
+    index becomes queryable so the chat appears.
+    """
+    job = get_job_queue().get(job_key)
+    if job is None:
+        return
+    snap = job.snapshot()
+    if snap["error"]:
+        st.error(f"Could not build a knowledge base.\n\n**Details:** {snap['error']}")
+        st.info("Tips: check video region/age restrictions, enable fallback, ensure ffmpeg is installed, or try a different video.")
+        return
+    if (snap["ready"] and "retriever" not in st.session_state) or snap["state"] == DONE:
+        st.rerun()
+
+    indexer = (job.result or {}).get("retriever")
+    if isinstance(indexer, StreamingIndexer):
+        prog = indexer.progress()
+        st.info(
+            f"Indexing in background • chunks so far: {prog['n_chunks']} • "
+            f"covered up to {fmt_ts(prog['indexed_until'])} — you can already ask questions."
+        )
+    else:
+        label = JOB_LABELS.get(snap["state"], snap["state"])
+        st.info(f"⏳ {label}… ({snap['elapsed_s']}s) • {snap['detail']}")
+
+
+job_key = st.session_state.get("job_key")
+job = get_job_queue().get(job_key) if job_key else None
+if job is not None and job.state == FAILED:
+    # a streaming index published before the failure is incomplete; stop answering from it
+    st.session_state.pop("retriever", None)
+result = job.result if job is not None else None  # read once: a failing job clears it from its worker
+if result is not None:
+    transcript_text = result["transcript_text"]
+    retriever = result["retriever"]
     st.session_state["retriever"] = retriever
-    st.session_state["video_id"] = video_id.strip()
-    st.session_state["n_chunks"] = n_chunks
+    st.session_state["video_id"] = job.video_id
+    st.session_state["n_chunks"] = (
+        retriever.n_chunks if isinstance(retriever, StreamingIndexer) else result["n_chunks"]
+    )
+    st.session_state["embed_stats"] = result["embed_stats"]
     st.session_state["transcript_preview"] = (transcript_text[:800] + "…") if len(transcript_text) > 800 else transcript_text
+if job is not None and (not job.finished or job.error):
+    job_progress(job_key)
 
 if "retriever" in st.session_state:
     with st.expander("Transcript preview", expanded=False):
         st.write(st.session_state["transcript_preview"])
     st.success(f"Vector store ready • chunks: {st.session_state['n_chunks']} • video: {st.session_state['video_id']}")
+    stats = st.session_state.get("embed_stats")
+    if stats:
+        st.caption(
+            f"Embedding cache • hit rate: {stats['hit_rate']:.0%} ({stats['hits']} hits / {stats['misses']} misses) "
+            f"• tokens avoided: {stats['tokens_avoided']:,} • cost avoided: ${stats['cost_avoided_usd']:.4f}"
+        )
+    elif job is not None and job.state == DONE:
+        st.caption("Loaded from on-disk index cache • no embedding calls")
 
+
+# Chat target: the current video, or the whole corpus (the answer-cache scope changes with its size)
+chat_retriever, chat_scope = None, None
+if search_all and corpus_stats["videos"]:
+    chat_retriever = CorpusRetriever(corpus, OpenAIEmbeddings(model=EMBED_MODEL))
+    chat_scope = f"corpus:{corpus_stats['videos']}"
+elif "retriever" in st.session_state:
+    chat_retriever, chat_scope = st.session_state["retriever"], st.session_state["video_id"]
+
+if chat_retriever is not None:
     st.markdown("### Chat")
     if "messages" not in st.session_state:
         st.session_state["messages"] = []
@@ -324,7 +574,7 @@ if "retriever" in st.session_state:
         with st.chat_message(role):
             st.markdown(content)
 
-    user_q = st.chat_input("Ask about the video…")
+    user_q = st.chat_input("Ask across all indexed videos…" if search_all else "Ask about the video…")
     if user_q:
         st.session_state["messages"].append(("user", user_q))
         with st.chat_message("user"):
@@ -333,14 +583,42 @@ if "retriever" in st.session_state:
         with st.chat_message("assistant"):
             with st.spinner("Thinking…"):
                 try:
-                    answer, snippets = answer_question(st.session_state["retriever"], user_q)
+                    cached, qvec = answer_cache.lookup(
+                        chat_scope, user_q, threshold=cache_threshold, max_age_s=cache_max_age_s
+                    )
+                    info = None
+                    if cached:
+                        answer, snippets = cached.answer, cached.snippets
+                    else:
+                        # qvec is lazy: embedded here only if the retriever runs a vector search
+                        answer, snippets, info = answer_question(
+                            chat_retriever, user_q, query_vector=qvec, budget_tokens=context_budget
+                        )
+                        # answers from a half-built streaming index may improve later; don't pin them
+                        if not (isinstance(chat_retriever, StreamingIndexer) and not chat_retriever.done):
+                            answer_cache.store(chat_scope, user_q, qvec.value, answer, snippets)
                 except Exception as e:
                     st.error(f"Error while answering: {e}")
                     st.stop()
 
                 st.markdown(answer)
+                if cached:
+                    st.caption(f"♻️ Cached answer (similar to: “{cached.question}”)")
+                elif info:
+                    st.session_state["tokens_saved_total"] = st.session_state.get("tokens_saved_total", 0) + info["tokens_saved"]
+                    st.caption(
+                        f"Context: {info['context_tokens']:,} tokens • saved {info['tokens_saved']:,} vs naive top-4 "
+                        f"({info['naive_tokens']:,}) • near-duplicates dropped: {info['dropped_duplicates']} • "
+                        f"LLM {info['llm_latency_s']:.2f}s • session total saved: {st.session_state['tokens_saved_total']:,}"
+                    )
                 with st.expander("Show supporting snippets", expanded=False):
                     for i, snip in enumerate(snippets, 1):
                         st.markdown(f"**Snippet {i}**\n\n{snip}")
 
-        st.session_state["messages"].append(("assistant", answer))
\ No newline at end of file
+        st.session_state["messages"].append(("assistant", answer))
+
+cache_stats = answer_cache.stats()
+cache_stats_box.caption(
+    f"hits: {cache_stats['hits']} • misses: {cache_stats['misses']} • "
+    f"hit rate: {cache_stats['hit_rate']:.0%} • entries: {cache_stats['entries']}"
+)
@@ -0,0 +1,112 @@
+# bench_captions.py — caption-track resolution latency: sequential probing vs concurrent CaptionResolver
+#
+# Run:  python bench_captions.py
+# Fully offline: tracks are served by the local TranscriptServer fixture with per-track latency/failures.
+
+import asyncio
+import threading
+import time
+
+from bench_fixtures import HttpTranscriptList, TranscriptServer, make_transcript
+from caption_resolver import CaptionResolver, build_candidates
+
+SCENARIOS = {
+    # manual English track is blocked, auto-generated one works
+    "manual_blocked": [
+        {"lang": "en", "generated": False, "translatable": True, "delay_ms": 400, "fail": True},
+        {"lang": "en", "generated": True, "translatable": True, "delay_ms": 300},
+    ],
+    # no English; first translations fail, a later native track works
+    "translate_fallback": [
+        {"lang": "de", "generated": False, "translatable": True, "delay_ms": 350, "fail": True},
+        {"lang": "fr", "generated": True, "translatable": True, "delay_ms": 350, "fail": True},
+        {"lang": "es", "generated": True, "translatable": False, "delay_ms": 250},
+        {"lang": "it", "generated": True, "translatable": False, "delay_ms": 250},
+    ],
+    # happy path: the first candidate succeeds
+    "manual_ok": [
+        {"lang": "en", "generated": False, "translatable": True, "delay_ms": 250},
+        {"lang": "en", "generated": True, "translatable": True, "delay_ms": 250},
+    ],
+}
+
+
+def sequential(list_fn, video_id):
+    # the original try_fetch_transcript_api behaviour: same candidates, one at a time
+    for label, fetch in build_candidates(list_fn(video_id), ("en",), True, "en"):
+        try:
+            result = fetch()
+        except Exception:
+            continue
+        if result:
+            return label
+    return None
+
+
+class StubTrack:
+    # in-process track for check_hung_track; no finders on the list, so candidates are its tracks in order
+    is_generated = False
+    is_translatable = False
+
+    def __init__(self, language_code, fetch):
+        self.language_code = language_code
+        self.fetch = fetch
+
+
+def check_hung_track():
+    """
+    A hung track must cost neither the winner (lower-priority hang) nor more than the timeout
+    (higher-priority hang): resolve() returns without joining the abandoned probe threads.
+    """
+    release = threading.Event()
+
+    def ok():
+        time.sleep(0.1)
+        return [{"text": "ok", "start": 0.0, "duration": 1.0}]
+
+    def hung():
+        release.wait(30)
+        return None
+
+    try:
+        for name, tracks, limit in [
+            ("hung lower-priority", [StubTrack("en", ok), StubTrack("de", hung)], 0.5),
+            ("hung higher-priority", [StubTrack("de", hung), StubTrack("en", ok)], 1.5),
+        ]:
+            resolver = CaptionResolver(list_transcripts=lambda _, tracks=tracks: tracks, timeout=1.0)
+            t0 = time.perf_counter()
+            result = resolver.resolve(name)
+            elapsed = time.perf_counter() - t0
+            assert result and elapsed < limit, (name, elapsed)
+            print(f"{name:<22} resolved in {elapsed * 1000:.0f} ms (timeout 1000 ms)")
+    finally:
+        release.set()
+
+
+def main():
+    check_hung_track()
+    print()
+    segments, _ = make_transcript(filler_per_topic=4)
+    with TranscriptServer(SCENARIOS, segments) as server:
+        list_fn = HttpTranscriptList.lister(server.base_url)
+        print(f"{'scenario':<20} {'sequential':>12} {'concurrent':>12} {'memoized':>10}   winner")
+        for video_id in SCENARIOS:
+            t0 = time.perf_counter()
+            seq_label = sequential(list_fn, video_id)
+            t_seq = time.perf_counter() - t0
+
+            resolver = CaptionResolver(list_transcripts=list_fn, timeout=5.0)
+            t0 = time.perf_counter()
+            label, _ = asyncio.run(resolver.aresolve(video_id, ("en",), True, "en"))
+            t_conc = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            resolver.resolve(video_id, ("en",), True, "en")
+            t_memo = time.perf_counter() - t0
+
+            assert label == seq_label, (label, seq_label)
+            print(f"{video_id:<20} {t_seq * 1000:>9.0f} ms {t_conc * 1000:>9.0f} ms {t_memo * 1000:>7.2f} ms   {label}")
+
+
+if __name__ == "__main__":
+    main()
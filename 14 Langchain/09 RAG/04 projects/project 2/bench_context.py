@@ -0,0 +1,69 @@
+# bench_context.py — prompt tokens (and LLM latency) of naive top-4 concatenation vs build_context()
+#
+# Run:  python bench_context.py
+# Offline by default: reports tokens per query on the fixture transcript. With --openai the QA prompt
+# is also sent to gpt-4o-mini for both variants and end-to-end LLM latency is compared
+# (OPENAI_API_KEY required).
+
+import argparse
+import statistics
+import time
+
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from bench_fixtures import HashingEmbeddings, make_transcript
+from context_builder import build_context, count_tokens
+from hybrid_retriever import HybridRetriever
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fetch-k", type=int, default=8)
+    ap.add_argument("--budget", type=int, default=800)
+    ap.add_argument("--filler", type=int, default=40, help="filler segments per topic (transcript length)")
+    ap.add_argument("--openai", action="store_true")
+    args = ap.parse_args()
+
+    segments, queries = make_transcript(filler_per_topic=args.filler)
+    text = " ".join(s["text"] for s in segments)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, add_start_index=True)
+    docs = splitter.create_documents([text])
+    vs = FAISS.from_documents(docs, HashingEmbeddings())
+    retriever = HybridRetriever(vs, docs, k=4)
+
+    llm = None
+    if args.openai:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+
+    naive_tokens, packed_tokens, naive_lat, packed_lat, hits_naive, hits_packed = [], [], [], [], 0, 0
+    for question, keyword in queries:
+        candidates = retriever.invoke(question, k=args.fetch_k)
+        naive_ctx = "\n\n".join(d.page_content for d in candidates[:4])
+        packed = build_context(candidates, budget_tokens=args.budget)
+        packed_ctx = "\n\n".join(b.text for b in packed.blocks)
+
+        naive_tokens.append(count_tokens(naive_ctx))
+        packed_tokens.append(packed.tokens)
+        hits_naive += keyword in naive_ctx.lower()
+        hits_packed += keyword in packed_ctx.lower()
+
+        if llm is not None:
+            for ctx, lat in ((naive_ctx, naive_lat), (packed_ctx, packed_lat)):
+                t0 = time.perf_counter()
+                llm.invoke(f"Answer ONLY from the context.\n\n{ctx}\n\nQuestion: {question}")
+                lat.append(time.perf_counter() - t0)
+
+    n = len(queries)
+    print(f"chunks: {len(docs)}   queries: {n}   fetch_k: {args.fetch_k}   budget: {args.budget}\n")
+    print(f"{'naive top-4':<16} tokens/query: {statistics.mean(naive_tokens):7.0f}   keyword in context: {hits_naive}/{n}")
+    print(f"{'build_context':<16} tokens/query: {statistics.mean(packed_tokens):7.0f}   keyword in context: {hits_packed}/{n}")
+    saved = sum(naive_tokens) - sum(packed_tokens)
+    print(f"\nprompt tokens saved: {saved:,} total, {saved / n:.0f}/query ({saved / max(1, sum(naive_tokens)):.0%})")
+    if llm is not None:
+        print(f"LLM p50 latency: naive {statistics.median(naive_lat):.2f}s   packed {statistics.median(packed_lat):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# bench_corpus.py — memory per indexed hour and query latency of CorpusIndex at ~1k videos
+#
+# Run:  python bench_corpus.py --videos 1000
+# Synthetic, offline: each video gets chunks_per_hour * minutes / 60 chunks of CHUNK_SIZE characters with
+# clustered random vectors (dim 1536, like text-embedding-3-small). Compares an exact flat corpus with
+# the same corpus compressed to IVF-PQ, for corpus-wide and per-video (filtered) queries, and times
+# incremental adds after compression.
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from corpus_index import CorpusIndex
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+# ~150 spoken words/min * ~6 chars/word, split into CHUNK_SIZE windows advancing CHUNK_SIZE - CHUNK_OVERLAP
+CHARS_PER_HOUR = 150 * 6 * 60
+CHUNKS_PER_HOUR = CHARS_PER_HOUR / (CHUNK_SIZE - CHUNK_OVERLAP)
+
+
+def make_videos(n_videos, minutes, dim, n_topics=256, seed=0):
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype("float32")
+    per_video = max(1, round(CHUNKS_PER_HOUR * minutes / 60))
+    for v in range(n_videos):
+        home = rng.choice(n_topics, size=4, replace=False)  # each video covers a few topics
+        centers = topics[rng.choice(home, size=per_video)]
+        vecs = centers + 0.35 * rng.standard_normal((per_video, dim)).astype("float32")
+        texts = [f"video {v} chunk {i} " + "x" * (CHUNK_SIZE - 24) for i in range(per_video)]
+        metas = [{"chunk": i} for i in range(per_video)]
+        yield f"vid{v:05d}", texts, vecs, metas
+
+
+def percentiles(ms):
+    lat = sorted(ms)
+    return statistics.median(lat), lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+
+
+def time_queries(corpus, queries, k, video_ids=None):
+    ms, results = [], []
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        hits = corpus.search(q, k=k, video_ids=None if video_ids is None else [video_ids[i]])
+        ms.append((time.perf_counter() - t0) * 1000)
+        results.append({(d.metadata["video_id"], d.metadata["chunk"]) for d, _ in hits})
+    return ms, results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--videos", type=int, default=1000)
+    ap.add_argument("--minutes", type=float, default=20.0, help="average video length")
+    ap.add_argument("--dim", type=int, default=1536)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=4)
+    ap.add_argument("--ivf-threshold", type=int, default=20_000)
+    ap.add_argument("--nprobe", type=int, default=16)
+    args = ap.parse_args()
+
+    flat = CorpusIndex(ivf_threshold=10 ** 12)
+    ivf = CorpusIndex(ivf_threshold=args.ivf_threshold, nprobe=args.nprobe)
+    by_video = CorpusIndex(shard_by="video", ivf_threshold=10 ** 12)
+
+    t0 = time.perf_counter()
+    sample = []
+    rng = np.random.default_rng(1)
+    for vid, texts, vecs, metas in make_videos(args.videos, args.minutes, args.dim):
+        for corpus in (flat, ivf, by_video):
+            corpus.add_video(vid, texts, vecs, metas)
+        if len(sample) < args.queries:
+            i = int(rng.integers(len(texts)))
+            sample.append((vid, vecs[i] + 0.2 * rng.standard_normal(args.dim).astype("float32")))
+    build_s = time.perf_counter() - t0
+
+    hours = args.videos * args.minutes / 60
+    queries = [q for _, q in sample]
+    vids = [v for v, _ in sample]
+    print(f"videos: {args.videos}   indexed hours: {hours:.0f}   vectors: {flat.stats()['vectors']:,}   "
+          f"dim: {args.dim}   build (3 corpora): {build_s:.1f}s\n")
+
+    exact_all = time_queries(flat, queries, args.k)[1]
+    exact_one = time_queries(flat, queries, args.k, vids)[1]
+    for name, corpus in (("flat, 1 shard", flat), ("ivf-pq, 1 shard", ivf), ("flat, shard/video", by_video)):
+        st = corpus.stats()
+        per_hour = (st["index_bytes"] + st["text_bytes"]) / hours
+        all_ms, all_res = time_queries(corpus, queries, args.k)
+        one_ms, one_res = time_queries(corpus, queries, args.k, vids)
+        recall = statistics.mean(len(a & b) / max(1, len(b)) for a, b in zip(all_res, exact_all))
+        recall_one = statistics.mean(len(a & b) / max(1, len(b)) for a, b in zip(one_res, exact_one))
+        print(f"{name:<18} vectors/hour: {st['index_bytes'] / hours / 1024:8.1f} KiB   "
+              f"+text: {per_hour / 1024:8.1f} KiB/hour   shards: {st['shards']} (ivf {st['ivf_shards']})")
+        print(f"{'':<18} all videos  p50 {percentiles(all_ms)[0]:7.2f} ms  p95 {percentiles(all_ms)[1]:7.2f} ms  "
+              f"recall@{args.k} vs exact: {recall:.2f}")
+        print(f"{'':<18} one video   p50 {percentiles(one_ms)[0]:7.2f} ms  p95 {percentiles(one_ms)[1]:7.2f} ms  "
+              f"recall@{args.k} vs exact: {recall_one:.2f}\n")
+
+    # incremental adds into the already-trained IVF-PQ shard (no rebuild)
+    add_ms = []
+    for vid, texts, vecs, metas in make_videos(20, args.minutes, args.dim, seed=99):
+        t0 = time.perf_counter()
+        ivf.add_video("new-" + vid, texts, vecs, metas)
+        add_ms.append((time.perf_counter() - t0) * 1000)
+    print(f"incremental add into ivf-pq corpus: p50 {statistics.median(add_ms):.1f} ms/video")
+
+
+if __name__ == "__main__":
+    main()
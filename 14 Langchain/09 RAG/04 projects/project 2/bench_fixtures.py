@@ -0,0 +1,246 @@
+# bench_fixtures.py — offline fixtures shared by the bench_*.py scripts
+#
+# make_transcript() builds a deterministic caption track ({'text','start','duration'} segments) where each
+# topic is anchored by a unique keyword, padded with generic filler and a repeated sponsor read.
+# HashingEmbeddings is a local, deterministic stand-in for OpenAIEmbeddings (no API key, no network).
+# TranscriptServer + HttpTranscriptList stand in for YouTube's caption endpoints (latency, failures).
+
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from hybrid_retriever import tokenize
+
+# (keyword, keyword question, paraphrased question)
+TOPICS = [
+    ("gradient checkpointing", "What is gradient checkpointing?",
+     "How can training save activation memory by recomputing layers?"),
+    ("kv cache", "Why does the KV cache grow with context length?",
+     "What stores past attention keys and values during decoding?"),
+    ("speculative decoding", "How does speculative decoding work?",
+     "How can a small draft model speed up generation?"),
+    ("flash attention", "What makes flash attention faster?",
+     "How do fused attention kernels avoid materializing the score matrix?"),
+    ("quantization int8", "What accuracy loss comes with quantization int8?",
+     "What happens when weights are stored in eight bit integers?"),
+    ("mixture of experts", "How does a mixture of experts route tokens?",
+     "Which architecture activates only a few feed forward blocks per token?"),
+    ("rotary embeddings", "Why use rotary embeddings?",
+     "How are positions encoded by rotating query and key vectors?"),
+    ("beam search", "When is beam search better than sampling?",
+     "Which decoding keeps several candidate sequences at each step?"),
+    ("lora adapters", "How many parameters do lora adapters train?",
+     "How can fine tuning update only small low rank matrices?"),
+    ("tensor parallelism", "How does tensor parallelism split a layer?",
+     "How are matrix multiplications sharded across several GPUs?"),
+    ("vector database", "Why put embeddings in a vector database?",
+     "Where should similarity search over millions of embeddings live?"),
+    ("learning rate warmup", "Why use learning rate warmup?",
+     "Why start optimization with a tiny step size and ramp up?"),
+]
+
+FILLER = [
+    "so let's keep going with the next part",
+    "this is something people ask about a lot in the comments",
+    "okay let me pull up the slide for this",
+    "and that is really the key intuition here",
+    "if you have been following the series you have seen this before",
+    "let me know what you think down below",
+    "alright so the numbers here look pretty reasonable",
+    "we will come back to this in a minute",
+]
+
+SPONSOR = "this video is sponsored by our friends who make great developer tools use the code in the description"
+
+
+def make_transcript(filler_per_topic: int = 40, seed: int = 7) -> Tuple[List[dict], List[Tuple[str, str]]]:
+    """
+    Returns (segments, queries) where queries are (question, expected keyword) pairs:
+    one keyword question and one paraphrase per topic.
+    """
+    rng = random.Random(seed)
+    segments: List[dict] = []
+    t = 0.0
+
+    def say(text: str) -> None:
+        nonlocal t
+        duration = round(0.35 * len(text.split()), 2)
+        segments.append({"text": text, "start": round(t, 2), "duration": duration})
+        t += duration
+
+    for i, (keyword, _, paraphrase) in enumerate(TOPICS):
+        if i % 4 == 0:
+            say(SPONSOR)
+        for _ in range(filler_per_topic // 2):
+            say(rng.choice(FILLER))
+        say(f"now let's talk about {keyword}")
+        say(f"{keyword} answers the question {paraphrase.rstrip('?').lower()}")
+        say(f"the main tradeoff with {keyword} is memory versus compute")
+        for _ in range(filler_per_topic // 2):
+            say(rng.choice(FILLER))
+
+    queries = []
+    for keyword, kw_q, para_q in TOPICS:
+        queries.append((kw_q, keyword))
+        queries.append((para_q, keyword))
+    return segments, queries
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words hashing embeddings. latency_ms simulates the API round-trip per call.
+    """
+
+    def __init__(self, dim: int = 512, latency_ms: float = 0.0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    def _vec(self, text: str) -> List[float]:
+        v = np.zeros(self.dim, dtype="float32")
+        for tok in tokenize(text):
+            h = int.from_bytes(hashlib.md5(tok.encode()).digest()[:4], "little")
+            v[h % self.dim] += 1.0 if h & 1 else -1.0
+        n = np.linalg.norm(v)
+        return (v / n if n else v).tolist()
+
+    def _wait(self) -> None:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._wait()
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._wait()
+        return self._vec(text)
+
+
+# ---------------------------
+# Stand-in transcript server
+# ---------------------------
+
+class TranscriptServer:
+    """
+    Local HTTP server. videos = {video_id: [track, ...]} where a track is
+    {'lang': 'en', 'generated': False, 'translatable': True, 'delay_ms': 200, 'fail': False}.
+      GET /list/<video_id>                            → track list (after list_delay_ms)
+      GET /fetch/<video_id>/<lang>?gen=0|1&tlang=xx  → segments, or HTTP 500 when the track fails
+    """
+
+    def __init__(self, videos: Dict[str, List[dict]], segments: List[dict], list_delay_ms: float = 100.0):
+        self.videos = videos
+        self.segments = segments
+        self.list_delay_ms = list_delay_ms
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code: int, payload) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                parts = url.path.strip("/").split("/")
+                if parts[0] == "list" and len(parts) == 2:
+                    time.sleep(server.list_delay_ms / 1000)
+                    return self._send(200, server.videos.get(parts[1], []))
+                if parts[0] == "fetch" and len(parts) == 3:
+                    q = urllib.parse.parse_qs(url.query)
+                    gen = q.get("gen", ["0"])[0] == "1"
+                    for track in server.videos.get(parts[1], []):
+                        if track["lang"] == parts[2] and bool(track.get("generated")) == gen:
+                            time.sleep(track.get("delay_ms", 0) / 1000)
+                            if track.get("fail"):
+                                return self._send(500, {"error": "blocked"})
+                            return self._send(200, server.segments)
+                return self._send(404, {"error": "not found"})
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "TranscriptServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def _get_json(url: str, timeout: float = 30.0):
+    with urllib.request.urlopen(url, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+class HttpTranscript:
+    """
+    Mimics youtube_transcript_api's Transcript (language_code, is_generated, is_translatable, fetch, translate).
+    """
+
+    def __init__(self, base_url: str, video_id: str, track: dict, tlang: Optional[str] = None):
+        self.base_url = base_url
+        self.video_id = video_id
+        self.language_code = tlang or track["lang"]
+        self.is_generated = bool(track.get("generated"))
+        self.is_translatable = bool(track.get("translatable")) and tlang is None
+        self._track = track
+        self._tlang = tlang
+
+    def fetch(self) -> List[dict]:
+        query = {"gen": "1" if self.is_generated else "0"}
+        if self._tlang:
+            query["tlang"] = self._tlang
+        url = f"{self.base_url}/fetch/{self.video_id}/{self._track['lang']}?{urllib.parse.urlencode(query)}"
+        return _get_json(url)
+
+    def translate(self, language_code: str) -> "HttpTranscript":
+        return HttpTranscript(self.base_url, self.video_id, self._track, tlang=language_code)
+
+
+class HttpTranscriptList:
+    """
+    Mimics youtube_transcript_api's TranscriptList; use HttpTranscriptList.lister(base_url) as list_transcripts.
+    """
+
+    def __init__(self, base_url: str, video_id: str):
+        self._tracks = [HttpTranscript(base_url, video_id, t) for t in _get_json(f"{base_url}/list/{video_id}")]
+
+    @classmethod
+    def lister(cls, base_url: str):
+        return lambda video_id: cls(base_url, video_id)
+
+    def __iter__(self):
+        return iter(self._tracks)
+
+    def _find(self, languages: List[str], generated: bool) -> HttpTranscript:
+        for lang in languages:
+            for t in self._tracks:
+                if t.language_code == lang and t.is_generated == generated:
+                    return t
+        raise LookupError(f"no {'generated' if generated else 'manual'} transcript for {languages}")
+
+    def find_manually_created_transcript(self, languages: List[str]) -> HttpTranscript:
+        return self._find(languages, generated=False)
+
+    def find_generated_transcript(self, languages: List[str]) -> HttpTranscript:
+        return self._find(languages, generated=True)
@@ -0,0 +1,68 @@
+# bench_retrieval.py — latency and recall@k of vector-only vs BM25 vs hybrid (RRF) retrieval
+#
+# Run:  python bench_retrieval.py --embed-latency-ms 150
+# Uses the offline fixture transcript and HashingEmbeddings unless --openai is passed
+# (then OPENAI_API_KEY is required and real embedding latency is measured).
+
+import argparse
+import statistics
+import time
+
+from langchain_community.vectorstores import FAISS
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from bench_fixtures import HashingEmbeddings, make_transcript
+from hybrid_retriever import HybridRetriever
+
+
+def run(name, search, queries, k):
+    latencies, hits = [], 0
+    for question, keyword in queries:
+        t0 = time.perf_counter()
+        docs = search(question)[:k]
+        latencies.append((time.perf_counter() - t0) * 1000)
+        hits += any(keyword in d.page_content.lower() for d in docs)
+    lat = sorted(latencies)
+    p95 = lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+    print(f"{name:<22} recall@{k}: {hits / len(queries):.2f}   "
+          f"p50: {statistics.median(lat):7.2f} ms   p95: {p95:7.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--k", type=int, default=4)
+    ap.add_argument("--filler", type=int, default=40, help="filler segments per topic (transcript length)")
+    ap.add_argument("--embed-latency-ms", type=float, default=0.0)
+    ap.add_argument("--openai", action="store_true")
+    args = ap.parse_args()
+
+    segments, queries = make_transcript(filler_per_topic=args.filler)
+    text = " ".join(s["text"] for s in segments)
+    docs = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).create_documents([text])
+
+    if args.openai:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    else:
+        embeddings = HashingEmbeddings(latency_ms=args.embed_latency_ms)
+    vs = FAISS.from_documents(docs, embeddings)
+
+    print(f"chunks: {len(docs)}   queries: {len(queries)}   k: {args.k}\n")
+    fast = HybridRetriever(vs, docs, k=args.k, fast_path=True)
+    slow = HybridRetriever(vs, docs, k=args.k, fast_path=False)
+
+    run("vector only", lambda q: vs.similarity_search(q, k=args.k), queries, args.k)
+    run("bm25 only", lambda q: [fast.bm25.docs[i] for i, _ in fast.bm25.search(q, k=args.k)[0]], queries, args.k)
+    run("hybrid (rrf)", slow.invoke, queries, args.k)
+
+    paths = []
+    def fast_invoke(q):
+        docs_ = fast.invoke(q)
+        paths.append(fast.last_path)
+        return docs_
+    run("hybrid + fast path", fast_invoke, queries, args.k)
+    print(f"\nfast path taken for {paths.count('bm25')}/{len(paths)} queries (no query embedding)")
+
+
+if __name__ == "__main__":
+    main()
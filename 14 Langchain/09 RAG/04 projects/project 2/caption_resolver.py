@@ -0,0 +1,192 @@
+# caption_resolver.py — concurrent caption-track probing for try_fetch_transcript_api
+#
+# The sequential workflow (manual → generated → translated → any language) pays one network round-trip
+# per failed candidate. Here every candidate is fetched concurrently (bounded, with per-request timeouts)
+# and the highest-priority success wins, so latency ≈ the slowest higher-priority probe, not their sum.
+# Blocking fetches run on private threads that are abandoned, not joined, once a winner is known or their
+# timeout fires, so a hung lower-priority track never holds up the result. Results are memoized per video
+# ID + settings.
+
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# (label, blocking fetch) in priority order
+Candidate = Tuple[str, Callable[[], Any]]
+
+
+def default_list_transcripts(video_id: str):
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+    return YouTubeTranscriptApi().list(video_id)  # youtube-transcript-api >= 1.0
+
+
+async def run_detached(fetch: Callable[[], Any], timeout: float) -> Any:
+    """
+    wait_for(to_thread(fetch), timeout) on a thread of its own. asyncio.to_thread uses the loop's default
+    executor, which asyncio.run() joins on exit, so a timed-out or cancelled fetch would still block the
+    caller until it returned; this executor is shut down without waiting instead.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="caption-probe")
+    try:
+        return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(executor, fetch), timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_candidates(
+    transcript_list,
+    preferred_languages: Sequence[str] = ("en",),
+    accept_any_language: bool = True,
+    target_language_for_translation: Optional[str] = "en",
+) -> List[Candidate]:
+    """
+    Same priority order as the sequential workflow; track lookups are local, only fetch() hits the network.
+    """
+    candidates: List[Candidate] = []
+    seen = set()
+
+    def add(label: str, fetch: Callable[[], Any]) -> None:
+        if label not in seen:
+            seen.add(label)
+            candidates.append((label, fetch))
+
+    def track_label(t, kind: str) -> str:
+        return f"{kind}:{getattr(t, 'language_code', '?')}:{'gen' if getattr(t, 'is_generated', False) else 'man'}"
+
+    # 1) Manual, 2) auto-generated in preferred languages
+    if preferred_languages:
+        for finder in ("find_manually_created_transcript", "find_generated_transcript"):
+            try:
+                t = getattr(transcript_list, finder)(list(preferred_languages))
+                add(track_label(t, "track"), t.fetch)
+            except Exception:
+                pass
+
+    tracks = list(transcript_list)
+
+    # 3) Translate any transcript to target language
+    if target_language_for_translation:
+        for t in tracks:
+            if getattr(t, "is_translatable", False):
+                add(
+                    track_label(t, f"translate->{target_language_for_translation}"),
+                    lambda t=t: t.translate(target_language_for_translation).fetch(),
+                )
+
+    # 4) First available (any language)
+    if accept_any_language:
+        for t in tracks:
+            add(track_label(t, "track"), t.fetch)
+
+    return candidates
+
+
+async def probe_candidates(
+    candidates: List[Candidate],
+    timeout: float = 8.0,
+    max_concurrency: int = 4,
+) -> Tuple[Optional[str], Optional[Any]]:
+    """
+    Fetches all candidates concurrently and returns (label, result) of the highest-priority success.
+    Lower-priority probes still running when a winner is known are cancelled and their threads abandoned.
+    """
+    if not candidates:
+        return None, None
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def probe(fetch):
+        async with sem:
+            return await run_detached(fetch, timeout)
+
+    tasks = [asyncio.create_task(probe(fetch)) for _, fetch in candidates]
+    try:
+        # awaiting in priority order: a success at index i only wins once all of 0..i-1 have failed
+        for (label, _), task in zip(candidates, tasks):
+            try:
+                result = await task
+            except Exception:
+                continue
+            if result:
+                return label, result
+        return None, None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class CaptionResolver:
+    """
+    Memoizing front-end (LRU of max_entries) for probe_candidates. Thread-safe; resolve() is sync so it can
+    be called from job workers or the old try_fetch_transcript_api call sites.
+    """
+
+    def __init__(
+        self,
+        list_transcripts: Callable[[str], Any] = default_list_transcripts,
+        timeout: float = 8.0,
+        max_concurrency: int = 4,
+        max_entries: int = 256,
+    ):
+        self.list_transcripts = list_transcripts
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[tuple, Tuple[Optional[str], Optional[Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def aresolve(
+        self,
+        video_id: str,
+        preferred_languages: Sequence[str] = ("en",),
+        accept_any_language: bool = True,
+        target_language_for_translation: Optional[str] = "en",
+    ) -> Tuple[Optional[str], Optional[Any]]:
+        key = (video_id, tuple(preferred_languages), accept_any_language, target_language_for_translation)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+        transcript_list = await run_detached(lambda: self.list_transcripts(video_id), self.timeout)
+        candidates = build_candidates(
+            transcript_list, preferred_languages, accept_any_language, target_language_for_translation
+        )
+        label, result = await probe_candidates(candidates, timeout=self.timeout, max_concurrency=self.max_concurrency)
+        if hasattr(result, "to_raw_data"):
+            result = result.to_raw_data()  # 1.x FetchedTranscript → [{'text','start','duration'}]
+        resolved = (label, result)
+
+        # only successes are memoized; a transient failure should be retried next time
+        if resolved[1]:
+            with self._lock:
+                self._memo[key] = resolved
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+        return resolved
+
+    def resolve(self, video_id: str, *args, **kwargs) -> Optional[Any]:
+        """
+        Sync wrapper: returns the winning transcript (list of {'text','start','duration'}) or None.
+        """
+        _, result = asyncio.run(self.aresolve(video_id, *args, **kwargs))
+        return result
+
+
+_shared: Optional[CaptionResolver] = None
+_shared_lock = threading.Lock()
+
+
+def get_resolver() -> CaptionResolver:
+    """
+    Process-wide resolver; lives in this module so its memo survives Streamlit reruns of app.py.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = CaptionResolver()
+        return _shared
@@ -0,0 +1,218 @@
+# context_builder.py — token-aware context packing for answer_question
+#
+# With chunk_overlap=200 the top-k chunks often repeat large spans. build_context():
+#   1) MMR over the retrieved chunks (lexical similarity, no extra API call), dropping near-duplicates
+#   2) merges chunks that overlap or touch (by start_index, by timestamps, or by shared text)
+#   3) packs merged blocks best-first into a token budget measured with tiktoken
+# and reports how many prompt tokens were saved versus naively joining the retrieved chunks.
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from langchain_core.documents import Document
+
+_WORD = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=4)
+def _encoder(model: str):
+    try:
+        import tiktoken
+    except Exception:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    enc = _encoder(model)
+    return len(enc.encode(text)) if enc else max(1, len(text) // 4)
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    enc = _encoder(model)
+    if enc is None:
+        return text[: max_tokens * 4]
+    ids = enc.encode(text)
+    return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+
+
+def _shingles(text: str, n: int = 3) -> set:
+    words = _WORD.findall(text.lower())
+    return {" ".join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def mmr_select(docs: Sequence[Document], lambda_mult: float = 0.7, dup_threshold: float = 0.8) -> List[int]:
+    """
+    Maximal marginal relevance over retrieval rank. Relevance decays with rank; redundancy is the highest
+    shingle Jaccard to anything already selected. Chunks above dup_threshold are dropped entirely.
+    Returns indices into docs in selection order.
+    """
+    n = len(docs)
+    sh = [_shingles(d.page_content) for d in docs]
+    remaining = list(range(n))
+    selected: List[int] = []
+    while remaining:
+        best, best_score = None, float("-inf")
+        for i in list(remaining):
+            redundancy = max((_jaccard(sh[i], sh[j]) for j in selected), default=0.0)
+            if redundancy >= dup_threshold:
+                remaining.remove(i)
+                continue
+            score = lambda_mult * (1.0 - i / n) - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        if best is None:
+            break
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def _text_overlap(a: str, b: str, probe: int = 40) -> int:
+    """
+    Length of the longest suffix of a that is a prefix of b (0 if shorter than `probe` chars).
+    """
+    if len(b) < probe:
+        return 0
+    head = b[:probe]
+    idx = a.find(head)
+    while idx != -1:
+        if b.startswith(a[idx:]):
+            return len(a) - idx
+        idx = a.find(head, idx + 1)
+    return 0
+
+
+@dataclass
+class Block:
+    text: str
+    rank: int                     # best retrieval rank among merged chunks
+    start: Optional[float] = None  # seconds, when chunks carry timestamps
+    end: Optional[float] = None
+    pos: Optional[int] = None     # start_index in the transcript, when known
+    n_chunks: int = 1
+    video_id: Optional[str] = None  # set for corpus-wide results; blocks never merge across videos
+
+
+def _to_block(doc: Document, rank: int) -> Block:
+    m = doc.metadata or {}
+    return Block(doc.page_content, rank, m.get("start"), m.get("end"), m.get("start_index"), video_id=m.get("video_id"))
+
+
+def _try_merge(a: Block, b: Block) -> Optional[Block]:
+    """
+    Merges b after a if they overlap or are adjacent; returns None otherwise.
+    """
+    if a.video_id != b.video_id:
+        return None
+    text = None
+    if a.pos is not None and b.pos is not None and a.pos <= b.pos <= a.pos + len(a.text) + 1:
+        text = a.text + b.text[a.pos + len(a.text) - b.pos:] if b.pos < a.pos + len(a.text) else a.text + " " + b.text
+    elif a.start is not None and b.start is not None and a.start <= b.start <= (a.end or a.start) + 1.0:
+        k = _text_overlap(a.text, b.text)
+        text = a.text + b.text[k:] if k else a.text + " " + b.text
+    else:
+        k = _text_overlap(a.text, b.text)
+        if k:
+            text = a.text + b.text[k:]
+    if text is None:
+        return None
+    return Block(
+        text=text,
+        rank=min(a.rank, b.rank),
+        start=a.start,
+        end=max(x for x in (a.end, b.end) if x is not None) if (a.end is not None or b.end is not None) else None,
+        pos=a.pos,
+        n_chunks=a.n_chunks + b.n_chunks,
+        video_id=a.video_id,
+    )
+
+
+def merge_blocks(blocks: List[Block]) -> List[Block]:
+    # order by position when known so overlapping neighbours meet; otherwise keep rank order
+    def order(b: Block):
+        if b.pos is not None:
+            return (0, b.video_id or "", b.pos)
+        if b.start is not None:
+            return (0, b.video_id or "", b.start)
+        return (1, "", b.rank)
+
+    pending = sorted(blocks, key=order)
+    merged = True
+    while merged and len(pending) > 1:
+        merged = False
+        out: List[Block] = []
+        for blk in pending:
+            if out:
+                m = _try_merge(out[-1], blk) or _try_merge(blk, out[-1])
+                if m is not None:
+                    out[-1] = m
+                    merged = True
+                    continue
+            out.append(blk)
+        pending = out
+    return pending
+
+
+@dataclass
+class PackedContext:
+    blocks: List[Block] = field(default_factory=list)
+    tokens: int = 0
+    naive_tokens: int = 0
+    dropped_duplicates: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.naive_tokens - self.tokens)
+
+
+def build_context(
+    docs: Sequence[Document],
+    budget_tokens: int = 800,
+    model: str = "gpt-4o-mini",
+    lambda_mult: float = 0.7,
+    dup_threshold: float = 0.8,
+    naive_k: int = 4,
+    min_tail_tokens: int = 64,
+) -> PackedContext:
+    """
+    Returns blocks (chronological when positions are known) fitting in budget_tokens.
+    naive_tokens is the cost of the old behaviour: the top naive_k chunks joined as-is.
+    """
+    naive = "\n\n".join(d.page_content for d in docs[:naive_k])
+    result = PackedContext(naive_tokens=count_tokens(naive, model) if docs else 0)
+    if not docs:
+        return result
+
+    order = mmr_select(docs, lambda_mult=lambda_mult, dup_threshold=dup_threshold)
+    result.dropped_duplicates = len(docs) - len(order)
+    blocks = merge_blocks([_to_block(docs[i], rank) for rank, i in enumerate(order)])
+
+    used = 0
+    chosen: List[Block] = []
+    for blk in sorted(blocks, key=lambda b: b.rank):
+        cost = count_tokens(blk.text, model)
+        if used + cost > budget_tokens:
+            room = budget_tokens - used
+            if room < min_tail_tokens:
+                continue
+            blk.text = truncate_tokens(blk.text, room, model)
+            cost = room
+        chosen.append(blk)
+        used += cost
+
+    chosen.sort(key=lambda b: (
+        b.video_id or "", b.pos if b.pos is not None else b.start if b.start is not None else float("inf"), b.rank
+    ))
+    result.blocks = chosen
+    result.tokens = count_tokens("\n\n".join(b.text for b in chosen), model)
+    return result
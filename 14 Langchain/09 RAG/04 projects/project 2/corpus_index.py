@@ -0,0 +1,397 @@
+# corpus_index.py — one searchable FAISS corpus for many videos, sharded and filterable by video ID
+#
+# Vectors are grouped into shards (per channel/collection by default, or one per video). Each shard is a
+# raw faiss index with shard-local sequential ids plus its own docstore, and every video owns one
+# contiguous id range inside its shard, so:
+#   - adding a video appends to one shard (no rebuild); videos already in the corpus are skipped
+#   - filtering by video ID only searches the shards holding those videos, with an IDSelector over
+#     the videos' id ranges
+#   - a shard starts as an exact IndexFlatIP and is retrained once as IVF-PQ when it outgrows
+#     ivf_threshold vectors; later adds are encoded straight into the trained IVF-PQ index
+#
+# Layout: <root>/corpus.json (shards) and <root>/<shard dir>/{index.faiss, docs.pkl, deltas/<lo>.pkl}.
+# save() is append-only: each new video goes to its own delta file (chunks + unit vectors), and a shard's
+# full index.faiss/docs.pkl checkpoint is only rewritten once its deltas outgrow the checkpoint (or after
+# the IVF-PQ retrain), so adding a video to a large shard no longer rewrites the whole shard.
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+DEFAULT_SHARD = "_default"
+
+
+def _as_matrix(vectors) -> np.ndarray:
+    x = np.ascontiguousarray(np.asarray(vectors, dtype="float32"))
+    if x.ndim == 1:
+        x = x.reshape(1, -1)
+    faiss.normalize_L2(x)  # inner product on unit vectors == cosine similarity
+    return x
+
+
+def _pq_m(dim: int, max_m: int) -> int:
+    # PQ needs m | dim; take the largest divisor not above max_m
+    return max(m for m in range(1, min(dim, max_m) + 1) if dim % m == 0)
+
+
+def _index_bytes(index) -> int:
+    """
+    Resident size of the vectors and codebooks (ignores small per-index overheads).
+    """
+    if isinstance(index, faiss.IndexIVFPQ):
+        pq = index.pq
+        return (
+            index.ntotal * (index.code_size + 8)   # codes + stored ids
+            + index.nlist * index.d * 4             # coarse centroids
+            + pq.M * pq.ksub * pq.dsub * 4          # PQ codebooks
+        )
+    return index.ntotal * index.d * 4
+
+
+@dataclass
+class Shard:
+    name: str
+    index: "faiss.Index"
+    texts: List[str] = field(default_factory=list)
+    metas: List[dict] = field(default_factory=list)
+    ranges: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # video_id -> [lo, hi)
+    text_bytes: int = 0
+    checkpointed: int = 0  # vectors covered by index.faiss/docs.pkl on disk
+    unsaved: List[Tuple[str, np.ndarray]] = field(default_factory=list)  # (video_id, unit vectors) not on disk
+    rebuilt: bool = False  # retrained since the last checkpoint: its deltas no longer replay onto it
+
+    @property
+    def is_ivf(self) -> bool:
+        return isinstance(self.index, faiss.IndexIVF)
+
+    @property
+    def dirname(self) -> str:
+        return hashlib.sha1(self.name.encode("utf-8")).hexdigest()[:16]
+
+
+class CorpusIndex:
+    """
+    Multi-video vector index. Thread-safe: index jobs add videos while sessions query.
+    shard_by: "channel" groups videos by the channel passed to add_video (DEFAULT_SHARD when none);
+    "video" gives every video its own shard (cheap filtered search, slower corpus-wide fan-out).
+    A shard is checkpointed once its delta files hold more than max(checkpoint_every, checkpointed) vectors.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        dim: Optional[int] = None,
+        shard_by: str = "channel",
+        ivf_threshold: int = 20_000,
+        pq_m: int = 64,
+        nprobe: int = 16,
+        checkpoint_every: int = 5_000,
+    ):
+        if shard_by not in ("channel", "video"):
+            raise ValueError(f"shard_by must be 'channel' or 'video', got {shard_by!r}")
+        self.root = Path(root) if root else None
+        self.dim = dim
+        self.shard_by = shard_by
+        self.ivf_threshold = ivf_threshold
+        self.pq_m = pq_m
+        self.nprobe = nprobe
+        self.checkpoint_every = checkpoint_every
+        self._shards: Dict[str, Shard] = {}
+        self._video_shard: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self._manifest_dirty = False
+        if self.root is not None and (self.root / "corpus.json").exists():
+            self._load()
+
+    # ---------- adding ----------
+
+    def has_video(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._video_shard
+
+    def videos(self) -> List[str]:
+        with self._lock:
+            return list(self._video_shard)
+
+    def add_video(
+        self,
+        video_id: str,
+        texts: Sequence[str],
+        vectors,
+        metadatas: Optional[Sequence[dict]] = None,
+        channel: Optional[str] = None,
+    ) -> int:
+        """
+        Appends one video's chunks to its shard. Returns the number of chunks added
+        (0 when the video is already indexed).
+        """
+        if not texts:
+            return 0
+        x = _as_matrix(vectors)
+        if len(texts) != x.shape[0]:
+            raise ValueError(f"{len(texts)} texts but {x.shape[0]} vectors")
+        metadatas = list(metadatas) if metadatas is not None else [{} for _ in texts]
+
+        with self._lock:
+            if video_id in self._video_shard:
+                return 0
+            if self.dim is None:
+                self.dim = x.shape[1]
+            elif x.shape[1] != self.dim:
+                raise ValueError(f"vector dim {x.shape[1]} does not match corpus dim {self.dim}")
+
+            name = video_id if self.shard_by == "video" else (channel or DEFAULT_SHARD)
+            shard = self._shards.get(name)
+            if shard is None:
+                shard = self._shards[name] = Shard(name, faiss.IndexFlatIP(self.dim))
+                self._manifest_dirty = True
+
+            self._append(shard, video_id, list(texts), [{**m, "video_id": video_id} for m in metadatas], x)
+            shard.unsaved.append((video_id, x))
+            self._maybe_compress(shard)
+            return len(texts)
+
+    def _append(self, shard: Shard, video_id: str, texts: List[str], metas: List[dict], x: np.ndarray) -> None:
+        lo = shard.index.ntotal
+        if shard.is_ivf:
+            shard.index.add_with_ids(x, np.arange(lo, lo + len(texts), dtype="int64"))
+        else:
+            shard.index.add(x)  # flat ids are implicit positions: lo..hi-1
+        shard.texts.extend(texts)
+        shard.metas.extend(metas)
+        shard.text_bytes += sum(len(t.encode("utf-8")) for t in texts)
+        shard.ranges[video_id] = (lo, lo + len(texts))
+        self._video_shard[video_id] = shard.name
+
+    def add_from_faiss(self, video_id: str, vs, channel: Optional[str] = None) -> int:
+        """
+        Copies a per-video LangChain FAISS store into the corpus (vectors are reconstructed, not re-embedded).
+        """
+        if self.has_video(video_id):
+            return 0
+        n = vs.index.ntotal
+        if n == 0:
+            return 0
+        vectors = vs.index.reconstruct_n(0, n)
+        docs = [vs.docstore.search(vs.index_to_docstore_id[i]) for i in range(n)]
+        return self.add_video(
+            video_id,
+            [d.page_content for d in docs],
+            vectors,
+            metadatas=[dict(d.metadata or {}) for d in docs],
+            channel=channel,
+        )
+
+    def _maybe_compress(self, shard: Shard) -> None:
+        n = shard.index.ntotal
+        if shard.is_ivf or n < max(self.ivf_threshold, 256):
+            return
+        x = shard.index.reconstruct_n(0, n)
+        nlist = max(1, min(int(4 * math.sqrt(n)), n // 39))  # faiss wants >= 39 training points per list
+        m = _pq_m(self.dim, self.pq_m)
+        ivf = faiss.index_factory(self.dim, f"IVF{nlist},PQ{m}", faiss.METRIC_INNER_PRODUCT)
+        ivf.train(x)
+        ivf.add_with_ids(x, np.arange(n, dtype="int64"))
+        ivf.nprobe = self.nprobe
+        shard.index = ivf
+        shard.rebuilt = True
+
+    # ---------- searching ----------
+
+    def _search_params(self, shard: Shard, video_ids: Optional[Sequence[str]]):
+        """
+        Returns (params, keepalive). keepalive holds the id array an IDSelectorBatch points into.
+        """
+        sel, ids = None, None
+        if video_ids is not None:
+            wanted = [shard.ranges[v] for v in video_ids if v in shard.ranges]
+            if len(wanted) < len(shard.ranges):
+                if len(wanted) == 1:
+                    sel = faiss.IDSelectorRange(*wanted[0])
+                else:
+                    ids = np.concatenate([np.arange(lo, hi, dtype="int64") for lo, hi in wanted])
+                    sel = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+        if shard.is_ivf:
+            params = faiss.SearchParametersIVF(nprobe=self.nprobe)
+            if sel is not None:
+                params.sel = sel
+            return params, (sel, ids)
+        return (faiss.SearchParameters(sel=sel) if sel is not None else None), (sel, ids)
+
+    def search(
+        self,
+        query_vector,
+        k: int = 4,
+        video_ids: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[Document, float]]:
+        """
+        Top-k (Document, cosine score) across the corpus, or only within video_ids when given.
+        """
+        q = _as_matrix(query_vector)
+        with self._lock:
+            if video_ids is None:
+                shards = list(self._shards.values())
+            else:
+                names = {self._video_shard[v] for v in video_ids if v in self._video_shard}
+                shards = [self._shards[n] for n in names]
+
+            hits: List[Tuple[float, str, int]] = []
+            for shard in shards:
+                if shard.index.ntotal == 0:
+                    continue
+                params, keepalive = self._search_params(shard, video_ids)
+                scores, ids = shard.index.search(q, min(k, shard.index.ntotal), params=params)
+                del keepalive
+                hits.extend((float(s), shard.name, int(i)) for s, i in zip(scores[0], ids[0]) if i >= 0)
+
+            out = []
+            for score, name, i in heapq.nlargest(k, hits):
+                shard = self._shards[name]
+                out.append((Document(page_content=shard.texts[i], metadata=dict(shard.metas[i])), score))
+            return out
+
+    # ---------- stats / persistence ----------
+
+    def stats(self) -> dict:
+        with self._lock:
+            index_bytes = sum(_index_bytes(s.index) for s in self._shards.values())
+            text_bytes = sum(s.text_bytes for s in self._shards.values())
+            return {
+                "videos": len(self._video_shard),
+                "shards": len(self._shards),
+                "ivf_shards": sum(s.is_ivf for s in self._shards.values()),
+                "vectors": sum(s.index.ntotal for s in self._shards.values()),
+                "index_bytes": index_bytes,
+                "text_bytes": text_bytes,
+            }
+
+    def save(self) -> int:
+        """
+        Persists the videos added since the last save (temp file + rename each), checkpointing shards whose
+        deltas have grown too large. Returns shards written.
+        """
+        if self.root is None:
+            return 0
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            written = 0
+            for shard in self._shards.values():
+                if not shard.unsaved and not shard.rebuilt:
+                    continue
+                d = self.root / shard.dirname
+                d.mkdir(exist_ok=True)
+                in_deltas = shard.index.ntotal - shard.checkpointed
+                if shard.rebuilt or in_deltas > max(self.checkpoint_every, shard.checkpointed):
+                    self._write_checkpoint(shard, d)
+                else:
+                    self._write_deltas(shard, d)
+                written += 1
+
+            if self._manifest_dirty:
+                manifest = {
+                    "dim": self.dim,
+                    "shard_by": self.shard_by,
+                    "shards": {s.name: s.dirname for s in self._shards.values()},
+                }
+                tmp = self.root / "corpus.json.tmp"
+                tmp.write_text(json.dumps(manifest))
+                os.replace(tmp, self.root / "corpus.json")
+                self._manifest_dirty = False
+            return written
+
+    def _write_deltas(self, shard: Shard, d: Path) -> None:
+        deltas = d / "deltas"
+        deltas.mkdir(exist_ok=True)
+        for video_id, x in shard.unsaved:
+            lo, hi = shard.ranges[video_id]
+            tmp = deltas / f"{lo:012d}.pkl.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump((video_id, lo, shard.texts[lo:hi], shard.metas[lo:hi], x), f)
+            os.replace(tmp, deltas / f"{lo:012d}.pkl")
+        shard.unsaved.clear()
+
+    def _write_checkpoint(self, shard: Shard, d: Path) -> None:
+        faiss.write_index(shard.index, str(d / "index.faiss.tmp"))
+        with open(d / "docs.pkl.tmp", "wb") as f:
+            pickle.dump((shard.texts, shard.metas, shard.ranges), f)
+        os.replace(d / "index.faiss.tmp", d / "index.faiss")
+        os.replace(d / "docs.pkl.tmp", d / "docs.pkl")
+        shard.checkpointed = shard.index.ntotal
+        shard.unsaved.clear()
+        shard.rebuilt = False
+        # every delta is inside the checkpoint now (a crash before this point is handled by _replay_deltas)
+        for p in (d / "deltas").glob("*.pkl"):
+            p.unlink()
+
+    def _load(self) -> None:
+        manifest = json.loads((self.root / "corpus.json").read_text())
+        self.dim = manifest.get("dim") or self.dim
+        self.shard_by = manifest.get("shard_by", self.shard_by)
+        for name, dirname in manifest.get("shards", {}).items():
+            d = self.root / dirname
+            try:
+                shard = self._read_checkpoint(name, d)
+            except Exception:
+                continue  # a missing/corrupt shard only loses its own videos
+            self._replay_deltas(shard, d)
+            self._shards[name] = shard
+        self._video_shard = {v: s.name for s in self._shards.values() for v in s.ranges}
+
+    def _read_checkpoint(self, name: str, d: Path) -> Shard:
+        if not (d / "index.faiss").exists():
+            return Shard(name, faiss.IndexFlatIP(self.dim))  # only deltas so far
+        index = faiss.read_index(str(d / "index.faiss"))
+        with open(d / "docs.pkl", "rb") as f:
+            texts, metas, ranges = pickle.load(f)
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        text_bytes = sum(len(t.encode("utf-8")) for t in texts)
+        return Shard(name, index, texts, metas, ranges, text_bytes=text_bytes, checkpointed=index.ntotal)
+
+    def _replay_deltas(self, shard: Shard, d: Path) -> None:
+        paths = sorted((d / "deltas").glob("*.pkl"))
+        for i, p in enumerate(paths):
+            try:
+                with open(p, "rb") as f:
+                    video_id, lo, texts, metas, x = pickle.load(f)
+            except Exception:
+                lo = None
+            if lo is not None and lo < shard.index.ntotal:
+                continue  # already in the checkpoint
+            if lo != shard.index.ntotal:
+                # unreadable or missing delta: the later ones cannot be placed, drop them (re-added on demand)
+                for rest in paths[i:]:
+                    rest.unlink()
+                return
+            self._append(shard, video_id, texts, metas, x)
+
+
+class CorpusRetriever:
+    """
+    Retriever-style view of a CorpusIndex (same invoke() signature as HybridRetriever/StreamingIndexer).
+    video_ids=None searches every indexed video.
+    """
+
+    def __init__(self, corpus: CorpusIndex, embeddings, video_ids: Optional[Sequence[str]] = None, k: int = 4):
+        self.corpus = corpus
+        self.embeddings = embeddings
+        self.video_ids = list(video_ids) if video_ids is not None else None
+        self.k = k
+
+    def invoke(self, question: str, k: Optional[int] = None, query_vector: Optional[List[float]] = None) -> List[Document]:
+        # query_vector may be a lazy QueryVector from the answer cache
+        if callable(query_vector):
+            query_vector = query_vector()
+        qvec = query_vector if query_vector is not None else self.embeddings.embed_query(question)
+        return [d for d, _ in self.corpus.search(qvec, k=k or self.k, video_ids=self.video_ids)]
@@ -0,0 +1,158 @@
+# embedding_cache.py — chunk-level embedding dedup cache (SQLite) shared across videos
+#
+# Sponsor reads, intros and repeated captions produce identical chunks across many videos.
+# CachedEmbeddings sits in front of any LangChain Embeddings and only sends cache misses upstream.
+
+import hashlib
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+# USD per 1M input tokens (used only for the "cost avoided" report)
+EMBED_PRICE_PER_MTOK = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_chunk(text: str) -> str:
+    return _WS.sub(" ", text).strip()
+
+
+def count_tokens(text: str) -> int:
+    try:
+        import tiktoken
+        return len(tiktoken.get_encoding("cl100k_base").encode(text))
+    except Exception:
+        return max(1, len(text) // 4)  # rough fallback: ~4 chars per token
+
+
+@dataclass
+class EmbeddingStats:
+    hits: int = 0
+    misses: int = 0
+    tokens_avoided: int = 0
+    cost_avoided_usd: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "tokens_avoided": self.tokens_avoided,
+            "cost_avoided_usd": round(self.cost_avoided_usd, 6),
+        }
+
+
+class EmbeddingCache:
+    """
+    SQLite table of float32 vectors keyed by sha256(model + normalized chunk text).
+    One connection guarded by a lock; WAL mode so concurrent app processes can read while one writes.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT NOT NULL, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_chunk(text)}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # SQLite caps bound parameters, so look up in slices
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", part)
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vec) VALUES (?, ?, ?)",
+                [(k, model, array("f", v).tobytes()) for k, v in items.items()],
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper: looks up every chunk in the cache, then embeds only the (deduplicated)
+    misses in batched upstream calls. Per-build stats are read with pop_stats().
+    """
+
+    def __init__(self, inner: Embeddings, cache: EmbeddingCache, model_name: str, batch_size: int = 256):
+        self.inner = inner
+        self.cache = cache
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.stats = EmbeddingStats()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [EmbeddingCache.make_key(t, self.model_name) for t in texts]
+        found = self.cache.get_many(list(set(keys)))
+
+        # Unique misses, in first-seen order
+        miss_text: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in miss_text:
+                miss_text[key] = text
+
+        fresh: Dict[str, List[float]] = {}
+        miss_keys = list(miss_text)
+        for i in range(0, len(miss_keys), self.batch_size):
+            batch = miss_keys[i:i + self.batch_size]
+            vectors = self.inner.embed_documents([miss_text[k] for k in batch])
+            fresh.update(zip(batch, vectors))
+        self.cache.put_many(self.model_name, fresh)
+        found.update(fresh)
+
+        # Anything not sent upstream counts as a hit (cache rows and in-batch duplicates)
+        sent = set()
+        price = EMBED_PRICE_PER_MTOK.get(self.model_name, 0.0)
+        for key, text in zip(keys, texts):
+            if key in fresh and key not in sent:
+                sent.add(key)
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                tokens = count_tokens(text)
+                self.stats.tokens_avoided += tokens
+                self.stats.cost_avoided_usd += tokens * price / 1_000_000
+
+        return [found[k] for k in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.inner.embed_query(text)
+
+    def pop_stats(self) -> EmbeddingStats:
+        stats, self.stats = self.stats, EmbeddingStats()
+        return stats
@@ -0,0 +1,174 @@
+# hybrid_retriever.py — in-process BM25 + FAISS retrieval fused with reciprocal-rank fusion (RRF)
+#
+# BM25 catches exact keywords (names, numbers, jargon) that embeddings blur, and costs no network call.
+# When BM25 alone is confident (every query term found, clear winner) the query embedding is skipped.
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does did for from how i in is it its of on or so that the this "
+    "to was were what when where which who why will with you your about can they he she we".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring. Supports incremental add(); idf is computed at query time.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: List[Document] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)  # term -> [(doc_idx, tf)]
+        self.doc_len: List[int] = []
+        self.total_len = 0
+
+    def add(self, docs: Sequence[Document]) -> None:
+        for doc in docs:
+            idx = len(self.docs)
+            tokens = tokenize(doc.page_content)
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((idx, tf))
+            self.docs.append(doc)
+            self.doc_len.append(len(tokens))
+            self.total_len += len(tokens)
+
+    def idf(self, term: str) -> float:
+        n = len(self.docs)
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 4) -> Tuple[List[Tuple[int, float]], float]:
+        """
+        Returns ([(doc_idx, score), ...] best first, query-term coverage of the top hit).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.docs:
+            return [], 0.0
+
+        avgdl = self.total_len / len(self.docs) or 1.0
+        scores: Dict[int, float] = defaultdict(float)
+        matched: Dict[int, int] = defaultdict(int)
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for idx, tf in postings:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[idx] / avgdl)
+                scores[idx] += idf * tf * (self.k1 + 1) / norm
+                matched[idx] += 1
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+        coverage = matched[ranked[0][0]] / len(terms) if ranked else 0.0
+        return ranked, coverage
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], rrf_k: int = 60) -> List[str]:
+    """
+    Fuses several ranked lists of ids: score(id) = sum over lists of 1 / (rrf_k + rank).
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] += 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def lexically_confident(
+    ranked: List[Tuple[int, float]], coverage: float, min_coverage: float = 1.0, min_margin: float = 0.35
+) -> bool:
+    """
+    True when BM25 alone can answer: the top hit covers enough query terms and clearly beats the second.
+    """
+    if not ranked or coverage < min_coverage:
+        return False
+    top = ranked[0][1]
+    second = ranked[1][1] if len(ranked) > 1 else 0.0
+    return top > 0 and (top - second) / top >= min_margin
+
+
+def fuse_documents(lexical: Sequence[Document], semantic: Sequence[Document], k: int, rrf_k: int = 60) -> List[Document]:
+    """
+    RRF over a BM25 and a vector ranking of Documents; a chunk found by both is returned once.
+    """
+    by_key: Dict[str, Document] = {}
+    rankings = []
+    for docs in (lexical, semantic):
+        keys = []
+        for doc in docs:
+            by_key.setdefault(doc.page_content, doc)
+            keys.append(doc.page_content)
+        rankings.append(keys)
+    fused = reciprocal_rank_fusion(rankings, rrf_k=rrf_k)
+    return [by_key[key] for key in fused[:k]]
+
+
+def docs_from_faiss(vs) -> List[Document]:
+    """
+    Recovers the chunk list (in index order) from a LangChain FAISS store, e.g. one loaded from disk.
+    """
+    return [vs.docstore.search(vs.index_to_docstore_id[i]) for i in range(len(vs.index_to_docstore_id))]
+
+
+class HybridRetriever:
+    """
+    Retriever-style object (invoke(question) -> List[Document]) fusing BM25 and FAISS results.
+    last_path records which path answered the most recent query ("bm25" or "hybrid").
+    """
+
+    def __init__(
+        self,
+        vs,
+        docs: Optional[Sequence[Document]] = None,
+        k: int = 4,
+        fetch_k: int = 10,
+        rrf_k: int = 60,
+        fast_path: bool = True,
+        min_coverage: float = 1.0,
+        min_margin: float = 0.35,
+    ):
+        self.vs = vs
+        self.k = k
+        self.fetch_k = fetch_k
+        self.rrf_k = rrf_k
+        self.fast_path = fast_path
+        self.min_coverage = min_coverage
+        self.min_margin = min_margin
+        self.bm25 = BM25Index()
+        self.bm25.add(list(docs) if docs is not None else docs_from_faiss(vs))
+        self.last_path: Optional[str] = None
+
+    def invoke(self, question: str, k: Optional[int] = None, query_vector: Optional[List[float]] = None) -> List[Document]:
+        """
+        query_vector: optional precomputed question embedding, or a lazy QueryVector from the answer cache
+        (only called if the BM25 fast path does not answer), to avoid re-embedding.
+        """
+        k = k or self.k
+        ranked, coverage = self.bm25.search(question, k=self.fetch_k)
+
+        lexical = [self.bm25.docs[i] for i, _ in ranked]
+
+        if self.fast_path and lexically_confident(ranked, coverage, self.min_coverage, self.min_margin):
+            self.last_path = "bm25"
+            return lexical[:k]
+
+        self.last_path = "hybrid"
+        if query_vector is not None:
+            semantic = self.vs.similarity_search_by_vector(
+                query_vector() if callable(query_vector) else query_vector, k=self.fetch_k
+            )
+        else:
+            semantic = self.vs.similarity_search(question, k=self.fetch_k)
+        return fuse_documents(lexical, semantic, k, rrf_k=self.rrf_k)
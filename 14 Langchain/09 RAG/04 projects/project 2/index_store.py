@@ -0,0 +1,162 @@
+# index_store.py — content-addressed on-disk cache of FAISS indexes (one entry per video + settings)
+#
+# Layout (one directory per key):
+#   <root>/<key>/index.faiss   raw FAISS index (memory-mapped on load)
+#   <root>/<key>/index.pkl     (docstore, index_to_docstore_id) as written by FAISS.save_local
+#   <root>/<key>/transcript.txt
+#   <root>/<key>/meta.json     key inputs, n_chunks, size, last_access (drives LRU eviction)
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+class IndexStore:
+    """
+    Persistent FAISS index cache with a size-bounded LRU eviction policy.
+    Entries are immutable once written; a cache hit never touches the network or the embedding API.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 2 * 1024 ** 3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        video_id: str,
+        languages: Sequence[str],
+        translate_to: Optional[str],
+        chunk_size: int,
+        chunk_overlap: int,
+        embed_model: str,
+        chunking: str = "text",
+    ) -> str:
+        inputs = {
+            "video_id": video_id,
+            "languages": list(languages),
+            "translate_to": translate_to,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "embed_model": embed_model,
+        }
+        # only non-default chunking strategies enter the hash, so existing "text" entries stay valid
+        if chunking != "text":
+            inputs["chunking"] = chunking
+        payload = json.dumps(inputs, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def _read_meta(self, entry: Path) -> Optional[dict]:
+        try:
+            return json.loads((entry / "meta.json").read_text())
+        except Exception:
+            return None
+
+    def _write_meta(self, entry: Path, meta: dict) -> None:
+        tmp = entry / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, entry / "meta.json")
+
+    def load(self, key: str, embeddings) -> Optional[Tuple[FAISS, str, int]]:
+        """
+        Returns (vector_store, transcript_text, n_chunks) or None on a miss.
+        The FAISS index is memory-mapped so replicas on the same host share pages.
+        """
+        entry = self._entry(key)
+        meta = self._read_meta(entry)
+        if meta is None:
+            return None
+
+        try:
+            try:
+                index = faiss.read_index(str(entry / "index.faiss"), faiss.IO_FLAG_MMAP)
+            except RuntimeError:
+                # Older faiss builds cannot mmap flat indexes; fall back to a normal read.
+                index = faiss.read_index(str(entry / "index.faiss"))
+            with open(entry / "index.pkl", "rb") as f:
+                docstore, index_to_docstore_id = pickle.load(f)
+            transcript_text = (entry / "transcript.txt").read_text(encoding="utf-8")
+        except Exception:
+            # Corrupt or half-evicted entry: drop it and treat as a miss.
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        meta["last_access"] = time.time()
+        self._write_meta(entry, meta)
+
+        vs = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id,
+        )
+        return vs, transcript_text, int(meta.get("n_chunks", len(index_to_docstore_id)))
+
+    def save(self, key: str, vs: FAISS, transcript_text: str, n_chunks: int, key_inputs: Optional[dict] = None) -> None:
+        """
+        Writes the entry into a temp dir and renames it into place, so readers never see a partial index.
+        """
+        entry = self._entry(key)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{key}_", dir=self.root))
+        try:
+            vs.save_local(str(tmp))
+            (tmp / "transcript.txt").write_text(transcript_text, encoding="utf-8")
+            meta = {
+                "key": key,
+                "inputs": key_inputs or {},
+                "n_chunks": n_chunks,
+                "created": time.time(),
+                "last_access": time.time(),
+            }
+            meta["size_bytes"] = _dir_size(tmp)
+            self._write_meta(tmp, meta)
+
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Deletes least-recently-used entries until the store fits in max_bytes.
+        Returns the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            meta = self._read_meta(entry)
+            if meta is None:
+                continue
+            size = int(meta.get("size_bytes") or _dir_size(entry))
+            entries.append((float(meta.get("last_access", 0)), size, entry))
+            total += size
+
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
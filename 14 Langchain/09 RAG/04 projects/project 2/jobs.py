@@ -0,0 +1,103 @@
+# jobs.py — background indexing jobs for the YouTube RAG app
+#
+# A bounded thread pool runs "index this video" jobs off the Streamlit script thread. Jobs are keyed by
+# video ID + settings, so two sessions asking for the same video share one job (and one index).
+# Job functions report progress through job.set_state(); the UI polls job.snapshot().
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+QUEUED = "queued"
+FETCHING = "fetching"
+TRANSCRIBING = "transcribing"
+EMBEDDING = "embedding"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    key: str
+    video_id: str
+    state: str = QUEUED
+    detail: str = ""
+    result: Any = None    # may be set before DONE (e.g. a streaming index that is already queryable)
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+
+    def set_state(self, state: str, detail: str = "") -> None:
+        self.state, self.detail, self.updated = state, detail, time.time()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, FAILED)
+
+    def snapshot(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "state": self.state,
+            "detail": self.detail,
+            "ready": self.result is not None,
+            "error": self.error,
+            "elapsed_s": round((self.updated if self.finished else time.time()) - self.created, 1),
+        }
+
+
+class JobQueue:
+    """
+    submit() is idempotent per key: a queued, running or finished job is returned as-is; only a
+    failed job is replaced by a fresh attempt. Finished jobs are kept (LRU) up to max_finished: each
+    one holds a whole index in memory, and once evicted a resubmit loads it back from the on-disk cache.
+    """
+
+    def __init__(self, max_workers: int = 2, max_finished: int = 8):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="index-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def submit(self, key: str, video_id: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """
+        fn(job, *args, **kwargs) runs on a worker; its return value becomes job.result.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.state != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = Job(key=key, video_id=video_id)
+            self._trim()
+
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, key: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(key)
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.finished)
+
+    def _run(self, job: Job, fn, args, kwargs) -> None:
+        try:
+            result = fn(job, *args, **kwargs)
+            if result is not None:
+                job.result = result
+            if job.state != FAILED:
+                job.set_state(DONE)
+        except Exception as e:
+            # drop a partially built index (streaming mode publishes it early) so it is never reported ready
+            job.result = None
+            job.error = f"{type(e).__name__}: {e}"
+            job.set_state(FAILED)
+
+    def _trim(self) -> None:
+        finished = [k for k, j in self._jobs.items() if j.finished]
+        for key in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
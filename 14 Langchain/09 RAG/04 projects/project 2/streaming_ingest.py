@@ -0,0 +1,211 @@
+# streaming_ingest.py — incremental, time-anchored transcript ingestion
+#
+# Caption segments ({'text','start','duration'}) are packed into ~chunk_size character chunks as they
+# arrive, keeping start/end timestamps in metadata. Chunks are embedded in pipelined batches and added
+# to a FAISS index that can already answer questions while the rest of the video is still indexing.
+# Each batch also goes into an incremental BM25 index, so queries get the same hybrid retrieval as
+# HybridRetriever (RRF fusion, no query embedding when BM25 alone is confident).
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from hybrid_retriever import BM25Index, fuse_documents, lexically_confident
+
+
+def _seg_field(seg, name: str, default=None):
+    # youtube-transcript-api returns dicts (0.x) or snippet objects (1.x); faster-whisper returns objects
+    if isinstance(seg, dict):
+        return seg.get(name, default)
+    return getattr(seg, name, default)
+
+
+def fmt_ts(seconds: float) -> str:
+    seconds = int(seconds or 0)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+def iter_time_chunks(
+    segments: Iterable,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    video_id: Optional[str] = None,
+) -> Iterator[Document]:
+    """
+    Packs caption segments into chunks of roughly chunk_size characters without ever splitting a segment,
+    so every chunk maps to a real [start, end] time range. Trailing segments totalling at most
+    chunk_overlap characters are carried into the next chunk.
+    """
+    window = []  # (text, start, end)
+    size = 0
+    fresh = 0  # segments added since the last emitted chunk
+
+    def emit() -> Document:
+        meta = {"start": window[0][1], "end": window[-1][2]}
+        if video_id:
+            meta["video_id"] = video_id
+        return Document(page_content=" ".join(t for t, _, _ in window), metadata=meta)
+
+    for seg in segments:
+        text = (_seg_field(seg, "text") or "").strip()
+        if not text:
+            continue
+        start = float(_seg_field(seg, "start", 0.0) or 0.0)
+        end = _seg_field(seg, "end")
+        if end is None:
+            end = start + float(_seg_field(seg, "duration", 0.0) or 0.0)
+        window.append((text, start, float(end)))
+        size += len(text) + 1
+        fresh += 1
+
+        if size >= chunk_size:
+            yield emit()
+            # keep a tail of whole segments as overlap
+            tail, tail_size = [], 0
+            for item in reversed(window[1:]):
+                if tail_size + len(item[0]) + 1 > chunk_overlap:
+                    break
+                tail.insert(0, item)
+                tail_size += len(item[0]) + 1
+            window, size, fresh = tail, tail_size, 0
+
+    if window and fresh:
+        yield emit()
+
+
+def _batched(docs: Iterable[Document], n: int) -> Iterator[List[Document]]:
+    batch: List[Document] = []
+    for d in docs:
+        batch.append(d)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StreamingIndexer:
+    """
+    Background indexer. Embedding of the next batches overlaps with adding the current one to FAISS.
+    Exposes retriever-style invoke(question) that searches whatever has been indexed so far, with the
+    same BM25 + FAISS fusion and fast path as HybridRetriever (last_path records which one answered).
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = 32,
+        k: int = 4,
+        max_in_flight: int = 2,
+        on_complete: Optional[Callable[["StreamingIndexer"], None]] = None,
+        fetch_k: int = 10,
+        rrf_k: int = 60,
+        fast_path: bool = True,
+        min_coverage: float = 1.0,
+        min_margin: float = 0.35,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.k = k
+        self.max_in_flight = max_in_flight
+        self.on_complete = on_complete
+        self.fetch_k = fetch_k
+        self.rrf_k = rrf_k
+        self.fast_path = fast_path
+        self.min_coverage = min_coverage
+        self.min_margin = min_margin
+
+        self.vs: Optional[FAISS] = None
+        self.bm25 = BM25Index()
+        self.last_path: Optional[str] = None
+        self.n_chunks = 0
+        self.indexed_until = 0.0
+        self.done = False
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, docs: Iterable[Document]) -> "StreamingIndexer":
+        self._thread = threading.Thread(target=self._run, args=(docs,), daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.done
+
+    def _add(self, batch: List[Document], vectors: List[List[float]]) -> None:
+        pairs = list(zip([d.page_content for d in batch], vectors))
+        metas = [d.metadata for d in batch]
+        with self._lock:
+            if self.vs is None:
+                self.vs = FAISS.from_embeddings(pairs, self.embeddings, metadatas=metas)
+            else:
+                self.vs.add_embeddings(pairs, metadatas=metas)
+            self.bm25.add(batch)
+            self.n_chunks += len(batch)
+            self.indexed_until = max(self.indexed_until, float(batch[-1].metadata.get("end", 0.0)))
+
+    def _run(self, docs: Iterable[Document]) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+                in_flight = deque()
+                for batch in _batched(docs, self.batch_size):
+                    fut = pool.submit(self.embeddings.embed_documents, [d.page_content for d in batch])
+                    in_flight.append((batch, fut))
+                    # add in order; only block once max_in_flight batches are outstanding
+                    while in_flight and (len(in_flight) >= self.max_in_flight or in_flight[0][1].done()):
+                        b, f = in_flight.popleft()
+                        self._add(b, f.result())
+                while in_flight:
+                    b, f = in_flight.popleft()
+                    self._add(b, f.result())
+            if self.n_chunks == 0:
+                raise RuntimeError("No chunks produced from transcript segments.")
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self.done = True
+
+        if self.error is None and self.on_complete is not None:
+            try:
+                self.on_complete(self)
+            except Exception:
+                pass
+
+    def progress(self) -> dict:
+        return {
+            "n_chunks": self.n_chunks,
+            "indexed_until": self.indexed_until,
+            "done": self.done,
+            "error": self.error,
+        }
+
+    def invoke(self, question: str, k: Optional[int] = None, query_vector: Optional[List[float]] = None) -> List[Document]:
+        if self.vs is None:
+            return []
+        k = k or self.k
+        with self._lock:
+            ranked, coverage = self.bm25.search(question, k=self.fetch_k)
+            lexical = [self.bm25.docs[i] for i, _ in ranked]
+
+        if self.fast_path and lexically_confident(ranked, coverage, self.min_coverage, self.min_margin):
+            self.last_path = "bm25"
+            return lexical[:k]
+
+        self.last_path = "hybrid"
+        # embed outside the lock so queries never stall ingestion on a network call
+        # query_vector may be a lazy QueryVector from the answer cache
+        if callable(query_vector):
+            query_vector = query_vector()
+        qvec = query_vector if query_vector is not None else self.embeddings.embed_query(question)
+        with self._lock:
+            semantic = self.vs.similarity_search_by_vector(qvec, k=self.fetch_k)
+        return fuse_documents(lexical, semantic, k, rrf_k=self.rrf_k)
@@ -0,0 +1,61 @@
+# test_streaming_ingest.py — StreamingIndexer retrieves like HybridRetriever while (and after) indexing
+#
+# Run:  python -m pytest test_streaming_ingest.py
+# Offline: HashingEmbeddings from bench_fixtures stands in for OpenAI embeddings.
+
+from bench_fixtures import HashingEmbeddings
+from streaming_ingest import StreamingIndexer, iter_time_chunks
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.query_calls = 0
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+def build_index():
+    segments = [
+        {"text": f"segment {i} covers general ideas about training neural networks", "start": 5.0 * i, "duration": 5.0}
+        for i in range(60)
+    ]
+    segments[37]["text"] = "the internal codename of the release is quasar"
+    embeddings = CountingEmbeddings()
+    indexer = StreamingIndexer(embeddings, batch_size=4, k=4)
+    indexer.start(iter_time_chunks(segments, chunk_size=200, chunk_overlap=0, video_id="vid"))
+    assert indexer.wait(timeout=30) and indexer.error is None
+    return indexer, embeddings
+
+
+def test_exact_keyword_query_skips_embedding():
+    indexer, embeddings = build_index()
+
+    docs = indexer.invoke("quasar codename")
+
+    assert embeddings.query_calls == 0
+    assert indexer.last_path == "bm25"
+    assert "quasar" in docs[0].page_content
+    assert docs[0].metadata["video_id"] == "vid"
+
+
+def test_vague_query_fuses_bm25_and_vectors():
+    indexer, embeddings = build_index()
+
+    docs = indexer.invoke("what was said about networks", k=3)
+
+    assert embeddings.query_calls == 1
+    assert indexer.last_path == "hybrid"
+    assert 0 < len(docs) <= 3
+    assert len({d.page_content for d in docs}) == len(docs)
+
+
+def test_precomputed_query_vector_is_reused():
+    indexer, embeddings = build_index()
+    qvec = embeddings.embed_query("what was said about networks")
+
+    indexer.invoke("what was said about networks", query_vector=qvec)
+
+    assert embeddings.query_calls == 1
@@ -0,0 +1,201 @@
+# transcribe.py — parallel Faster-Whisper transcription with VAD-based audio sharding
+#
+# 1) decode audio once to 16 kHz float32 and save it as .npy (workers memory-map it)
+# 2) run Silero VAD and cut the audio into shards only at silence between speech regions
+# 3) fan shards out to a persistent process pool; each worker keeps a warm WhisperModel
+# 4) stitch segments back in order with absolute timestamps
+# Short audio (or a single core) skips the pool and uses one shared in-process model.
+
+import atexit
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+MIN_SHARD_SEC = 60.0    # below this, per-shard overhead outweighs parallelism
+MAX_SHARD_SEC = 600.0   # keep shards small enough that cores finish around the same time
+
+
+# ---------------------------
+# Models
+# ---------------------------
+
+@lru_cache(maxsize=2)
+def get_whisper_model(model_size: str, cpu_threads: int = 0):
+    """
+    One WhisperModel per (model_size, cpu_threads) per process, reused across calls.
+    """
+    from faster_whisper import WhisperModel
+    return WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+
+_worker_model = None
+
+
+def _init_worker(model_size: str, cpu_threads: int) -> None:
+    global _worker_model
+    _worker_model = get_whisper_model(model_size, cpu_threads)
+
+
+def _transcribe_shard(args: Tuple[str, int, int, str]) -> List[dict]:
+    npy_path, start, end, language = args
+    audio = np.load(npy_path, mmap_mode="r")[start:end]
+    segments, _ = _worker_model.transcribe(np.ascontiguousarray(audio), language=language, vad_filter=True)
+    offset = start / SAMPLE_RATE
+    return [
+        {"text": s.text.strip(), "start": offset + s.start, "duration": s.end - s.start}
+        for s in segments
+        if s.text and s.text.strip()
+    ]
+
+
+# ---------------------------
+# Sharding
+# ---------------------------
+
+def plan_shards(audio: np.ndarray, n_workers: int) -> List[Tuple[int, int]]:
+    """
+    Returns [(start_sample, end_sample), ...] covering the speech in `audio`.
+    Shard boundaries always fall in the silence between two VAD speech regions.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=500))
+    if not speech:
+        return []
+
+    total_sec = len(audio) / SAMPLE_RATE
+    target = min(MAX_SHARD_SEC, max(MIN_SHARD_SEC, total_sec / max(1, n_workers)))
+    target_samples = int(target * SAMPLE_RATE)
+
+    shards = []
+    shard_start = speech[0]["start"]
+    prev_end = speech[0]["end"]
+    for region in speech[1:]:
+        if region["end"] - shard_start > target_samples:
+            # cut in the middle of the silence gap
+            cut = (prev_end + region["start"]) // 2
+            shards.append((shard_start, cut))
+            shard_start = cut
+        prev_end = region["end"]
+    shards.append((shard_start, len(audio)))
+    return shards
+
+
+# ---------------------------
+# Engine
+# ---------------------------
+
+class TranscriptionEngine:
+    """
+    Holds a persistent spawn-based process pool (one warm model per worker) for a given model size.
+    Thread-safe: concurrent jobs share the pool, and a retired engine keeps it until they are all done.
+    """
+
+    def __init__(self, model_size: str = "small.en", n_workers: Optional[int] = None):
+        self.model_size = model_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._retired = False
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a multi-threaded Streamlit/CTranslate2 process is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.n_workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.model_size, 1),
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def retire(self) -> None:
+        """
+        Releases the worker pool once the transcriptions already running on this engine have finished.
+        """
+        with self._lock:
+            self._retired = True
+            idle = self._in_flight == 0
+        if idle:
+            self.shutdown()
+
+    def transcribe(self, audio_path: str, language: str = "en") -> List[dict]:
+        """
+        Returns ordered segments [{'text','start','duration'}] with absolute timestamps.
+        """
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._transcribe(audio_path, language)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                idle = self._retired and self._in_flight == 0
+            if idle:
+                self.shutdown()
+
+    def _transcribe(self, audio_path: str, language: str) -> List[dict]:
+        from faster_whisper import decode_audio
+
+        audio = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
+        shards = plan_shards(audio, self.n_workers) if self.n_workers > 1 else []
+
+        if len(shards) < 2:
+            model = get_whisper_model(self.model_size)
+            segments, _ = model.transcribe(audio, language=language, vad_filter=True)
+            return [
+                {"text": s.text.strip(), "start": s.start, "duration": s.end - s.start}
+                for s in segments
+                if s.text and s.text.strip()
+            ]
+
+        with tempfile.TemporaryDirectory(prefix="yt_pcm_") as tmp:
+            npy_path = str(Path(tmp) / "audio.npy")
+            np.save(npy_path, audio)
+            del audio
+            jobs = [(npy_path, start, end, language) for start, end in shards]
+            # map() preserves input order, which is exactly the stitching order
+            results = list(self._get_pool().map(_transcribe_shard, jobs))
+
+        return [seg for shard in results for seg in shard]
+
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def get_engine(model_size: str) -> TranscriptionEngine:
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(model_size)
+        if engine is None:
+            # keep only one warm pool around; switching model size releases the old workers once the
+            # jobs still transcribing on them (other JobQueue workers) are done
+            for other in _ENGINES.values():
+                other.retire()
+            _ENGINES.clear()
+            engine = _ENGINES[model_size] = TranscriptionEngine(model_size)
+        return engine
+
+
+@atexit.register
+def _shutdown_engines() -> None:
+    with _ENGINES_LOCK:
+        engines = list(_ENGINES.values())
+    for engine in engines:
+        engine.shutdown()
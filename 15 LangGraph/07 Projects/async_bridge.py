@@ -0,0 +1,40 @@
+# async_bridge.py
+#
+# Streamlit runs every session's script in its own thread and expects plain (sync) iterators, e.g. for
+# st.write_stream. The async backend runs all graphs on ONE event loop in a background thread; this module
+# submits coroutines to that loop and turns async generators (graph.astream) into sync iterators, so a
+# script thread only waits for the next chunk while the LLM calls of all sessions run concurrently.
+
+import asyncio
+import threading
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="langgraph-event-loop", daemon=True).start()
+    return _loop
+
+
+def run(coro):
+    """Run a coroutine on the shared loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+def iterate(agen):
+    """Consume an async generator from sync code, one item at a time."""
+    loop = get_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # the consumer stopped early (new input, rerun): close the generator, which cancels the graph run
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
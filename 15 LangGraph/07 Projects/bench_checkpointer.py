@@ -0,0 +1,119 @@
+# bench_checkpointer.py — 50 concurrent chat sessions against the old shared-connection SqliteSaver
+# and PooledSqliteSaver
+#
+# Run:  python bench_checkpointer.py --sessions 50 --turns 20 --llm-ms 20
+# Each session is a thread (like a Streamlit session) sending turns through the same graph shape as the
+# chatbot, with a fake chat node that sleeps llm-ms instead of calling OpenAI. Reports turns/sec and
+# p50/p99 latency of put and put_writes separately: PooledSqliteSaver.put_writes only buffers in memory
+# and its rows are committed by the next put, so put is the comparable per-step write cost.
+# Uses a temporary database, not chatbot.db.
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from typing import TypedDict, Annotated
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from pooled_checkpointer import PooledSqliteSaver
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def build_graph(checkpointer, llm_ms):
+    def chat_node(state: ChatState):
+        time.sleep(llm_ms / 1000)
+        return {"messages": [AIMessage(content=f"reply {len(state['messages'])} " + "lorem ipsum " * 20)]}
+
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", chat_node)
+    graph.add_edge(START, "chat_node")
+    graph.add_edge("chat_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+WRITE_METHODS = ("put", "put_writes")
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+
+
+def timed(checkpointer, latencies):
+    # wrap the write methods on the instance so both savers are measured the same way; one sample list per method
+    lock = threading.Lock()
+    for name in WRITE_METHODS:
+        method = getattr(checkpointer, name)
+
+        def wrapper(*args, _method=method, _samples=latencies[name], **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                with lock:
+                    _samples.append((time.perf_counter() - t0) * 1000)
+
+        setattr(checkpointer, name, wrapper)
+
+
+def run(mode, path, sessions, turns, llm_ms):
+    if mode == "shared":
+        conn = sqlite3.connect(database=path, check_same_thread=False)
+        checkpointer = SqliteSaver(conn=conn)
+    else:
+        checkpointer = PooledSqliteSaver(path)
+    latencies, errors = {name: [] for name in WRITE_METHODS}, []
+    timed(checkpointer, latencies)
+    chatbot = build_graph(checkpointer, llm_ms)
+
+    def session(i):
+        config = {"configurable": {"thread_id": f"{mode}-{i}"}}
+        try:
+            for turn in range(turns):
+                chatbot.invoke({"messages": [HumanMessage(content=f"question {turn}")]}, config=config)
+        except Exception as e:
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "turns_per_s": sessions * turns / elapsed,
+        **{name: percentiles(samples) for name, samples in latencies.items()},
+        "errors": errors,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--turns", type=int, default=20)
+    ap.add_argument("--llm-ms", type=float, default=20.0)
+    args = ap.parse_args()
+
+    print(f"{args.sessions} sessions x {args.turns} turns, fake LLM {args.llm_ms:.0f} ms\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode, label in (("shared", "shared connection"), ("pooled", "PooledSqliteSaver")):
+            r = run(mode, os.path.join(tmp, f"{mode}.db"), args.sessions, args.turns, args.llm_ms)
+            (put_p50, put_p99), (writes_p50, writes_p99) = r["put"], r["put_writes"]
+            print(f"{label:<18} {r['turns_per_s']:7.1f} turns/s   put p50 {put_p50:6.2f} ms  p99 {put_p99:7.2f} ms   "
+                  f"put_writes p50 {writes_p50:6.2f} ms  p99 {writes_p99:7.2f} ms   errors {len(r['errors'])}")
+            for err in sorted(set(r["errors"]))[:3]:
+                print(f"    {err}")
+
+
+if __name__ == "__main__":
+    main()
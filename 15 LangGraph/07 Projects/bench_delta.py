@@ -0,0 +1,98 @@
+# bench_delta.py — DB size and load_conversation latency for long threads, full vs delta checkpoints
+#
+# Run:  python bench_delta.py --threads 3 --turns 1000
+# Builds the threads through the chatbot graph with a fake chat node (no OpenAI), then measures
+# chatbot.get_state (what load_conversation calls) on a freshly opened checkpointer (cold: nothing memoized)
+# and again on the same one (warm). Uses temporary databases, not chatbot.db.
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import TypedDict, Annotated
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from delta_checkpointer import DeltaSqliteSaver, zstandard
+from pooled_checkpointer import PooledSqliteSaver
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def chat_node(state: ChatState):
+    return {"messages": [AIMessage(content=f"reply {len(state['messages'])}: " + "lorem ipsum dolor " * 15)]}
+
+
+def build_graph(checkpointer):
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", chat_node)
+    graph.add_edge(START, "chat_node")
+    graph.add_edge("chat_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def db_size_mb(path):
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p)) / 1e6
+
+
+def load_ms(chatbot, threads, reps):
+    ms = []
+    for _ in range(reps):
+        for t in range(threads):
+            t0 = time.perf_counter()
+            state = chatbot.get_state(config={"configurable": {"thread_id": f"thread-{t}"}})
+            state.values.get("messages", [])
+            ms.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(ms)
+
+
+def run(label, make_saver, path, threads, turns, reps):
+    saver = make_saver(path)
+    chatbot = build_graph(saver)
+    t0 = time.perf_counter()
+    for t in range(threads):
+        config = {"configurable": {"thread_id": f"thread-{t}"}}
+        for turn in range(turns):
+            chatbot.invoke({"messages": [HumanMessage(content=f"question {turn}")]}, config=config)
+    build_s = time.perf_counter() - t0
+    saver.close()
+
+    saver = make_saver(path)
+    chatbot = build_graph(saver)
+    cold = load_ms(chatbot, threads, 1)
+    warm = load_ms(chatbot, threads, reps)
+    with saver.cursor(transaction=False) as cur:
+        cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"{label:<14} db {db_size_mb(path):8.1f} MB   build {build_s:7.1f} s   "
+          f"load_conversation cold {cold:7.1f} ms   warm {warm:7.1f} ms")
+    saver.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=3)
+    ap.add_argument("--turns", type=int, default=1000)
+    ap.add_argument("--reps", type=int, default=5)
+    ap.add_argument("--snapshot-every", type=int, default=50)
+    args = ap.parse_args()
+
+    modes = [
+        ("full", lambda p: PooledSqliteSaver(p)),
+        ("delta", lambda p: DeltaSqliteSaver(p, snapshot_every=args.snapshot_every)),
+    ]
+    if zstandard is not None:
+        modes.append(("delta+zstd", lambda p: DeltaSqliteSaver(p, snapshot_every=args.snapshot_every, compress=True)))
+    else:
+        print("zstandard not installed: skipping delta+zstd")
+
+    print(f"{args.threads} threads x {args.turns} turns\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, make_saver in modes:
+            run(label, make_saver, os.path.join(tmp, f"{label}.db"), args.threads, args.turns, args.reps)
+
+
+if __name__ == "__main__":
+    main()
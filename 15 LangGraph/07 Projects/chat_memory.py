@@ -0,0 +1,129 @@
+# chat_memory.py
+#
+# chat_node used to send the whole state["messages"] to the LLM, so every turn of a long thread cost more
+# tokens and time than the last. ConversationMemory bounds the prompt:
+#   - a running summary kept in state["summary"] covers the first state["summarized_count"] messages;
+#     everything after them is sent verbatim, so no message is ever in neither the summary nor the prompt
+#   - once that verbatim part grows past window_tokens, the summarize node folds its oldest turns into the
+#     summary with one extra LLM call (tagged nostream, so it never shows up in stream_mode="messages"),
+#     keeping the last window_tokens - summarize_every_tokens verbatim. The node runs in front of
+#     chat_node (route() is the conditional edge), so the model never sees an over-budget prompt; the cost
+#     is that on those turns the answer starts after the summary call, about once per
+#     summarize_every_tokens of conversation. Cuts always fall right before a user message, so tool calls
+#     are never separated from their results.
+# The messages themselves stay in state, so the conversation shown in the UI is unchanged.
+# Prompt size is therefore at most: system summary (summary_tokens) + verbatim part (window_tokens), plus
+# the latest turn itself if that alone is larger than the window.
+
+import os
+from dataclasses import dataclass
+from langchain_core.messages import HumanMessage, SystemMessage, trim_messages
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.constants import TAG_NOSTREAM
+
+SUMMARY_PROMPT = (
+    "You maintain the memory of a conversation between a user and an assistant.\n"
+    "Current summary:\n{summary}\n\n"
+    "Fold the following older messages into the summary. Keep facts, names, numbers, decisions and open "
+    "questions; drop pleasantries. Answer with the new summary only, at most {words} words.\n\n{transcript}"
+)
+SUMMARY_HEADER = "Summary of the earlier conversation:\n"
+
+
+@dataclass
+class MemoryConfig:
+    window_tokens: int = 2000  # recent history sent verbatim
+    summary_tokens: int = 400  # cap on the running summary
+    summarize_every_tokens: int = 600  # history folded per summary call, at least
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            window_tokens=int(os.environ.get("CHAT_WINDOW_TOKENS", cls.window_tokens)),
+            summary_tokens=int(os.environ.get("CHAT_SUMMARY_TOKENS", cls.summary_tokens)),
+            summarize_every_tokens=int(os.environ.get("CHAT_SUMMARIZE_EVERY_TOKENS", cls.summarize_every_tokens)),
+        )
+
+
+class ConversationMemory:
+    def __init__(self, llm, config=None, token_counter=count_tokens_approximately):
+        self.config = config or MemoryConfig.from_env()
+        self.token_counter = token_counter
+        self.summarizer = llm.with_config(tags=[TAG_NOSTREAM])
+
+    def window_start(self, messages, max_tokens):
+        """Index of the first message of the most recent max_tokens of history, on a user message."""
+        window = trim_messages(
+            messages,
+            max_tokens=max_tokens,
+            token_counter=self.token_counter,
+            strategy="last",
+            start_on="human",
+            allow_partial=False,
+        )
+        if window:
+            return len(messages) - len(window)
+        # the latest turn alone is over budget: keep it whole rather than send a broken turn
+        for i in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[i], HumanMessage):
+                return i
+        return max(len(messages) - 1, 0)
+
+    def _summary_message(self, summary):
+        return SystemMessage(content=SUMMARY_HEADER + summary)
+
+    def prompt(self, state):
+        """Messages to send to the chat model: running summary + everything it does not cover yet."""
+        recent = state["messages"][state.get("summarized_count", 0):]
+        summary = state.get("summary")
+        if summary:
+            return [self._summary_message(summary)] + recent
+        return list(recent)
+
+    def _pending(self, state):
+        # oldest verbatim turns to fold, once the verbatim part no longer fits the window
+        messages = state["messages"]
+        start = state.get("summarized_count", 0)
+        if self.token_counter(messages[start:]) <= self.config.window_tokens:
+            return []
+        keep = max(self.config.window_tokens - self.config.summarize_every_tokens, 0)
+        return messages[start:max(self.window_start(messages, keep), start)]
+
+    def needs_summary(self, state):
+        return bool(self._pending(state))
+
+    def route(self, state):
+        """Conditional edge into chat_node: fold due history into the summary first."""
+        return "summarize" if self.needs_summary(state) else "chat_node"
+
+    def _summary_request(self, state, pending):
+        transcript = "\n".join(f"{m.type}: {m.content}" for m in pending if isinstance(m.content, str) and m.content)
+        words = max(self.config.summary_tokens * 3 // 4, 50)
+        return [HumanMessage(content=SUMMARY_PROMPT.format(
+            summary=state.get("summary") or "(empty)", words=words, transcript=transcript,
+        ))]
+
+    def _update(self, state, pending, summary):
+        # hard cap, in case the model ignores the word limit: the whole system message fits summary_tokens
+        summary = summary.strip()[:self.config.summary_tokens * 4]
+        while summary and self.token_counter([self._summary_message(summary)]) > self.config.summary_tokens:
+            summary = summary[:len(summary) * 9 // 10]
+        return {
+            "summary": summary,
+            "summarized_count": state.get("summarized_count", 0) + len(pending),
+        }
+
+    def summarize(self, state):
+        """Graph node: fold the oldest verbatim turns into state["summary"]."""
+        pending = self._pending(state)
+        if not pending:
+            return {}
+        response = self.summarizer.invoke(self._summary_request(state, pending))
+        return self._update(state, pending, response.content)
+
+    async def asummarize(self, state):
+        pending = self._pending(state)
+        if not pending:
+            return {}
+        response = await self.summarizer.ainvoke(self._summary_request(state, pending))
+        return self._update(state, pending, response.content)
@@ -0,0 +1,165 @@
+# delta_checkpointer.py
+#
+# With add_messages every checkpoint holds the whole conversation so far, so a thread of n turns stores
+# O(n^2) messages and every get_state decodes the full list again. DeltaSqliteSaver stores the messages
+# channel of most checkpoints as a delta against the parent checkpoint ({base, keep, append}: the parent's
+# first `keep` messages plus the new ones) and writes a full snapshot every `snapshot_every` steps, when the
+# history was rewritten (RemoveMessage, replaced ids) or when the parent is not in memory (e.g. after a
+# restart). Blobs can additionally be zstd-compressed (pip install zstandard).
+#
+# Deltas are resolved on demand: only the checkpoints between the one requested and the nearest snapshot are
+# read, and resolved message lists are memoized, so a new turn or a walk over a thread's history decodes each
+# delta once instead of the full conversation per checkpoint.
+
+import threading
+from collections import OrderedDict
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pooled_checkpointer import PooledSqliteSaver
+
+try:
+    import zstandard
+except ImportError:  # compression is optional
+    zstandard = None
+
+DELTA_KEY = "__messages_delta__"
+ZSTD_SUFFIX = "+zstd"
+
+
+class ZstdSerializer:
+    """Wraps a serializer and zstd-compresses blobs above min_size; the type tag records it ("msgpack+zstd")."""
+
+    def __init__(self, inner=None, level=3, min_size=256):
+        if zstandard is None:
+            raise ImportError("zstd compression needs the zstandard package: pip install zstandard")
+        self.inner = inner or JsonPlusSerializer()
+        self.min_size = min_size
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._lock = threading.Lock()  # zstd contexts are not thread-safe
+
+    def dumps_typed(self, obj):
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+        with self._lock:
+            return type_ + ZSTD_SUFFIX, self._compressor.compress(data)
+
+    def loads_typed(self, data):
+        type_, blob = data
+        if type_.endswith(ZSTD_SUFFIX):
+            with self._lock:
+                blob = self._decompressor.decompress(blob)
+            type_ = type_[:-len(ZSTD_SUFFIX)]
+        return self.inner.loads_typed((type_, blob))
+
+
+class DeltaSqliteSaver(PooledSqliteSaver):
+    """PooledSqliteSaver that stores the messages channel as per-step deltas plus periodic full snapshots."""
+
+    def __init__(self, path="chatbot.db", *, snapshot_every=50, compress=False, memo_size=256, **kwargs):
+        if compress and "serde" not in kwargs:
+            kwargs["serde"] = ZstdSerializer()
+        self.snapshot_every = snapshot_every
+        self.memo_size = memo_size
+        # (thread_id, checkpoint_ns, checkpoint_id) -> (messages, steps since the last snapshot)
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        super().__init__(path, **kwargs)
+
+    # ---------- memo ----------
+
+    def _remember(self, key, messages, depth):
+        with self._memo_lock:
+            self._memo[key] = (messages, depth)
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def _recall(self, key):
+        with self._memo_lock:
+            entry = self._memo.get(key)
+            if entry is not None:
+                self._memo.move_to_end(key)
+            return entry
+
+    # ---------- write ----------
+
+    def _stored_checkpoint(self, config, checkpoint):
+        checkpoint = super()._stored_checkpoint(config, checkpoint)
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        if not isinstance(messages, list):
+            return checkpoint
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        key = (thread_id, checkpoint_ns, checkpoint["id"])
+
+        parent = self._recall((thread_id, checkpoint_ns, parent_id)) if parent_id else None
+        if parent is not None:
+            base, depth = parent
+            keep = len(base)
+            # add_messages keeps untouched messages as the same objects; anything else is a rewritten history
+            unchanged = keep <= len(messages) and all(a is b or a == b for a, b in zip(base, messages))
+            if unchanged and depth + 1 < self.snapshot_every:
+                self._remember(key, list(messages), depth + 1)
+                delta = {DELTA_KEY: 1, "base": parent_id, "keep": keep, "append": messages[keep:]}
+                return {**checkpoint, "channel_values": {**checkpoint["channel_values"], "messages": delta}}
+
+        self._remember(key, list(messages), 0)
+        return checkpoint
+
+    # ---------- read ----------
+
+    def _load_messages(self, thread_id, checkpoint_ns, checkpoint_id):
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        entry = self._recall(key)
+        if entry is not None:
+            return entry
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                (thread_id, checkpoint_ns, checkpoint_id),
+            )
+            row = cur.fetchone()
+        if row is None:
+            raise LookupError(f"delta base checkpoint {checkpoint_id} of thread {thread_id} is missing")
+        stored = self.serde.loads_typed((row[0], row[1])).get("channel_values", {}).get("messages", [])
+        return self._resolve(thread_id, checkpoint_ns, checkpoint_id, stored)
+
+    def _resolve(self, thread_id, checkpoint_ns, checkpoint_id, stored):
+        if not (isinstance(stored, dict) and DELTA_KEY in stored):
+            entry = (list(stored), 0)
+        else:
+            # walks back to the nearest snapshot (at most snapshot_every rows), memoizing every step
+            base, depth = self._load_messages(thread_id, checkpoint_ns, stored["base"])
+            entry = (base[:stored["keep"]] + list(stored["append"]), depth + 1)
+        self._remember((thread_id, checkpoint_ns, checkpoint_id), *entry)
+        return entry
+
+    def _materialize(self, checkpoint_tuple):
+        if checkpoint_tuple is None:
+            return None
+        checkpoint = checkpoint_tuple.checkpoint
+        stored = checkpoint.get("channel_values", {}).get("messages")
+        if not (isinstance(stored, dict) and DELTA_KEY in stored):
+            return checkpoint_tuple
+        configurable = checkpoint_tuple.config["configurable"]
+        messages, _ = self._resolve(
+            str(configurable["thread_id"]), configurable.get("checkpoint_ns", ""), checkpoint["id"], stored
+        )
+        # a copy: the graph appends to the list it gets back, the memo must keep the stored state
+        channel_values = {**checkpoint["channel_values"], "messages": list(messages)}
+        return checkpoint_tuple._replace(checkpoint={**checkpoint, "channel_values": channel_values})
+
+    def get_tuple(self, config):
+        return self._materialize(super().get_tuple(config))
+
+    def list(self, config, **kwargs):
+        for checkpoint_tuple in super().list(config, **kwargs):
+            yield self._materialize(checkpoint_tuple)
+
+    def delete_thread(self, thread_id):
+        with self._memo_lock:
+            for key in [k for k in self._memo if k[0] == str(thread_id)]:
+                del self._memo[key]
+        super().delete_thread(thread_id)
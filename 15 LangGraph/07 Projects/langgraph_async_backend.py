@@ -0,0 +1,85 @@
+# langgraph_async_backend.py
+#
+# Async variant of langgraph_backend.py / langgraph_tool_backend.py: async nodes (llm.ainvoke), async
+# checkpointer methods and graph.astream(stream_mode="messages"), all running on the single event loop from
+# async_bridge. Frontends call stream_reply / load_conversation, which return plain sync values.
+
+from typing import TypedDict, Annotated
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, tools_condition
+from dotenv import load_dotenv
+from async_bridge import iterate, run
+from chat_memory import ConversationMemory
+# same tools and the same chatbot.db checkpointer (delta storage, thread catalog) as the sync tool backend;
+# its aget_tuple/aput/... run the pooled sync methods in worker threads, off the event loop
+from langgraph_tool_backend import tools, checkpointer
+
+load_dotenv()
+
+llm = ChatOpenAI()
+llm_with_tools = llm.bind_tools(tools)
+# token-budgeted window + running summary (see chat_memory.py; sizes from CHAT_* env vars)
+memory = ConversationMemory(llm)
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+    summary: str
+    summarized_count: int
+
+
+async def chat_node(state: ChatState):
+    response = await llm.ainvoke(memory.prompt(state))
+    return {"messages": [response]}
+
+
+async def tool_chat_node(state: ChatState):
+    """LLM node that may answer or request a tool call."""
+    response = await llm_with_tools.ainvoke(memory.prompt(state))
+    return {"messages": [response]}
+
+
+def build_chatbot(checkpointer):
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", chat_node)
+    graph.add_node("summarize", memory.asummarize)
+    graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+    graph.add_edge("summarize", "chat_node")
+    graph.add_edge("chat_node", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def build_tool_chatbot(checkpointer):
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", tool_chat_node)
+    graph.add_node("tools", ToolNode(tools))
+    graph.add_node("summarize", memory.asummarize)
+    graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+    graph.add_edge("summarize", "chat_node")
+    graph.add_conditional_edges("chat_node", tools_condition)
+    graph.add_conditional_edges("tools", memory.route, ["summarize", "chat_node"])
+    return graph.compile(checkpointer=checkpointer)
+
+
+# in-memory like langgraph_backend.py; the tool chatbot persists to chatbot.db like langgraph_tool_backend.py
+chatbot = build_chatbot(InMemorySaver())
+tool_chatbot = build_tool_chatbot(checkpointer)
+
+
+def stream_reply(graph, user_input, config):
+    """Sync iterator of (message_chunk, metadata) for one turn, produced by graph.astream on the shared loop."""
+    return iterate(graph.astream(
+        {"messages": [HumanMessage(content=user_input)]},
+        config=config,
+        stream_mode="messages",
+    ))
+
+
+def load_conversation(graph, thread_id):
+    state = run(graph.aget_state(config={"configurable": {"thread_id": thread_id}}))
+    # Check if messages key exists in state values, return empty list if not
+    return state.values.get("messages", [])
@@ -5,16 +5,22 @@ from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph.message import add_messages
 from dotenv import load_dotenv
+from chat_memory import ConversationMemory
 
 load_dotenv()
 
 llm = ChatOpenAI()
 
+# token-budgeted window + running summary (see chat_memory.py; sizes from CHAT_* env vars)
+memory = ConversationMemory(llm)
+
 class ChatState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
+    summary: str
+    summarized_count: int
 
 def chat_node(state: ChatState):
-    messages = state['messages']
+    messages = memory.prompt(state)
     response = llm.invoke(messages)
     return {"messages": [response]}
 
@@ -23,7 +29,10 @@ checkpointer = InMemorySaver()
 
 graph = StateGraph(ChatState)
 graph.add_node("chat_node", chat_node)
-graph.add_edge(START, "chat_node")
+graph.add_node("summarize", memory.summarize)
+# fold old turns into the summary first when the unsummarized history no longer fits the window
+graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+graph.add_edge("summarize", "chat_node")
 graph.add_edge("chat_node", END)
 
 chatbot = graph.compile(checkpointer=checkpointer)
\ No newline at end of file
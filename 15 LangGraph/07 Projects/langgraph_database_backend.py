@@ -2,38 +2,49 @@ from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, Annotated
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.sqlite import SqliteSaver
+from delta_checkpointer import DeltaSqliteSaver
 from langgraph.graph.message import add_messages
 from dotenv import load_dotenv
-import sqlite3
+from chat_memory import ConversationMemory
+import os
 
 load_dotenv()
 
 llm = ChatOpenAI()
 
+# token-budgeted window + running summary (see chat_memory.py; sizes from CHAT_* env vars)
+memory = ConversationMemory(llm)
+
 class ChatState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
+    summary: str
+    summarized_count: int
 
 def chat_node(state: ChatState):
-    messages = state['messages']
+    messages = memory.prompt(state)
     response = llm.invoke(messages)
     return {"messages": [response]}
 
-conn = sqlite3.connect(database='chatbot.db', check_same_thread=False)
-# Checkpointer
-checkpointer = SqliteSaver(conn=conn)
+# Checkpointer: pooled WAL connections, safe to share between concurrent Streamlit sessions;
+# messages stored as per-step deltas (CHECKPOINT_ZSTD=1 also compresses them, needs zstandard)
+checkpointer = DeltaSqliteSaver('chatbot.db', compress=os.environ.get('CHECKPOINT_ZSTD') == '1')
+checkpointer.backfill_catalog()
 
 graph = StateGraph(ChatState)
 graph.add_node("chat_node", chat_node)
-graph.add_edge(START, "chat_node")
+graph.add_node("summarize", memory.summarize)
+# fold old turns into the summary first when the unsummarized history no longer fits the window
+graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+graph.add_edge("summarize", "chat_node")
 graph.add_edge("chat_node", END)
 
 chatbot = graph.compile(checkpointer=checkpointer)
 
 def retrieve_all_threads():
-    all_threads = set()
-    for checkpoint in checkpointer.list(None):
-        all_threads.add(checkpoint.config['configurable']['thread_id'])
+    # read from the thread catalog; no checkpoint is deserialized
+    return checkpointer.thread_ids()
 
-    return list(all_threads)
+def retrieve_threads(limit=20, cursor=None):
+    # one sidebar page, most recently updated first -> (rows, next_cursor)
+    return checkpointer.list_threads(limit=limit, cursor=cursor)
 
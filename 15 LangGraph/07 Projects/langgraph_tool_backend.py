@@ -4,14 +4,15 @@ from langgraph.graph import StateGraph, START, END
 from typing import TypedDict, Annotated
 from langchain_core.messages import BaseMessage, HumanMessage
 from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.sqlite import SqliteSaver
+from delta_checkpointer import DeltaSqliteSaver
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.tools import tool
 from dotenv import load_dotenv
-import sqlite3
+from chat_memory import ConversationMemory
 import requests
+import os
 
 load_dotenv()
 
@@ -73,13 +74,18 @@ llm_with_tools = llm.bind_tools(tools)
 # -------------------
 class ChatState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
+    summary: str
+    summarized_count: int
 
 # -------------------
 # 4. Nodes
 # -------------------
+# token-budgeted window + running summary (see chat_memory.py; sizes from CHAT_* env vars)
+memory = ConversationMemory(llm)
+
 def chat_node(state: ChatState):
     """LLM node that may answer or request a tool call."""
-    messages = state["messages"]
+    messages = memory.prompt(state)
     response = llm_with_tools.invoke(messages)
     return {"messages": [response]}
 
@@ -88,8 +94,10 @@ tool_node = ToolNode(tools)
 # -------------------
 # 5. Checkpointer
 # -------------------
-conn = sqlite3.connect(database="chatbot.db", check_same_thread=False)
-checkpointer = SqliteSaver(conn=conn)
+# pooled WAL connections, safe to share between concurrent Streamlit sessions;
+# messages stored as per-step deltas (CHECKPOINT_ZSTD=1 also compresses them, needs zstandard)
+checkpointer = DeltaSqliteSaver("chatbot.db", compress=os.environ.get("CHECKPOINT_ZSTD") == "1")
+checkpointer.backfill_catalog()
 
 # -------------------
 # 6. Graph
@@ -97,11 +105,14 @@ checkpointer = SqliteSaver(conn=conn)
 graph = StateGraph(ChatState)
 graph.add_node("chat_node", chat_node)
 graph.add_node("tools", tool_node)
+graph.add_node("summarize", memory.summarize)
 
-graph.add_edge(START, "chat_node")
+# every way into chat_node first folds old turns into the summary when they no longer fit the window
+graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+graph.add_edge("summarize", "chat_node")
 
 graph.add_conditional_edges("chat_node",tools_condition)
-graph.add_edge('tools', 'chat_node')
+graph.add_conditional_edges("tools", memory.route, ["summarize", "chat_node"])
 
 chatbot = graph.compile(checkpointer=checkpointer)
 
@@ -109,7 +120,9 @@ chatbot = graph.compile(checkpointer=checkpointer)
 # 7. Helper
 # -------------------
 def retrieve_all_threads():
-    all_threads = set()
-    for checkpoint in checkpointer.list(None):
-        all_threads.add(checkpoint.config["configurable"]["thread_id"])
-    return list(all_threads)
\ No newline at end of file
+    # read from the thread catalog; no checkpoint is deserialized
+    return checkpointer.thread_ids()
+
+def retrieve_threads(limit=20, cursor=None):
+    # one sidebar page, most recently updated first -> (rows, next_cursor)
+    return checkpointer.list_threads(limit=limit, cursor=cursor)
\ No newline at end of file
@@ -0,0 +1,210 @@
+# pooled_checkpointer.py
+#
+# The backends used to share one module-global sqlite3 connection (check_same_thread=False) between every
+# Streamlit session thread, and SqliteSaver serializes all access to it behind a single lock. So one
+# session's checkpoint write blocked every other session's reads.
+# PooledSqliteSaver instead:
+#   - hands each operation its own connection from a small pool (WAL: readers never wait for the writer)
+#   - tunes every connection: WAL, synchronous=NORMAL, mmap, a page cache and a busy timeout instead of
+#     immediate "database is locked" errors
+#   - buffers the pending writes of a graph step (put_writes) and commits them in one transaction
+#     together with the step's checkpoint and its thread_catalog row, instead of one commit per call
+#   - also serves async graphs (ainvoke/astream): the async methods run the sync ones in worker threads,
+#     which the pool lets proceed concurrently
+
+import asyncio
+import queue
+import sqlite3
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from langgraph.checkpoint.base import WRITES_IDX_MAP
+from thread_catalog import CatalogSqliteSaver
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # in WAL mode only the last commits can be lost on power failure, never corrupted
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16000,  # KiB, per connection
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms to wait for the write lock before raising "database is locked"
+}
+
+
+class PooledSqliteSaver(CatalogSqliteSaver):
+    """
+    Thread-safe SQLite checkpointer for many concurrent chat sessions in one process.
+
+    Pending writes are flushed when the step's checkpoint is saved, before any read of that thread,
+    and on close(); if the process dies in between, the interrupted step is simply recomputed.
+    """
+
+    def __init__(self, path="chatbot.db", *, pool_size=8, pragmas=None, serde=None):
+        self.path = path
+        self.pool_size = pool_size
+        self.pragmas = {**PRAGMAS, **(pragmas or {})}
+        self._pool = queue.LifoQueue()
+        self._connections = []
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self._pending = defaultdict(list)
+        self._pending_lock = threading.Lock()
+        conn = self._connect()
+        super().__init__(conn=conn, serde=serde)
+        # the constructor's connection only creates the tables; it never joins the pool
+        self.setup()
+        conn.close()
+        self._setup_conn = None
+
+    # ---------- connections ----------
+
+    @property
+    def conn(self):
+        # SqliteSaver code that uses self.conn directly (setup, the writes query in list) must run on the
+        # connection this thread checked out in cursor(), not on a connection shared between threads
+        active = getattr(self._local, "conn", None)
+        return active if active is not None else self._setup_conn
+
+    @conn.setter
+    def conn(self, conn):
+        self._setup_conn = conn
+
+    def _connect(self):
+        # autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE in cursor()
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _checkout(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if len(self._connections) < self.pool_size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        return self._pool.get()
+
+    @contextmanager
+    def cursor(self, transaction=True):
+        # nested use on the same thread (put -> SqliteSaver.put -> catalog upsert) joins the outer transaction
+        active = getattr(self._local, "conn", None)
+        if active is not None:
+            cur = active.cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        try:
+            cur = conn.cursor()
+            try:
+                if transaction:
+                    # take the write lock up front, so a transaction never fails half-way on lock upgrade
+                    cur.execute("BEGIN IMMEDIATE")
+                yield cur
+                if transaction:
+                    conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                cur.close()
+        finally:
+            self._local.conn = None
+            self._pool.put(conn)
+
+    def close(self):
+        self.flush()
+        with self._pool_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # ---------- batched writes ----------
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # same rows and conflict rule as SqliteSaver.put_writes, serialized now, written with the next checkpoint
+        replace = all(channel in WRITES_IDX_MAP for channel, _ in writes)
+        rows = [
+            (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx), channel,
+             *self.serde.dumps_typed(value))
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        with self._pending_lock:
+            self._pending[thread_id].append((replace, rows))
+
+    def _flush(self, cur, thread_id):
+        with self._pending_lock:
+            batches = self._pending.pop(thread_id, [])
+        for replace, rows in batches:
+            verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+            cur.executemany(
+                f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def flush(self, thread_id=None):
+        with self._pending_lock:
+            thread_ids = [thread_id] if thread_id is not None else list(self._pending)
+            thread_ids = [t for t in thread_ids if self._pending.get(t)]
+        if not thread_ids:
+            return
+        with self.cursor() as cur:
+            for t in thread_ids:
+                self._flush(cur, t)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        # one transaction per graph step: buffered writes + checkpoint + catalog row
+        with self.cursor() as cur:
+            self._flush(cur, str(config["configurable"]["thread_id"]))
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    # ---------- reads see buffered writes ----------
+
+    def get_tuple(self, config):
+        self.flush(str(config["configurable"]["thread_id"]))
+        return super().get_tuple(config)
+
+    def list(self, config, **kwargs):
+        self.flush(str(config["configurable"]["thread_id"]) if config else None)
+        # SqliteSaver.list is a generator that keeps its cursors open between yields; run it to the end
+        # inside one read-only checkout, so a put() made while the caller iterates gets its own
+        # connection and transaction instead of joining this one
+        with self.cursor(transaction=False):
+            checkpoint_tuples = list(super().list(config, **kwargs))
+        return iter(checkpoint_tuples)
+
+    def delete_thread(self, thread_id):
+        with self._pending_lock:
+            self._pending.pop(str(thread_id), None)
+        super().delete_thread(thread_id)
+
+    # ---------- async graphs ----------
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, **kwargs):
+        for checkpoint_tuple in await asyncio.to_thread(lambda: list(self.list(config, **kwargs))):
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
@@ -1,5 +1,5 @@
 import streamlit as st
-from langgraph_database_backend import chatbot, retrieve_all_threads
+from langgraph_database_backend import chatbot, retrieve_threads
 from langchain_core.messages import HumanMessage
 import uuid
 
@@ -19,6 +19,17 @@ def add_thread(thread_id):
     if thread_id not in st.session_state['chat_threads']:
         st.session_state['chat_threads'].append(thread_id)
 
+def load_thread_page():
+    # next page of the thread catalog; chat_threads is oldest -> newest, so older pages go in front
+    rows, st.session_state['threads_cursor'] = retrieve_threads(THREADS_PAGE, st.session_state['threads_cursor'])
+    older = []
+    for row in reversed(rows):
+        st.session_state['thread_titles'][row['thread_id']] = row['title']
+        if row['thread_id'] not in st.session_state['chat_threads']:
+            older.append(row['thread_id'])
+    st.session_state['chat_threads'][:0] = older
+    st.session_state['threads_more'] = st.session_state['threads_cursor'] is not None
+
 def load_conversation(thread_id):
     state = chatbot.get_state(config={'configurable': {'thread_id': thread_id}})
     # Check if messages key exists in state values, return empty list if not
@@ -26,6 +37,8 @@ def load_conversation(thread_id):
 
 
 # **************************************** Session Setup ******************************
+THREADS_PAGE = 20
+
 if 'message_history' not in st.session_state:
     st.session_state['message_history'] = []
 
@@ -33,7 +46,10 @@ if 'thread_id' not in st.session_state:
     st.session_state['thread_id'] = generate_thread_id()
 
 if 'chat_threads' not in st.session_state:
-    st.session_state['chat_threads'] = retrieve_all_threads()
+    st.session_state['chat_threads'] = []
+    st.session_state['thread_titles'] = {}
+    st.session_state['threads_cursor'] = None
+    load_thread_page()
 
 add_thread(st.session_state['thread_id'])
 
@@ -48,7 +64,8 @@ if st.sidebar.button('New Chat'):
 st.sidebar.header('My Conversations')
 
 for thread_id in st.session_state['chat_threads'][::-1]:
-    if st.sidebar.button(str(thread_id)):
+    title = st.session_state['thread_titles'].get(thread_id) or str(thread_id)
+    if st.sidebar.button(title, key=f'thread-{thread_id}'):
         st.session_state['thread_id'] = thread_id
         messages = load_conversation(thread_id)
 
@@ -63,6 +80,10 @@ for thread_id in st.session_state['chat_threads'][::-1]:
 
         st.session_state['message_history'] = temp_messages
 
+if st.session_state['threads_more'] and st.sidebar.button('Load older chats'):
+    load_thread_page()
+    st.rerun()
+
 
 # **************************************** Main UI ************************************
 
@@ -77,6 +98,7 @@ if user_input:
 
     # first add the message to message_history
     st.session_state['message_history'].append({'role': 'user', 'content': user_input})
+    st.session_state['thread_titles'].setdefault(st.session_state['thread_id'], user_input[:60])
     with st.chat_message('user'):
         st.text(user_input)
 
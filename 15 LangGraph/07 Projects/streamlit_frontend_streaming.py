@@ -1,6 +1,5 @@
 import streamlit as st
-from langgraph_backend import chatbot
-from langchain_core.messages import HumanMessage
+from langgraph_async_backend import chatbot, stream_reply
 
 # st.session_state -> dict -> 
 CONFIG = {'configurable': {'thread_id': 'thread-1'}}
@@ -28,12 +27,9 @@ if user_input:
     # first add the message to message_history
     with st.chat_message('assistant'):
 
+        # graph.astream runs on the shared event loop; this script thread only waits for each chunk
         ai_message = st.write_stream(
-            message_chunk.content for message_chunk, metadata in chatbot.stream(
-                {'messages': [HumanMessage(content=user_input)]},
-                config= {'configurable': {'thread_id': 'thread-1'}},
-                stream_mode= 'messages'
-            )
+            message_chunk.content for message_chunk, metadata in stream_reply(chatbot, user_input, CONFIG)
         )
 
     st.session_state['message_history'].append({'role': 'assistant', 'content': ai_message})
\ No newline at end of file
@@ -1,5 +1,6 @@
 import streamlit as st
-from langgraph_tool_backend import chatbot, retrieve_all_threads
+from langgraph_async_backend import tool_chatbot, stream_reply, load_conversation
+from langgraph_tool_backend import retrieve_threads
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 import uuid
 
@@ -17,12 +18,20 @@ def add_thread(thread_id):
     if thread_id not in st.session_state["chat_threads"]:
         st.session_state["chat_threads"].append(thread_id)
 
-def load_conversation(thread_id):
-    state = chatbot.get_state(config={"configurable": {"thread_id": thread_id}})
-    # Check if messages key exists in state values, return empty list if not
-    return state.values.get("messages", [])
+def load_thread_page():
+    # next page of the thread catalog; chat_threads is oldest -> newest, so older pages go in front
+    rows, st.session_state["threads_cursor"] = retrieve_threads(THREADS_PAGE, st.session_state["threads_cursor"])
+    older = []
+    for row in reversed(rows):
+        st.session_state["thread_titles"][row["thread_id"]] = row["title"]
+        if row["thread_id"] not in st.session_state["chat_threads"]:
+            older.append(row["thread_id"])
+    st.session_state["chat_threads"][:0] = older
+    st.session_state["threads_more"] = st.session_state["threads_cursor"] is not None
 
 # ======================= Session Initialization ===================
+THREADS_PAGE = 20
+
 if "message_history" not in st.session_state:
     st.session_state["message_history"] = []
 
@@ -30,7 +39,10 @@ if "thread_id" not in st.session_state:
     st.session_state["thread_id"] = generate_thread_id()
 
 if "chat_threads" not in st.session_state:
-    st.session_state["chat_threads"] = retrieve_all_threads()
+    st.session_state["chat_threads"] = []
+    st.session_state["thread_titles"] = {}
+    st.session_state["threads_cursor"] = None
+    load_thread_page()
 
 add_thread(st.session_state["thread_id"])
 
@@ -42,9 +54,10 @@ if st.sidebar.button("New Chat"):
 
 st.sidebar.header("My Conversations")
 for thread_id in st.session_state["chat_threads"][::-1]:
-    if st.sidebar.button(str(thread_id)):
+    title = st.session_state["thread_titles"].get(thread_id) or str(thread_id)
+    if st.sidebar.button(title, key=f"thread-{thread_id}"):
         st.session_state["thread_id"] = thread_id
-        messages = load_conversation(thread_id)
+        messages = load_conversation(tool_chatbot, thread_id)
 
         temp_messages = []
         for msg in messages:
@@ -52,6 +65,10 @@ for thread_id in st.session_state["chat_threads"][::-1]:
             temp_messages.append({"role": role, "content": msg.content})
         st.session_state["message_history"] = temp_messages
 
+if st.session_state["threads_more"] and st.sidebar.button("Load older chats"):
+    load_thread_page()
+    st.rerun()
+
 # ============================ Main UI ============================
 
 # Render history
@@ -64,6 +81,7 @@ user_input = st.chat_input("Type here")
 if user_input:
     # Show user's message
     st.session_state["message_history"].append({"role": "user", "content": user_input})
+    st.session_state["thread_titles"].setdefault(st.session_state["thread_id"], user_input[:60])
     with st.chat_message("user"):
         st.text(user_input)
 
@@ -79,11 +97,8 @@ if user_input:
         status_holder = {"box": None}
 
         def ai_only_stream():
-            for message_chunk, metadata in chatbot.stream(
-                {"messages": [HumanMessage(content=user_input)]},
-                config=CONFIG,
-                stream_mode="messages",
-            ):
+            # graph.astream runs on the shared event loop; this script thread only waits for each chunk
+            for message_chunk, metadata in stream_reply(tool_chatbot, user_input, CONFIG):
                 # Lazily create & update the SAME status container when any tool runs
                 if isinstance(message_chunk, ToolMessage):
                     tool_name = getattr(message_chunk, "name", "tool")
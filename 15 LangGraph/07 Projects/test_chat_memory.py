@@ -0,0 +1,102 @@
+# test_chat_memory.py — ConversationMemory keeps prompts bounded over long threads
+#
+# Run:  python -m pytest test_chat_memory.py
+# Drives many turns through the same graph shape as the backends, with fake chat models (no OpenAI).
+
+from typing import TypedDict, Annotated
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from chat_memory import ConversationMemory, MemoryConfig
+
+CONFIG = MemoryConfig(window_tokens=300, summary_tokens=80, summarize_every_tokens=120)
+
+
+class RecordingMemory(ConversationMemory):
+    # remembers every batch of messages handed to the summarizer
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.folded = []
+
+    def _summary_request(self, state, pending):
+        self.folded.extend(pending)
+        return super()._summary_request(state, pending)
+
+
+class ChatState(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+    summary: str
+    summarized_count: int
+
+
+def build_graph(memory, llm, prompts):
+    def chat_node(state: ChatState):
+        prompt = memory.prompt(state)
+        prompts.append((prompt, list(state["messages"]), state.get("summarized_count", 0)))
+        return {"messages": [llm.invoke(prompt)]}
+
+    graph = StateGraph(ChatState)
+    graph.add_node("chat_node", chat_node)
+    graph.add_node("summarize", memory.summarize)
+    graph.add_conditional_edges(START, memory.route, ["summarize", "chat_node"])
+    graph.add_edge("summarize", "chat_node")
+    graph.add_edge("chat_node", END)
+    return graph.compile(checkpointer=InMemorySaver())
+
+
+def run_turns(turns, summary_reply):
+    llm = FakeListChatModel(responses=["Sure, here is a longer answer about that topic. " * 3])
+    memory = RecordingMemory(FakeListChatModel(responses=[summary_reply]), config=CONFIG)
+    prompts = []
+    chatbot = build_graph(memory, llm, prompts)
+    config = {"configurable": {"thread_id": "t"}}
+    for turn in range(turns):
+        chatbot.invoke({"messages": [HumanMessage(content=f"question {turn}: tell me more about item {turn}")]},
+                       config=config)
+    return memory, prompts, chatbot.get_state(config).values
+
+
+def test_prompt_stays_bounded():
+    memory, prompts, state = run_turns(60, "Short summary of the earlier turns.")
+
+    bound = CONFIG.window_tokens + CONFIG.summary_tokens
+    for prompt, _, _ in prompts:
+        assert count_tokens_approximately(prompt) <= bound
+    # without the summary the last prompts would be the whole conversation
+    assert count_tokens_approximately(state["messages"]) > 5 * bound
+    assert len(state["messages"]) == 120
+
+
+def test_summarized_count_advances():
+    memory, prompts, state = run_turns(60, "Short summary of the earlier turns.")
+
+    counts = [count for _, _, count in prompts]
+    assert counts == sorted(counts)
+    assert len(set(counts)) > 3
+    assert state["summarized_count"] > 0
+    assert state["summary"] == "Short summary of the earlier turns."
+
+
+def test_no_message_falls_between_summary_and_prompt():
+    memory, prompts, state = run_turns(40, "Short summary of the earlier turns.")
+
+    # each message was folded into the summary exactly once, in order...
+    assert memory.folded == state["messages"][:state["summarized_count"]]
+    for prompt, messages, count in prompts:
+        # ...and until then it was sent verbatim
+        verbatim = [m for m in prompt if not isinstance(m, SystemMessage)]
+        assert verbatim == messages[count:]
+        assert isinstance(verbatim[0], HumanMessage)
+
+
+def test_summary_is_capped():
+    memory, prompts, state = run_turns(30, "An extremely verbose summary that ignores the word limit. " * 50)
+
+    assert state["summary"]
+    assert count_tokens_approximately([SystemMessage(content="Summary of the earlier conversation:\n" + state["summary"])]) \
+        <= CONFIG.summary_tokens
+    for prompt, _, _ in prompts:
+        assert count_tokens_approximately(prompt) <= CONFIG.window_tokens + CONFIG.summary_tokens
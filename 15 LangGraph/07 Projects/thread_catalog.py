@@ -0,0 +1,141 @@
+# thread_catalog.py
+#
+# retrieve_all_threads used to walk checkpointer.list(None), which loads and deserializes every checkpoint
+# of every thread just to collect the thread ids, so the sidebar got slower with every message ever sent.
+# CatalogSqliteSaver keeps one row per thread (title, created/updated time, message count) in a
+# thread_catalog table, written together with each checkpoint, and the sidebar reads it with one
+# indexed query per page.
+
+import time
+from datetime import datetime
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+CATALOG_SQL = """
+CREATE TABLE IF NOT EXISTS thread_catalog (
+    thread_id TEXT PRIMARY KEY,
+    title TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS thread_catalog_recent ON thread_catalog (updated_at DESC, thread_id DESC);
+"""
+
+UPSERT_SQL = (
+    "INSERT INTO thread_catalog (thread_id, title, created_at, updated_at, message_count) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(thread_id) DO UPDATE SET "
+    "title = COALESCE(thread_catalog.title, excluded.title), "
+    "updated_at = excluded.updated_at, message_count = excluded.message_count"
+)
+# checkpoint without a messages channel: only bump the timestamp
+TOUCH_SQL = (
+    "INSERT INTO thread_catalog (thread_id, created_at, updated_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at"
+)
+PAGE_COLUMNS = ("thread_id", "title", "created_at", "updated_at", "message_count")
+
+TITLE_CHARS = 60
+
+
+def thread_title(messages):
+    # first user message, shortened for a sidebar button
+    for msg in messages:
+        if isinstance(msg, HumanMessage) and isinstance(msg.content, str) and msg.content.strip():
+            title = " ".join(msg.content.split())
+            return title if len(title) <= TITLE_CHARS else title[:TITLE_CHARS - 1] + "…"
+    return None
+
+
+def catalog_write(thread_id, messages, updated_at, created_at=None):
+    # (sql, params) recording a thread's latest checkpoint; shared by the sync and async savers
+    if messages is None:
+        return TOUCH_SQL, (thread_id, created_at or updated_at, updated_at)
+    return UPSERT_SQL, (thread_id, thread_title(messages), created_at or updated_at, updated_at, len(messages))
+
+
+def catalog_page_query(limit, cursor=None):
+    # keyset pagination on (updated_at, thread_id), newest first; one extra row tells whether a next page exists
+    columns = ", ".join(PAGE_COLUMNS)
+    if cursor is None:
+        return (f"SELECT {columns} FROM thread_catalog ORDER BY updated_at DESC, thread_id DESC LIMIT ?",
+                (limit + 1,))
+    return (f"SELECT {columns} FROM thread_catalog WHERE (updated_at, thread_id) < (?, ?) "
+            "ORDER BY updated_at DESC, thread_id DESC LIMIT ?", (*cursor, limit + 1))
+
+
+def catalog_page(fetched, limit):
+    rows = [dict(zip(PAGE_COLUMNS, r)) for r in fetched]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1]["updated_at"], rows[-1]["thread_id"])
+    return rows, None
+
+
+class CatalogSqliteSaver(SqliteSaver):
+    """SqliteSaver that also maintains the thread_catalog table on every root checkpoint write."""
+
+    def setup(self):
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(CATALOG_SQL)
+        self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        messages = checkpoint.get("channel_values", {}).get("messages")
+        next_config = super().put(config, self._stored_checkpoint(config, checkpoint), metadata, new_versions)
+        # subgraph checkpoints (non-empty namespace) belong to the same conversation; only the root counts
+        if not config["configurable"].get("checkpoint_ns"):
+            with self.cursor() as cur:
+                cur.execute(*catalog_write(str(config["configurable"]["thread_id"]), messages, time.time()))
+        return next_config
+
+    def delete_thread(self, thread_id):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_catalog WHERE thread_id = ?", (str(thread_id),))
+
+    def _stored_checkpoint(self, config, checkpoint):
+        # what actually gets written; subclasses may re-encode it (the catalog always sees the real messages)
+        return checkpoint
+
+    def backfill_catalog(self):
+        """
+        Adds catalog rows for threads written before the catalog existed. Only the latest checkpoint of
+        each missing thread is loaded, and once a thread has a row it is never scanned again.
+        """
+        with self.cursor(transaction=False) as cur:
+            cur.execute(
+                "SELECT DISTINCT c.thread_id FROM checkpoints c "
+                "LEFT JOIN thread_catalog t ON t.thread_id = c.thread_id "
+                "WHERE c.checkpoint_ns = '' AND t.thread_id IS NULL"
+            )
+            missing = [row[0] for row in cur.fetchall()]
+
+        for thread_id in missing:
+            latest = self.get_tuple({"configurable": {"thread_id": thread_id}})
+            if latest is None:
+                continue
+            ts = datetime.fromisoformat(latest.checkpoint["ts"]).timestamp()
+            messages = latest.checkpoint.get("channel_values", {}).get("messages", [])
+            with self.cursor() as cur:
+                cur.execute(*catalog_write(thread_id, messages, ts))
+        return len(missing)
+
+    def list_threads(self, limit=20, cursor=None):
+        """
+        One page of threads, most recently updated first. cursor is the next_cursor of the previous page
+        (None for the first one); returns (rows, next_cursor) with next_cursor None on the last page.
+        """
+        with self.cursor(transaction=False) as cur:
+            cur.execute(*catalog_page_query(limit, cursor))
+            return catalog_page(cur.fetchall(), limit)
+
+    def thread_ids(self):
+        # every thread id, oldest update first (the order the frontends append new chats in)
+        with self.cursor(transaction=False) as cur:
+            cur.execute("SELECT thread_id FROM thread_catalog ORDER BY updated_at, thread_id")
+            return [row[0] for row in cur.fetchall()]
+